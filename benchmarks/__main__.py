@@ -0,0 +1,104 @@
+"""Run the benchmark suite.
+
+Every benchmark runs on synthetic pages from 10 KB to 10 MB. Pages requested over
+HTTP are served from a local server, so no network access is needed.
+
+Usage:
+    python -m benchmarks [--sizes 10KB,100KB] [--filter parse_] [--save baseline.json]
+    python -m benchmarks --compare baseline.json [--threshold 0.1]
+
+With ``--compare``, the exit status is 1 when a median latency regressed beyond
+the threshold.
+"""
+
+import sys
+from argparse import ArgumentParser
+from typing import List
+
+import requests
+
+from .runner import compare, format_size, load_baseline, measure, parse_size, save_baseline
+from .suite import SIZES, fetch_cases, fetch_pages, parse_cases, serve
+
+
+def print_results(results: List[dict]) -> None:
+    columns = ["rounds", "mean ms", "p50 ms", "p90 ms", "p99 ms", "MB/s", "peak KB"]
+    width = max(len(r["name"]) for r in results) + 8
+    print("benchmark".ljust(width), *[c.rjust(10) for c in columns])
+    for r in results:
+        peak = f"{r['peak_memory'] / 1024:10.0f}" if r["peak_memory"] is not None else "-".rjust(10)
+        print(
+            f"{r['name']}[{format_size(r['size'])}]".ljust(width),
+            f"{r['rounds']:10d}",
+            *[f"{r[k] * 1000:10.3f}" for k in ("mean", "p50", "p90", "p99")],
+            f"{r['mb_per_sec']:10.2f}",
+            peak,
+        )
+
+
+def main() -> int:
+    arg_parser = ArgumentParser(description="Benchmark parse and fetch hot paths.")
+    arg_parser.add_argument(
+        "--sizes",
+        default=",".join(format_size(s) for s in SIZES),
+        help="Comma separated page sizes, e.g. 10KB,1MB",
+    )
+    arg_parser.add_argument("--filter", "-k", default="", help="Run benchmarks containing this")
+    arg_parser.add_argument("--parser", default="auto", help="Parser passed to webpreview")
+    arg_parser.add_argument("--meta-tags", type=int, default=100, help="Meta tags per page")
+    arg_parser.add_argument("--min-time", type=float, default=1.0, help="Seconds per benchmark")
+    arg_parser.add_argument("--min-rounds", type=int, default=5, help="Rounds per benchmark")
+    arg_parser.add_argument("--no-fetch", action="store_true", help="Skip HTTP benchmarks")
+    arg_parser.add_argument("--no-memory", action="store_true", help="Skip peak memory")
+    arg_parser.add_argument("--save", metavar="PATH", help="Store results as a JSON baseline")
+    arg_parser.add_argument("--compare", metavar="PATH", help="Compare with a JSON baseline")
+    arg_parser.add_argument(
+        "--threshold", type=float, default=0.1, help="Allowed slowdown, 0.1 for 10%%"
+    )
+    args = arg_parser.parse_args()
+
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s]
+
+    def run(cases) -> List[dict]:
+        return [
+            measure(case, args.min_time, args.min_rounds, memory=not args.no_memory)
+            for case in cases
+            if args.filter in case.key
+        ]
+
+    results = run(parse_cases(sizes, args.parser, args.meta_tags))
+    if not args.no_fetch:
+        with serve(fetch_pages(sizes, args.meta_tags)) as base_url, requests.Session() as session:
+            results += run(fetch_cases(base_url, session, sizes, args.parser))
+
+    if not results:
+        print("No benchmarks matched.", file=sys.stderr)
+        return 1
+
+    print_results(results)
+
+    if args.save:
+        save_baseline(args.save, results)
+
+    if args.compare:
+        rows = compare(results, load_baseline(args.compare), args.threshold)
+        print()
+        print(
+            "benchmark".ljust(40), "old p50 ms".rjust(12), "new p50 ms".rjust(12), "ratio".rjust(8)
+        )
+        for row in rows:
+            mark = "  REGRESSION" if row["regression"] else ""
+            print(
+                f"{row['name']}[{format_size(row['size'])}]".ljust(40),
+                f"{row['old'] * 1000:12.3f}",
+                f"{row['new'] * 1000:12.3f}",
+                f"{row['ratio']:8.2f}{mark}",
+            )
+        if any(row["regression"] for row in rows):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Compare ``extract_description`` with the original implementation on long pages.
+
+Every page has an ``<h1>`` followed by ``--paragraphs`` paragraphs, and no meta
+description, so the description comes from the first paragraph after the heading.
+The original implementation materialized every paragraph of the page before looking
+at the first one. Mean milliseconds per call are printed for each number of
+paragraphs, and should stay flat for the bounded scan.
+
+Usage:
+    python -m benchmarks.bench_description [--paragraphs 100,1000,10000,50000]
+"""
+
+import timeit
+from argparse import ArgumentParser
+from typing import Optional
+
+from bs4 import BeautifulSoup
+
+from webpreview.parsers import MetaIndex, extract_description
+
+from .pages import make_text
+
+
+def extract_description_reference(soup: BeautifulSoup, meta_index: MetaIndex) -> Optional[str]:
+    """``extract_description`` as it was before the bounded scans."""
+
+    def treat_candidate(candidate_text: str) -> str:
+        text = candidate_text.strip()
+        parts = [p.strip().rstrip(".") for p in text.split(".") if p.strip().rstrip(".")]
+        return ". ".join(parts[:2]) + "."
+
+    meta_description = meta_index.get(("name", "description"))
+    if meta_description:
+        return meta_description
+
+    short_description = soup.find("div", class_="shortdescription")
+    if short_description and short_description.string:
+        return short_description.string
+
+    first_h1 = soup.find("h1")
+    if first_h1:
+        for p_candidate in first_h1.find_all_next("p"):
+            if p_candidate and p_candidate.text and p_candidate.text.strip():
+                return treat_candidate(p_candidate.text)
+
+    for p_candidate in soup.find_all("p"):
+        if p_candidate and p_candidate.text and p_candidate.text.strip():
+            return treat_candidate(p_candidate.text)
+
+    return None
+
+
+def make_long_page(paragraphs: int) -> str:
+    text = make_text(200)
+    body = "".join(f"<p>{text}</p>" for _ in range(paragraphs))
+    return (
+        f"<html><head><title>A long page</title></head><body><h1>A heading</h1>{body}</body></html>"
+    )
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Compare extract_description on long pages.")
+    arg_parser.add_argument(
+        "--paragraphs", default="100,1000,10000,50000", help="Comma separated paragraph counts"
+    )
+    arg_parser.add_argument("--repeat", "-r", type=int, default=20, help="Runs per page")
+    args = arg_parser.parse_args()
+
+    print("paragraphs".rjust(10), "before ms".rjust(10), "after ms".rjust(10))
+    for paragraphs in [int(p) for p in args.paragraphs.split(",")]:
+        soup = BeautifulSoup(make_long_page(paragraphs), "html.parser")
+        meta_index = MetaIndex.from_soup(soup)
+        expected = extract_description_reference(soup, meta_index)
+        assert extract_description(soup, meta_index) == expected
+        timings = [
+            timeit.timeit(lambda: func(soup, meta_index), number=args.repeat) / args.repeat * 1e3
+            for func in (extract_description_reference, extract_description)
+        ]
+        print(f"{paragraphs:10d}", *[f"{t:10.3f}" for t in timings])
+
+
+if __name__ == "__main__":
+    main()
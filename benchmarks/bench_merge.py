@@ -0,0 +1,101 @@
+"""Compare merging partial previews with filling a single preview in place.
+
+The fallback chain runs over a page with partial meta tags, so every stage is tried.
+"merge" builds a preview per stage and merges it into the result, the way the
+chain used to. "into" lets every stage fill the result in place. For both, the
+number of previews created, the peak of memory allocated and the mean time per
+chain are printed.
+
+Usage:
+    python -m benchmarks.bench_merge [--repeat 20000]
+"""
+
+import timeit
+import tracemalloc
+from argparse import ArgumentParser
+from typing import Callable, Dict
+
+from webpreview import parse_open_graph, parse_schema, parse_twitter_card
+from webpreview.models import WebPreview
+from webpreview.parsers import MetaIndex, parse_meta
+
+URL = "http://localhost/"
+PROPERTIES = ["og:title", "og:site_name", "og:type"]
+META_INDEX = MetaIndex(
+    {
+        ("property", "og:title"): "An Open Graph title",
+        ("property", "og:site_name"): "A site",
+        ("name", "twitter:description"): "A Twitter Card description",
+        ("itemprop", "name"): "A Schema name",
+    }
+)
+
+
+def chain_merge() -> WebPreview:
+    result = WebPreview(url=URL)
+    result.merge(parse_meta(None, URL, "property", PROPERTIES, True, META_INDEX))
+    result.merge(parse_open_graph(None, URL, None, True, META_INDEX))
+    result.merge(parse_twitter_card(None, URL, None, True, META_INDEX))
+    result.merge(parse_schema(None, URL, None, True, META_INDEX))
+    return result
+
+
+def chain_into() -> WebPreview:
+    result = WebPreview(url=URL)
+    parse_meta(None, URL, "property", PROPERTIES, True, META_INDEX, result)
+    parse_open_graph(None, URL, None, True, META_INDEX, result)
+    parse_twitter_card(None, URL, None, True, META_INDEX, result)
+    parse_schema(None, URL, None, True, META_INDEX, result)
+    return result
+
+
+def count_previews(func: Callable[[], WebPreview]) -> int:
+    """Number of previews created by a single call."""
+    created = 0
+    init = WebPreview.__init__
+
+    def counting_init(self, *args, **kwargs) -> None:
+        nonlocal created
+        created += 1
+        init(self, *args, **kwargs)
+
+    WebPreview.__init__ = counting_init  # type: ignore
+    try:
+        func()
+    finally:
+        WebPreview.__init__ = init  # type: ignore
+    return created
+
+
+def peak_memory(func: Callable[[], WebPreview]) -> int:
+    """Peak of memory allocated by a single call, in bytes."""
+    func()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Compare merging previews with filling in place.")
+    arg_parser.add_argument("--repeat", "-r", type=int, default=20000, help="Chains per variant")
+    args = arg_parser.parse_args()
+
+    variants: Dict[str, Callable[[], WebPreview]] = {"merge": chain_merge, "into": chain_into}
+    assert chain_merge().to_dict() == chain_into().to_dict()
+
+    print("variant", "previews".rjust(10), "peak B".rjust(10), "mean us".rjust(10))
+    for name, func in variants.items():
+        seconds = timeit.timeit(func, number=args.repeat)
+        print(
+            name.ljust(7),
+            f"{count_previews(func):10d}",
+            f"{peak_memory(func):10d}",
+            f"{seconds / args.repeat * 1e6:10.2f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
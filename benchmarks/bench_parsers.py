@@ -0,0 +1,62 @@
+"""Compare parser backends on the test fixtures.
+
+Every fixture in "tests/" is previewed with every installed parser backend,
+and the mean time per preview is printed in milliseconds.
+
+Usage:
+    python -m benchmarks.bench_parsers [--repeat 200]
+"""
+
+import glob
+import importlib.util
+import timeit
+from argparse import ArgumentParser
+from typing import Dict, List
+
+from webpreview import webpreview
+
+
+def available_parsers() -> List[str]:
+    parsers = ["html.parser"]
+    if importlib.util.find_spec("lxml"):
+        parsers += ["lxml", "lxml-direct"]
+    if importlib.util.find_spec("html5lib"):
+        parsers += ["html5lib"]
+    return parsers
+
+
+def bench(paths: List[str], parsers: List[str], repeat: int) -> Dict[str, Dict[str, float]]:
+    """Return mean milliseconds per preview for every fixture and parser."""
+    results: Dict[str, Dict[str, float]] = {}
+    for path in paths:
+        with open(path) as f:
+            content = f.read()
+        results[path] = {}
+        for parser in parsers:
+            seconds = timeit.timeit(
+                lambda: webpreview("http://localhost/", content=content, parser=parser),
+                number=repeat,
+            )
+            results[path][parser] = seconds / repeat * 1000
+    return results
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Compare parser backends on the test fixtures.")
+    arg_parser.add_argument("--repeat", "-r", type=int, default=200, help="Previews per fixture")
+    arg_parser.add_argument("--fixtures", default="tests/*/*.html", help="Glob of fixtures")
+    args = arg_parser.parse_args()
+
+    parsers = available_parsers()
+    results = bench(sorted(glob.glob(args.fixtures)), parsers, args.repeat)
+
+    width = max(len(path) for path in results)
+    print("fixture".ljust(width), *[p.rjust(12) for p in parsers])
+    for path, timings in results.items():
+        print(path.ljust(width), *[f"{timings[p]:12.3f}" for p in parsers])
+    totals = [sum(t[p] for t in results.values()) for p in parsers]
+    print("total".ljust(width), *[f"{t:12.3f}" for t in totals])
+
+
+if __name__ == "__main__":
+    main()
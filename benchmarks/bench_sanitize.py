@@ -0,0 +1,78 @@
+"""Compare ``sanitize`` with the original implementation on text of the fixtures.
+
+The title and paragraphs of every fixture in "tests/", including the multilingual
+ones, are sanitized with both implementations. Mean microseconds per fixture are
+printed, followed by the time to sanitize a 1 MB paragraph with and without
+``max_length``.
+
+Usage:
+    python -m benchmarks.bench_sanitize [--repeat 2000]
+"""
+
+import glob
+import re
+import timeit
+import unicodedata
+from argparse import ArgumentParser
+from typing import List
+
+from bs4 import BeautifulSoup
+
+from webpreview.parsers import sanitize
+from webpreview.regex import WHITESPACE
+
+from .pages import make_text
+
+
+def sanitize_reference(value: str) -> str:
+    """``sanitize`` as it was before the fast paths."""
+    if not value:
+        return value
+    v = re.sub(WHITESPACE, " ", value)
+    return unicodedata.normalize("NFKD", v)
+
+
+def fixture_texts(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        soup = BeautifulSoup(f.read(), "html.parser")
+    texts = [p.get_text() for p in soup.find_all("p")]
+    if soup.title and soup.title.string:
+        texts.append(soup.title.string)
+    return texts
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Compare sanitize with the original implementation.")
+    arg_parser.add_argument("--repeat", "-r", type=int, default=2000, help="Runs per fixture")
+    arg_parser.add_argument("--fixtures", default="tests/*/*.html", help="Glob of fixtures")
+    args = arg_parser.parse_args()
+
+    paths = sorted(glob.glob(args.fixtures))
+    width = max(len(path) for path in paths)
+    print("fixture".ljust(width), "chars".rjust(8), "before us".rjust(10), "after us".rjust(10))
+    totals = [0.0, 0.0]
+    for path in paths:
+        texts = fixture_texts(path)
+        assert [sanitize(t) for t in texts] == [sanitize_reference(t) for t in texts]
+        timings = [
+            timeit.timeit(lambda: [func(t) for t in texts], number=args.repeat) / args.repeat * 1e6
+            for func in (sanitize_reference, sanitize)
+        ]
+        totals = [total + timing for total, timing in zip(totals, timings)]
+        chars = sum(len(t) for t in texts)
+        print(path.ljust(width), f"{chars:8d}", *[f"{t:10.2f}" for t in timings])
+    print("total".ljust(width), " " * 8, *[f"{t:10.2f}" for t in totals])
+
+    print()
+    text = make_text(1 << 20)
+    for name, func in (
+        ("before", lambda: sanitize_reference(text)),
+        ("after", lambda: sanitize(text)),
+        ("after, max_length=300", lambda: sanitize(text, max_length=300)),
+    ):
+        seconds = timeit.timeit(func, number=10) / 10
+        print(f"1 MB paragraph, {name}:".ljust(40), f"{seconds * 1e3:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Compare URL validation and normalization with the original implementations.
+
+URLs of a generated crawl frontier, mostly plain ones with a few carrying user info,
+IP addresses or non-ASCII host names, are validated, normalized and made absolute
+with both implementations. Mean microseconds per URL are printed.
+
+Usage:
+    python -m benchmarks.bench_urls [--urls 100000]
+"""
+
+import random
+import timeit
+from argparse import ArgumentParser
+from typing import Callable, List, Optional, Tuple
+from urllib.parse import urlparse, urlsplit, urlunparse, urlunsplit
+
+from webpreview import normalize_urls
+from webpreview.excepts import *
+from webpreview.parsers import make_absolute_url, normalize_url, validate_url
+from webpreview.regex import VALID_URL
+
+HOSTS = ["example.com", "www.Example.org", "blog.example.co.uk", "cdn-1.example.net:8080"]
+ODD_HOSTS = ["user:secret@example.com", "127.0.0.1:8000", "пример.рф", "localhost:5000"]
+PATHS = ["", "/", "/about", "/wiki/Enrico_Fermi", "/search?q=fermi&page=2", "/a/b/c.html#top"]
+
+
+def validate_url_reference(url: str) -> str:
+    """``validate_url`` as it was before the plain URL fast path."""
+    if not url:
+        raise EmptyURL("Please pass a valid URL as the first argument.")
+
+    m = VALID_URL.match(url)
+    if not m:
+        raise InvalidURL("The URL is invalid.")
+
+    if not m.group("domain"):
+        raise URLUnreachable("URL is unreacheable.")
+
+    if not m.group("scheme"):
+        url = f"http://{url}"
+
+    return url
+
+
+def normalize_url_reference(url: str) -> str:
+    """``normalize_url`` as it was before the plain URL fast path."""
+    scheme, netloc, path, query, _ = urlsplit(validate_url_reference(url))
+    userinfo, at, host = netloc.rpartition("@")
+    return urlunsplit((scheme.lower(), userinfo + at + host.lower(), path or "/", query, ""))
+
+
+def make_absolute_url_reference(url: str, base_url: str) -> Optional[str]:
+    """``make_absolute_url`` as it was before the base URL was memoized."""
+    if not url or not base_url:
+        return url
+
+    base = urlparse(base_url)
+    parsed = urlparse(url)
+    url_components = [
+        (parsed.scheme if parsed.netloc else base.scheme) or "http",
+        parsed.netloc or base.netloc,
+        parsed.path,
+        parsed.params,
+        parsed.query,
+        parsed.fragment,
+    ]
+    return urlunparse(url_components)
+
+
+def make_urls(count: int, odd_ratio: float = 0.05) -> List[str]:
+    """Return ``count`` URLs, with duplicates and about ``odd_ratio`` of unusual ones."""
+    rnd = random.Random(0)
+    urls = []
+    for _ in range(count):
+        host = rnd.choice(ODD_HOSTS if rnd.random() < odd_ratio else HOSTS)
+        scheme = rnd.choice(["", "http://", "https://", "HTTPS://"])
+        path = rnd.choice(PATHS) or f"/{rnd.randrange(count // 4)}"
+        urls.append(f"{scheme}{host}{path}")
+    return urls
+
+
+def timed(func: Callable[[], object]) -> float:
+    return min(timeit.repeat(func, number=1, repeat=3))
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Compare URL validation with the original code.")
+    arg_parser.add_argument("--urls", "-n", type=int, default=100000, help="URLs to process")
+    args = arg_parser.parse_args()
+
+    urls = make_urls(args.urls)
+    relative = [(f"/img/{i}.png", f"https://example.com/page/{i % 50}") for i in range(args.urls)]
+    assert [validate_url(u) for u in urls] == [validate_url_reference(u) for u in urls]
+    assert [normalize_url(u) for u in urls] == [normalize_url_reference(u) for u in urls]
+    assert [make_absolute_url(u, b) for u, b in relative] == [
+        make_absolute_url_reference(u, b) for u, b in relative
+    ]
+
+    cases: List[Tuple[str, Callable[[], object], Callable[[], object]]] = [
+        (
+            "validate_url",
+            lambda: [validate_url_reference(u) for u in urls],
+            lambda: [validate_url(u) for u in urls],
+        ),
+        (
+            "normalize_url",
+            lambda: [normalize_url_reference(u) for u in urls],
+            lambda: [normalize_url(u) for u in urls],
+        ),
+        (
+            "normalize_urls (deduplicated)",
+            lambda: list(dict.fromkeys(normalize_url_reference(u) for u in urls)),
+            lambda: list(normalize_urls(urls)),
+        ),
+        (
+            "make_absolute_url",
+            lambda: [make_absolute_url_reference(u, b) for u, b in relative],
+            lambda: [make_absolute_url(u, b) for u, b in relative],
+        ),
+    ]
+    print(f"{len(urls)} URLs")
+    print("function".ljust(32), "before us".rjust(10), "after us".rjust(10))
+    for name, before, after in cases:
+        timings = [timed(func) / len(urls) * 1e6 for func in (before, after)]
+        print(name.ljust(32), *[f"{t:10.3f}" for t in timings])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Synthetic pages of a given size for the benchmarks."""
+
+from typing import List
+
+# Words of the filler text, with accents and odd whitespace to keep ``sanitize`` busy
+WORDS = "lorem ipsum dolor sit amet café naïve résumé\tconsectetur\nadipiscing elit".split(" ")
+
+PREVIEW_META_TAGS = [
+    '<meta property="og:title" content="An Open Graph title" />',
+    '<meta property="og:description" content="An Open Graph description" />',
+    '<meta property="og:image" content="/images/og.png" />',
+    '<meta name="twitter:title" content="A Twitter Card title" />',
+    '<meta name="twitter:image" content="/images/twitter.png" />',
+    '<meta itemprop="name" content="A Schema name" />',
+]
+
+
+def make_text(size: int) -> str:
+    """Return text of roughly ``size`` characters."""
+    words: List[str] = []
+    length = 0
+    i = 0
+    while length < size:
+        word = WORDS[i % len(WORDS)]
+        words.append(word)
+        length += len(word) + 1
+        i += 1
+    return " ".join(words)[:size]
+
+
+def make_page(size: int, meta_tags: int = 100, complete: bool = True) -> str:
+    """Return an HTML page of roughly ``size`` bytes.
+
+    The head holds ``meta_tags`` unrelated meta tags. When ``complete``, Open Graph tags
+    supply title, description and image, otherwise the page only has the generic
+    elements: ``<title>``, ``<h1>`` followed by an image and paragraphs.
+    """
+    head = ["<head>", '<meta charset="utf-8" />', "<title>A page title</title>"]
+    if complete:
+        head += PREVIEW_META_TAGS
+    for i in range(meta_tags):
+        head.append(f'<meta name="x-filler-{i}" content="filler value {i}" />')
+    head.append("</head>")
+
+    body = ["<body>", "<h1>A heading</h1>", '<img src="/images/h1.png" />']
+    length = sum(len(line) for line in head) + sum(len(line) for line in body)
+    i = 0
+    while length < size:
+        paragraph = f"<p>{make_text(400 + i % 200)}</p>"
+        if i % 20 == 0:
+            paragraph = f'<div class="section"><h2>Section {i}</h2></div>' + paragraph
+        body.append(paragraph)
+        length += len(paragraph)
+        i += 1
+    body.append("</body>")
+
+    return "<!DOCTYPE html>\n<html>\n" + "\n".join(head + body) + "\n</html>\n"
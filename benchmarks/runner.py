@@ -0,0 +1,155 @@
+"""Timing, memory measurement and JSON baselines of the benchmarks."""
+
+import gc
+import json
+import platform
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from webpreview import __version__
+
+
+class Case:
+    """A single benchmark: ``func`` called without arguments on ``size`` bytes of input."""
+
+    def __init__(self, name: str, size: int, func: Callable[[], Any]) -> None:
+        self.name = name
+        self.size = size
+        self.func = func
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{format_size(self.size)}]"
+
+
+def format_size(size: int) -> str:
+    for unit, factor in (("MB", 1 << 20), ("KB", 1 << 10)):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{unit}"
+    return f"{size}B"
+
+
+def parse_size(value: str) -> int:
+    """Turn sizes like "10KB" or "1MB" into bytes."""
+    value = value.strip().upper().rstrip("B")
+    factors = {"K": 1 << 10, "M": 1 << 20}
+    if value and value[-1] in factors:
+        return int(float(value[:-1]) * factors[value[-1]])
+    return int(value)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Percentile of sorted values, interpolated linearly between the closest ranks."""
+    if len(values) == 1:
+        return values[0]
+    rank = (len(values) - 1) * q
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def measure(
+    case: Case,
+    min_time: float = 1.0,
+    min_rounds: int = 5,
+    max_rounds: int = 10000,
+    memory: bool = True,
+) -> Dict[str, Any]:
+    """Run the case repeatedly and summarize its latency, throughput and peak memory.
+
+    The case runs at least ``min_rounds`` times and then until ``min_time`` seconds have
+    passed or ``max_rounds`` is reached. Peak memory is measured in one extra round,
+    since tracing allocations slows everything down.
+    """
+    case.func()  # warm up
+
+    timings = []
+    started = time.perf_counter()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while len(timings) < max_rounds:
+            start = time.perf_counter()
+            case.func()
+            timings.append(time.perf_counter() - start)
+            if len(timings) >= min_rounds and time.perf_counter() - started >= min_time:
+                break
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            case.func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    return {
+        "name": case.name,
+        "size": case.size,
+        "rounds": len(timings),
+        "mean": mean,
+        "min": timings[0],
+        "p50": percentile(timings, 0.5),
+        "p90": percentile(timings, 0.9),
+        "p99": percentile(timings, 0.99),
+        "ops_per_sec": 1 / mean if mean else None,
+        "mb_per_sec": case.size / mean / (1 << 20) if mean else None,
+        "peak_memory": peak,
+    }
+
+
+def make_baseline(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "webpreview": __version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": results,
+    }
+
+
+def save_baseline(path: str, results: List[Dict[str, Any]]) -> None:
+    with open(path, "w") as f:
+        json.dump(make_baseline(results), f, indent=2)
+        f.write("\n")
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(
+    results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float = 0.1
+) -> List[Dict[str, Any]]:
+    """Compare median latencies with the baseline.
+
+    Returns one row per benchmark present in both, with the ``ratio`` of the new
+    median to the old one and whether it is a ``regression`` beyond the ``threshold``.
+    """
+    old = {(r["name"], r["size"]): r for r in baseline["results"]}
+    rows = []
+    for result in results:
+        previous: Optional[Dict[str, Any]] = old.get((result["name"], result["size"]))
+        if previous is None or not previous["p50"]:
+            continue
+        ratio = result["p50"] / previous["p50"]
+        rows.append(
+            {
+                "name": result["name"],
+                "size": result["size"],
+                "old": previous["p50"],
+                "new": result["p50"],
+                "ratio": ratio,
+                "regression": ratio > 1 + threshold,
+            }
+        )
+    return rows
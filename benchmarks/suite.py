@@ -0,0 +1,144 @@
+"""Benchmarks of the parse and fetch hot paths."""
+
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List
+
+import requests
+from bs4 import BeautifulSoup
+
+from webpreview import (
+    extract_meta_attributes,
+    parse_generic,
+    parse_meta,
+    parse_open_graph,
+    parse_schema,
+    parse_twitter_card,
+    webpreview,
+)
+from webpreview.parsers import initialize, resolve_parser, sanitize
+
+from .pages import make_page, make_text
+from .runner import Case, format_size
+
+KB = 1 << 10
+MB = 1 << 20
+SIZES = [10 * KB, 100 * KB, MB, 10 * MB]
+
+META_PROPERTIES = ["og:title", "og:description", "og:image", "og:site_name", "og:type"]
+
+
+@contextmanager
+def serve(pages: Dict[str, bytes]) -> Iterator[str]:
+    """Serve the pages from a local HTTP server and yield its base URL."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately, don't let them wait for delayed ACKs
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:
+            body = pages.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+
+        def handle_error(self, request, client_address) -> None:
+            # Streaming previews drop connections once the head is parsed
+            pass
+
+    server = Server(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def parse_cases(sizes: List[int], parser: str = "auto", meta_tags: int = 100) -> List[Case]:
+    """Cases of the functions working on content already in memory."""
+    url = "http://localhost/"
+    cases = []
+    for size in sizes:
+        complete = make_page(size, meta_tags, complete=True)
+        generic = make_page(size, meta_tags, complete=False)
+        text = make_text(size)
+        soup = BeautifulSoup(generic, resolve_parser(parser))
+
+        # Default arguments bind the current page instead of the last one
+        cases += [
+            Case("initialize", size, lambda c=complete: initialize(url, content=c, parser=parser)),
+            Case("parse_generic", size, lambda s=soup: parse_generic(s, url)),
+            Case(
+                "parse_meta", size, lambda s=soup: parse_meta(s, url, "property", META_PROPERTIES)
+            ),
+            Case("parse_open_graph", size, lambda s=soup: parse_open_graph(s, url)),
+            Case("parse_twitter_card", size, lambda s=soup: parse_twitter_card(s, url)),
+            Case("parse_schema", size, lambda s=soup: parse_schema(s, url)),
+            Case(
+                "extract_meta_attributes",
+                size,
+                lambda s=soup: extract_meta_attributes(s, "property", META_PROPERTIES),
+            ),
+            Case("sanitize", size, lambda t=text: sanitize(t)),
+            Case(
+                "webpreview[meta]",
+                size,
+                lambda c=complete: webpreview(url, content=c, parser=parser),
+            ),
+            Case(
+                "webpreview[generic]",
+                size,
+                lambda c=generic: webpreview(url, content=c, parser=parser),
+            ),
+        ]
+    return cases
+
+
+def fetch_cases(
+    base_url: str, session: requests.Session, sizes: List[int], parser: str = "auto"
+) -> List[Case]:
+    """Cases requesting the pages served under ``base_url`` by ``serve``."""
+    cases = []
+    for size in sizes:
+        for kind in ("meta", "generic"):
+            url = f"{base_url}/{kind}-{format_size(size)}"
+            cases.append(
+                Case(
+                    f"webpreview[fetch-{kind}]",
+                    size,
+                    lambda u=url: webpreview(u, session=session, parser=parser),
+                )
+            )
+            cases.append(
+                Case(
+                    f"webpreview[stream-{kind}]",
+                    size,
+                    lambda u=url: webpreview(u, session=session, parser=parser, stream=True),
+                )
+            )
+    return cases
+
+
+def fetch_pages(sizes: List[int], meta_tags: int = 100) -> Dict[str, bytes]:
+    """Pages for ``serve`` matching the URLs of ``fetch_cases``."""
+    pages = {}
+    for size in sizes:
+        for kind in ("meta", "generic"):
+            page = make_page(size, meta_tags, complete=kind == "meta")
+            pages[f"/{kind}-{format_size(size)}"] = page.encode("utf-8")
+    return pages
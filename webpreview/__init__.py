@@ -4,13 +4,50 @@ from .parsers import (
     extract_image,
     extract_meta_attributes,
     make_absolute_url,
+    MetaIndex,
+    HeadParser,
     retrieve_content,
     parse_generic,
     parse_meta,
     parse_open_graph,
     parse_twitter_card,
     parse_schema,
+    parse_json_ld,
     webpreview,
+    webpreview_head,
+    webpreview_many,
+    normalize_url,
+    normalize_urls,
+    extract_image_candidates,
+    webpreview_images,
+)
+from .aio import (
+    AsyncFetcher,
+    async_webpreview,
+)
+from .pool import ParsePool
+from .images import (
+    ImageCandidate,
+    ImageSize,
+    ImageProber,
+    image_size,
+    best_image,
+)
+from .cache import (
+    PreviewCache,
+    MemoryCache,
+    SQLiteCache,
+    set_default_cache,
+    get_default_cache,
+)
+from .breaker import (
+    CircuitBreaker,
+    set_default_breaker,
+    get_default_breaker,
+)
+from .instrument import (
+    PreviewStats,
+    StatsAggregator,
 )
 from .excepts import (
     WebpreviewException,
@@ -18,6 +55,8 @@ from .excepts import (
     EmptyProperties,
     URLNotFound,
     URLUnreachable,
+    UnsupportedContentType,
+    HostUnavailable,
 )
 
 # Compatibility layer
@@ -32,7 +71,6 @@ from .previews import (
 
 from .version import __version__
 
-
 __all__ = [
     # New API
     "extract_title",
@@ -40,19 +78,54 @@ __all__ = [
     "extract_image",
     "extract_meta_attributes",
     "make_absolute_url",
+    "MetaIndex",
+    "HeadParser",
     "retrieve_content",
     "parse_generic",
     "parse_meta",
     "parse_open_graph",
     "parse_twitter_card",
     "parse_schema",
+    "parse_json_ld",
     "webpreview",
+    "webpreview_head",
+    "webpreview_many",
+    "normalize_url",
+    "normalize_urls",
+    # Preview images
+    "extract_image_candidates",
+    "webpreview_images",
+    "ImageCandidate",
+    "ImageSize",
+    "ImageProber",
+    "image_size",
+    "best_image",
+    # Asyncio API
+    "AsyncFetcher",
+    "async_webpreview",
+    # Process pool
+    "ParsePool",
+    # Caches
+    "PreviewCache",
+    "MemoryCache",
+    "SQLiteCache",
+    "set_default_cache",
+    "get_default_cache",
+    # Failing hosts
+    "CircuitBreaker",
+    "set_default_breaker",
+    "get_default_breaker",
+    # Instrumentation
+    "PreviewStats",
+    "StatsAggregator",
     # Exceptions
     "WebpreviewException",
     "EmptyURL",
     "EmptyProperties",
     "URLNotFound",
     "URLUnreachable",
+    "UnsupportedContentType",
+    "HostUnavailable",
     # Compatibility layer
     "PreviewBase",
     "GenericPreview",
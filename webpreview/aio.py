@@ -0,0 +1,295 @@
+"""Asyncio API.
+
+Requires the optional ``httpx`` dependency, installed with ``pip install webpreview[async]``.
+"""
+
+import asyncio
+import time
+import weakref
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+from .breaker import CircuitBreaker, get_default_breaker
+from .excepts import *
+from .fetch import (
+    decode_body,
+    deadline_after,
+    ensure_html,
+    limits_reached,
+    sniff_encoding,
+    timeout_within,
+)
+from .models import WebPreview
+from .flight import get_default_single_flight
+from .parsers import cache_key, validate_properties, validate_url, webpreview
+
+
+async def aiter_body(
+    res: "httpx.Response",
+    max_bytes: Optional[int] = None,
+    deadline: Optional[float] = None,
+    min_rate: Optional[float] = None,
+) -> AsyncIterator[bytes]:
+    """Yield pieces of the streamed response body as they arrive. See ``iter_body``."""
+    started = time.monotonic()
+    received = 0
+    async for chunk in res.aiter_bytes():
+        if max_bytes is not None and received + len(chunk) >= max_bytes:
+            yield chunk[: max_bytes - received]
+            break
+        received += len(chunk)
+        yield chunk
+        if limits_reached(received, started, deadline, min_rate):
+            break
+
+
+class AsyncFetcher:
+    """Pool of keep-alive connections shared by asynchronous requests.
+
+    Args:
+        max_connections (int): Maximum number of simultaneously open connections.
+        max_connections_per_host (int): Maximum number of simultaneous requests to
+            a single host.
+        keepalive_expiry (float): Seconds an idle connection is kept open for reuse.
+        headers (dict): Headers sent with every request.
+        http2 (bool): Use HTTP/2 with servers that support it, multiplexing requests
+            to a host over a single connection. Requires ``webpreview[http2]``.
+
+    Example:
+        >>> async with AsyncFetcher(max_connections_per_host=2) as fetcher:
+        ...     p = await async_webpreview("https://example.com", fetcher=fetcher)
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_connections_per_host: int = 6,
+        keepalive_expiry: float = 5.0,
+        headers: Optional[Dict[str, str]] = None,
+        http2: bool = False,
+    ) -> None:
+        if httpx is None:
+            raise ImportError("Install webpreview[async] to use the asynchronous API.")
+
+        self.max_connections_per_host = max_connections_per_host
+        self._client = httpx.AsyncClient(
+            headers=headers,
+            http2=http2,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+        # Semaphore of every host with requests in flight, and the number of those requests
+        self._hosts: Dict[str, Tuple[asyncio.Semaphore, int]] = {}
+
+    @asynccontextmanager
+    async def _host_limit(self, url: str) -> AsyncIterator[None]:
+        host = urlsplit(url).netloc.lower()
+        limit, users = self._hosts.get(host, (None, 0))
+        if limit is None:
+            limit = asyncio.Semaphore(self.max_connections_per_host)
+        self._hosts[host] = (limit, users + 1)
+        try:
+            async with limit:
+                yield
+        finally:
+            # Forget the semaphore once the host is idle, so that it doesn't pile up
+            limit, users = self._hosts[host]
+            if users == 1:
+                del self._hosts[host]
+            else:
+                self._hosts[host] = (limit, users - 1)
+
+    async def fetch(
+        self,
+        url: str,
+        timeout: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None,
+        max_bytes: Optional[int] = None,
+        deadline: Optional[float] = None,
+        min_rate: Optional[float] = None,
+    ) -> str:
+        """Retrieve content of the page.
+
+        The page is streamed within the same limits as ``retrieve_content`` does, and
+        pages that are not HTML according to their Content-Type are rejected with
+        ``UnsupportedContentType`` before their body is downloaded.
+        """
+        timeout = timeout_within(timeout, deadline)
+        deadline = deadline_after(deadline)
+        async with self._host_limit(url):
+            try:
+                async with self._client.stream("GET", url, timeout=timeout, headers=headers) as res:
+                    if res.status_code == 404:
+                        raise URLNotFound("The web page does not exist.")
+                    ensure_html(res.headers)
+                    chunks = aiter_body(
+                        res, max_bytes=max_bytes, deadline=deadline, min_rate=min_rate
+                    )
+                    body = b"".join([chunk async for chunk in chunks])
+            except (httpx.TransportError, httpx.TooManyRedirects):
+                raise URLUnreachable("The URL is unreachable.")
+
+        # Decode with the sniffed encoding rather than guessing it from the whole body
+        return decode_body(body, sniff_encoding(body, res.charset_encoding))
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "AsyncFetcher":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+
+# Connections can't be shared between event loops, so each one gets its own pool
+_default_fetchers = weakref.WeakKeyDictionary()  # type: ignore
+
+
+def get_default_fetcher() -> AsyncFetcher:
+    """Return the fetcher shared by all calls within the running event loop."""
+    loop = asyncio.get_running_loop()
+    fetcher = _default_fetchers.get(loop)
+    if fetcher is None:
+        fetcher = _default_fetchers[loop] = AsyncFetcher()
+    return fetcher
+
+
+async def async_webpreview(
+    url: str,
+    timeout: Optional[float] = None,
+    headers: Optional[Dict[str, str]] = None,
+    content: Optional[str] = None,
+    target_attribute: Optional[str] = None,
+    properties: Optional[List[str]] = None,
+    parser: str = "auto",
+    absolute_url: bool = False,
+    fetcher: Optional[AsyncFetcher] = None,
+    executor: Optional[Executor] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    coalesce: bool = True,
+    max_bytes: Optional[int] = None,
+    deadline: Optional[float] = None,
+    min_rate: Optional[float] = None,
+) -> WebPreview:
+    """Extract title, description and image from any page without blocking the event loop.
+
+    Follows the same fallback mechanism as ``webpreview``. The page is requested through
+    a pooled asynchronous client, while parsing runs in an executor.
+
+    Args:
+        url (str): URL of the page.
+        timeout (float): Timeout in seconds to wait for the page's source.
+        headers (dict): Request headers.
+        content (str): Page's content. When given, no request is made.
+        target_attribute (str): Manually specify which meta tag attribute to parse
+            as a source of properties.
+        properties (list): Manually specify which meta tag properties to parse. Must be
+            specified together with ``target_attribute``.
+        parser (str): Which parser type to give to BeautifulSoup library. See ``webpreview``.
+        absolute_url (bool): Convert preview image URL to absolute URL. Defaults to False.
+        fetcher (AsyncFetcher): Connection pool to use. Defaults to the one shared
+            within the running event loop.
+        executor (Executor): Executor to parse the page in. Defaults to the event
+            loop's default executor.
+        breaker (CircuitBreaker): Tracker of failing pages and hosts. See ``webpreview``.
+        coalesce (bool): Let concurrent calls for the same page within the event loop,
+            with the same options, headers and ``fetcher``, share a single request and
+            parsing. See ``webpreview``. Defaults to True.
+        max_bytes (int): Stop downloading the page after this many bytes.
+        deadline (float): Stop downloading the page after this many seconds since the
+            request was made.
+        min_rate (float): Stop downloading the page if it arrives slower than this many
+            bytes per second.
+
+        Whatever was downloaded before any of the limits was reached is still parsed.
+        Pages that are not HTML according to their Content-Type are rejected with
+        ``UnsupportedContentType`` before their body is downloaded.
+
+    Returns:
+        WebPreview: object with extracted fields.
+    """
+    url = validate_url(url)
+    validate_properties(target_attribute, properties)
+
+    if not content and coalesce:
+        # Concurrent calls for the same page wait for the first one instead of repeating it
+        key = (
+            cache_key(url, target_attribute, properties, absolute_url),
+            frozenset(headers.items()) if headers else None,
+            (parser, timeout, max_bytes, deadline, min_rate),
+            (id(fetcher), id(breaker)),
+        )
+        preview = partial(
+            async_webpreview,
+            url,
+            timeout,
+            headers,
+            None,
+            target_attribute,
+            properties,
+            parser,
+            absolute_url,
+            fetcher=fetcher,
+            executor=executor,
+            breaker=breaker,
+            coalesce=False,
+            max_bytes=max_bytes,
+            deadline=deadline,
+            min_rate=min_rate,
+        )
+        try:
+            wait = timeout_within(timeout, deadline)
+            return await get_default_single_flight().do_async(key, preview, wait)
+        except asyncio.TimeoutError:
+            raise URLUnreachable("The URL is unreachable.")
+
+    if not content:
+        if breaker is None:
+            breaker = get_default_breaker()
+        if breaker is not None:
+            breaker.check(url)
+
+        fetcher = fetcher or get_default_fetcher()
+        try:
+            content = await fetcher.fetch(url, timeout, headers, max_bytes, deadline, min_rate)
+        except (URLNotFound, URLUnreachable) as e:
+            if breaker is not None:
+                breaker.record_failure(url, e)
+            raise
+        except UnsupportedContentType:
+            # The host has answered, even though not with a web page
+            if breaker is not None:
+                breaker.record_success(url)
+            raise
+        if breaker is not None:
+            breaker.record_success(url)
+        # Nothing to parse, and webpreview would otherwise request the page again
+        if not content:
+            return WebPreview(url=url)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor,
+        partial(
+            webpreview,
+            url,
+            content=content,
+            target_attribute=target_attribute,
+            properties=properties,
+            parser=parser,
+            absolute_url=absolute_url,
+        ),
+    )
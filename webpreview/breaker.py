@@ -0,0 +1,154 @@
+"""Tracking of failing pages and hosts.
+
+A breaker can be passed to ``webpreview`` directly or set as the default for all calls:
+
+    >>> from webpreview import CircuitBreaker, set_default_breaker
+    >>> set_default_breaker(CircuitBreaker(failure_threshold=5, backoff=10))
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple, Type
+from urllib.parse import urlsplit
+
+from .excepts import *
+
+
+class HostState:
+    """
+    Consecutive failures of a host and, once they trip the circuit, when it may be probed.
+    """
+
+    def __init__(self) -> None:
+        self.failures = 0
+        self.backoff = 0.0
+        self.open_until = 0.0
+
+    def is_open(self) -> bool:
+        return self.backoff > 0
+
+
+class CircuitBreaker:
+    """
+    Fails fast on pages that failed recently and on hosts that keep failing.
+
+    Pages raising ``URLNotFound`` or ``URLUnreachable`` are remembered for
+    ``negative_ttl`` seconds, during which the same exception is raised again without
+    requesting them. Once a host is unreachable ``failure_threshold`` times in a row,
+    its circuit opens and all of its pages raise ``HostUnavailable`` for ``backoff``
+    seconds. After that, a single request is let through to probe the host. If it
+    succeeds, the circuit closes, otherwise it stays open for twice as long, up to
+    ``max_backoff`` seconds.
+
+    Args:
+        failure_threshold (int): Consecutive failures that open the circuit of a host.
+        backoff (float): Seconds the circuit stays open after it first opens.
+        max_backoff (float): Longest time the circuit stays open between probes.
+        negative_ttl (float): Seconds a failed page is remembered. ``0`` disables it.
+        maxsize (int): Number of failed pages, and of failing hosts, remembered. The least
+            recently failed ones are forgotten first.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        backoff: float = 5.0,
+        max_backoff: float = 300.0,
+        negative_ttl: float = 60.0,
+        maxsize: int = 10000,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.negative_ttl = negative_ttl
+        self.maxsize = maxsize
+        self._hosts: "OrderedDict[str, HostState]" = OrderedDict()
+        self._failed: "OrderedDict[str, Tuple[float, Type[Exception], tuple]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, url: str) -> None:
+        """Raise the exception a request to the URL is bound to end with, if it is known.
+
+        Raises:
+            URLNotFound, URLUnreachable: The page failed less than ``negative_ttl`` ago.
+            HostUnavailable: The circuit of the page's host is open.
+        """
+        now = time.monotonic()
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            failed = self._failed.get(url)
+            if failed is not None:
+                expires, exception_type, args = failed
+                if expires > now:
+                    raise exception_type(*args)
+                del self._failed[url]
+
+            state = self._hosts.get(host)
+            if state is None or not state.is_open():
+                return
+            if state.open_until > now:
+                retry_after = state.open_until - now
+                raise HostUnavailable(f"The host is failing, retry in {retry_after:.1f}s.")
+            # Half-open: let this request probe the host, while others keep failing fast
+            state.open_until = now + state.backoff
+
+    def record_success(self, url: str) -> None:
+        """Close the circuit of the page's host, which is reachable."""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            self._hosts.pop(host, None)
+
+    def record_failure(self, url: str, exception: Exception) -> None:
+        """Remember the failed page and, if its host is unreachable, count the failure."""
+        now = time.monotonic()
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if self.negative_ttl > 0:
+                self._failed[url] = (now + self.negative_ttl, type(exception), exception.args)
+                self._failed.move_to_end(url)
+                while len(self._failed) > self.maxsize:
+                    self._failed.popitem(last=False)
+
+            if not isinstance(exception, URLUnreachable):
+                # The host has answered, even though the page is missing
+                self._hosts.pop(host, None)
+                return
+
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = HostState()
+            self._hosts.move_to_end(host)
+            while len(self._hosts) > self.maxsize:
+                self._hosts.popitem(last=False)
+            state.failures += 1
+            if state.is_open():
+                state.backoff = min(state.backoff * 2, self.max_backoff)
+            elif state.failures >= self.failure_threshold:
+                state.backoff = self.backoff
+            else:
+                return
+            state.open_until = now + state.backoff
+
+    def is_open(self, url: str) -> bool:
+        """Check whether the circuit of the page's host is open."""
+        state = self._hosts.get(urlsplit(url).netloc.lower())
+        return state is not None and state.is_open()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hosts.clear()
+            self._failed.clear()
+
+
+_default_breaker: Optional[CircuitBreaker] = None
+
+
+def set_default_breaker(breaker: Optional[CircuitBreaker]) -> None:
+    """Set the breaker used by all calls that don't supply their own. ``None`` disables it."""
+    global _default_breaker
+    _default_breaker = breaker
+
+
+def get_default_breaker() -> Optional[CircuitBreaker]:
+    return _default_breaker
@@ -0,0 +1,357 @@
+"""Caches of extracted previews.
+
+A cache can be passed to ``webpreview`` directly or set as the default for all calls:
+
+    >>> from webpreview import MemoryCache, set_default_cache
+    >>> set_default_cache(MemoryCache(maxsize=10000, ttl=600))
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional
+
+from .models import WebPreview
+
+# Reads of an SQLite cache whose recency is written to the database in one transaction
+SQLITE_USED_BATCH = 100
+# Share of an SQLite cache evicted at once when it is full, so that not every insert evicts
+SQLITE_EVICT_FRACTION = 0.1
+
+
+class CacheEntry:
+    """
+    Preview stored in the cache together with the validators of the page it was parsed from.
+    """
+
+    def __init__(
+        self,
+        preview: WebPreview,
+        expires: float,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        self.preview = preview
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_fresh(self) -> bool:
+        return self.expires > time.time()
+
+    def can_revalidate(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Request headers asking the server to reply with 304 if the page has not changed."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def cache_control(headers: Mapping[str, str]) -> Dict[str, str]:
+    """Parse directives of the Cache-Control header."""
+    directives = {}
+    for directive in headers.get("Cache-Control", "").split(","):
+        name, _, value = directive.partition("=")
+        if name.strip():
+            directives[name.strip().lower()] = value.strip().strip('"')
+    return directives
+
+
+def freshness_lifetime(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds the response stays fresh according to its headers, ``None`` if not specified.
+
+    See: https://www.rfc-editor.org/rfc/rfc9111#section-4.2.1
+    """
+    directives = cache_control(headers)
+    if "no-cache" in directives or "no-store" in directives:
+        return 0
+
+    try:
+        age = float(headers.get("Age", 0))
+    except ValueError:
+        age = 0
+
+    if "max-age" in directives:
+        try:
+            return max(0, float(directives["max-age"]) - age)
+        except ValueError:
+            return 0
+
+    if "Expires" in headers:
+        try:
+            expires = parsedate_to_datetime(headers["Expires"])
+            date = parsedate_to_datetime(headers["Date"]) if "Date" in headers else None
+        except (TypeError, ValueError, IndexError):
+            # Invalid dates mean the response has already expired
+            return 0
+        now = date.timestamp() if date else time.time()
+        return max(0, expires.timestamp() - now - age)
+
+    return None
+
+
+class PreviewCache(ABC):
+    """
+    Base for all preview caches.
+
+    Entries expire ``ttl`` seconds after they were stored, unless the page's response
+    specifies its own freshness lifetime. Expired entries with an ETag or Last-Modified
+    validator are kept around, so that the page can be revalidated instead of
+    downloaded again. Once the cache holds ``maxsize`` entries, the least recently
+    used ones are evicted.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[WebPreview]:
+        """Return the preview stored under the key unless it has expired."""
+        entry = self.get_entry(key)
+        if entry is None or not entry.is_fresh():
+            return None
+        return entry.preview
+
+    @abstractmethod
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry stored under the key, even expired, if it can be revalidated."""
+
+    @abstractmethod
+    def set(
+        self,
+        key: str,
+        preview: WebPreview,
+        ttl: Optional[float] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Store the preview under the key for ``ttl`` seconds or the default time."""
+
+    def store_response(
+        self,
+        key: str,
+        preview: WebPreview,
+        headers: Mapping[str, str],
+        entry: Optional[CacheEntry] = None,
+    ) -> None:
+        """Store the preview according to the caching headers of the page's response.
+
+        When the response revalidates an existing ``entry``, its validators are kept
+        unless the response supplies new ones.
+        """
+        if "no-store" in cache_control(headers):
+            self.delete(key)
+            return
+
+        self.set(
+            key,
+            preview,
+            ttl=freshness_lifetime(headers),
+            etag=headers.get("ETag") or (entry.etag if entry else None),
+            last_modified=headers.get("Last-Modified") or (entry.last_modified if entry else None),
+        )
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the entry stored under the key, if there is one."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+
+
+class MemoryCache(PreviewCache):
+    """
+    Cache keeping previews in memory of the current process.
+
+    Stored previews are returned as is, without copying, so they are shared
+    between all callers.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600) -> None:
+        super().__init__(maxsize, ttl)
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not entry.is_fresh() and not entry.can_revalidate():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(
+        self,
+        key: str,
+        preview: WebPreview,
+        ttl: Optional[float] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        entry = CacheEntry(preview, expires, etag, last_modified)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(PreviewCache):
+    """
+    Cache keeping previews in an SQLite database on disk.
+
+    The database survives restarts and can be shared between processes. The time a
+    preview was last used is recorded in batches, and once the cache is full, a tenth
+    of ``maxsize`` is evicted at once. Previews stored by other processes are only
+    counted towards ``maxsize`` when this one evicts.
+    """
+
+    def __init__(self, path: str, maxsize: int = 100000, ttl: float = 3600) -> None:
+        super().__init__(maxsize, ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS previews ("
+            "key TEXT PRIMARY KEY, preview TEXT NOT NULL, expires REAL NOT NULL, "
+            "etag TEXT, last_modified TEXT, used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS previews_used ON previews (used)")
+        self._count = self._db.execute("SELECT COUNT(*) FROM previews").fetchone()[0]
+        # Times previews were read at, not yet written to the database
+        self._used: Dict[str, float] = {}
+
+    def _flush_used(self) -> None:
+        if not self._used:
+            return
+        self._db.execute("BEGIN")
+        try:
+            self._db.executemany(
+                "UPDATE previews SET used = ? WHERE key = ?",
+                [(used, key) for key, used in self._used.items()],
+            )
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+        self._used.clear()
+
+    def _evict(self) -> None:
+        # Other processes may have stored or evicted previews since it was last counted
+        self._count = self._db.execute("SELECT COUNT(*) FROM previews").fetchone()[0]
+        if self._count <= self.maxsize:
+            return
+        excess = self._count - self.maxsize + int(self.maxsize * SQLITE_EVICT_FRACTION)
+        self._flush_used()
+        deleted = self._db.execute(
+            "DELETE FROM previews WHERE key IN (SELECT key FROM previews ORDER BY used LIMIT ?)",
+            (excess,),
+        ).rowcount
+        self._count -= deleted
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT preview, expires, etag, last_modified FROM previews WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            entry = CacheEntry(WebPreview(**json.loads(row[0])), row[1], row[2], row[3])
+            if not entry.is_fresh() and not entry.can_revalidate():
+                self._count -= self._db.execute(
+                    "DELETE FROM previews WHERE key = ?", (key,)
+                ).rowcount
+                self._used.pop(key, None)
+                return None
+            self._used[key] = now
+            if len(self._used) >= SQLITE_USED_BATCH:
+                self._flush_used()
+        return entry
+
+    def set(
+        self,
+        key: str,
+        preview: WebPreview,
+        ttl: Optional[float] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        value = json.dumps(preview.to_dict(exclude_none=False))
+        with self._lock:
+            self._used.pop(key, None)
+            updated = self._db.execute(
+                "UPDATE previews SET preview = ?, expires = ?, etag = ?, last_modified = ?, "
+                "used = ? WHERE key = ?",
+                (value, expires, etag, last_modified, now, key),
+            ).rowcount
+            if updated:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO previews "
+                "(key, preview, expires, etag, last_modified, used) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value, expires, etag, last_modified, now),
+            )
+            self._count += 1
+            if self._count > self.maxsize:
+                self._evict()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._used.pop(key, None)
+            self._count -= self._db.execute("DELETE FROM previews WHERE key = ?", (key,)).rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._used.clear()
+            self._db.execute("DELETE FROM previews")
+            self._count = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_used()
+        self._db.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM previews").fetchone()[0]
+
+
+_default_cache: Optional[PreviewCache] = None
+
+
+def set_default_cache(cache: Optional[PreviewCache]) -> None:
+    """Set the cache used by all calls that don't supply their own. ``None`` disables it."""
+    global _default_cache
+    _default_cache = cache
+
+
+def get_default_cache() -> Optional[PreviewCache]:
+    return _default_cache
@@ -1,31 +1,181 @@
+import json
+import os
+import sys
 from argparse import ArgumentParser
+from typing import IO, Iterable, Iterator, Set, Union
 
 from .excepts import *
+from .parsers import normalize_url, webpreview_many
+from .pool import ParsePool
 from .previews import *
 from .version import __version__
 
 
+def read_urls(lines: Iterable[str]) -> Iterator[str]:
+    """Yield URLs from the lines, skipping blank lines and comments starting with "#"."""
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def url_key(url: str) -> str:
+    """Normalized URL, or the URL as is when it is invalid."""
+    try:
+        return normalize_url(url)
+    except (WebpreviewException, InvalidURL):
+        return url
+
+
+def completed_urls(path: str) -> Set[str]:
+    """Collect URLs already written to the JSON Lines output by a previous run.
+
+    A partially written last line, left behind by an interrupted run, is removed
+    from the file so that new results can be appended after it.
+    """
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+
+    with open(path, "rb+") as f:
+        end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            end += len(line)
+            try:
+                done.add(json.loads(line)["url"])
+            except (ValueError, KeyError, TypeError):
+                continue
+        f.truncate(end)
+    return done
+
+
+def format_result(url: str, result: Union[WebPreview, Exception], output_format: str) -> str:
+    if output_format == "jsonl":
+        if isinstance(result, Exception):
+            record = {"url": url, "error": type(result).__name__, "message": str(result)}
+        else:
+            record = result.to_dict(exclude_none=False)
+            record["url"] = url
+        return json.dumps(record, ensure_ascii=False)
+
+    if isinstance(result, Exception):
+        return f"url: {url}\nerror: {type(result).__name__}: {result}\n"
+    return (
+        f"url: {url}\n"
+        f"title: {result.title}\n"
+        f"description: {result.description}\n"
+        f"image: {result.image}\n"
+    )
+
+
+def run_batch(args, output: IO[str]) -> None:
+    """Preview every URL of the input concurrently, writing results as they finish."""
+    source = sys.stdin if args.input == "-" else open(args.input)
+    parse_pool = None
+    try:
+        urls = read_urls(source)
+        if args.resume:
+            done = completed_urls(args.output)
+            urls = (url for url in urls if url_key(url) not in done)
+
+        if args.processes:
+            parse_pool = ParsePool(args.processes)
+        results = webpreview_many(
+            urls,
+            concurrency=args.jobs,
+            per_host=args.per_host,
+            timeout=args.timeout,
+            absolute_url=args.absolute_url,
+            parse_pool=parse_pool,
+            http2=args.http2,
+        )
+        for url, result in results:
+            # Flushed line by line, so that an interrupted run can be resumed
+            print(format_result(url, result, args.format), file=output, flush=True)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if parse_pool is not None:
+            parse_pool.close()
+
+
 def main() -> None:
     parser = ArgumentParser(
         prog="webpreview",
         description=f"v{__version__} Extracts OpenGraph, TwitterCard and Schema properties from a webpage.",
     )
-    parser.add_argument("url", type=str, help="URL to parse")
+    parser.add_argument("url", type=str, nargs="?", help="URL to parse")
     parser.add_argument(
         "--timeout", "-t", type=int, help="Timeout in seconds when requestion URL", default=30
     )
     parser.add_argument(
         "--absolute-url", "-a", help="Convert returned urls to absolute", action="store_true"
     )
+    parser.add_argument(
+        "--input", "-i", help='File with one URL per line to parse, "-" for stdin', default=None
+    )
+    parser.add_argument(
+        "--jobs", "-j", type=int, help="Number of URLs parsed concurrently", default=8
+    )
+    parser.add_argument(
+        "--per-host", type=int, help="Maximum simultaneous connections to a host", default=2
+    )
+    parser.add_argument(
+        "--http2",
+        help="Request pages over HTTP/2 where supported, requires webpreview[http2]",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--processes",
+        "-p",
+        type=int,
+        help="Number of worker processes parsing the pages, by default they are parsed in threads",
+        default=None,
+    )
+    parser.add_argument(
+        "--format",
+        "-f",
+        choices=["text", "jsonl"],
+        help='Output format, "jsonl" by default for --input and "text" otherwise',
+        default=None,
+    )
+    parser.add_argument("--output", "-o", help="File to write the results to instead of stdout")
+    parser.add_argument(
+        "--resume",
+        help="Skip URLs already present in the --output file and append to it",
+        action="store_true",
+    )
     parser.add_argument("--version", "-V", action="version", version=f"%(prog)s {__version__}")
     args = parser.parse_args()
 
+    if bool(args.url) == bool(args.input):
+        parser.error("pass either a URL or --input")
+    if args.resume and not (args.output and args.input):
+        parser.error("--resume requires --input and --output")
+
+    if args.input:
+        args.format = args.format or "jsonl"
+        if args.resume and args.format != "jsonl":
+            parser.error("--resume requires the jsonl format")
+        if not args.output:
+            run_batch(args, sys.stdout)
+        else:
+            with open(args.output, "a" if args.resume else "w", encoding="utf-8") as output:
+                run_batch(args, output)
+        return
+
     preview = webpreview(
         url=args.url,
         timeout=args.timeout,
         absolute_url=args.absolute_url,
     )
 
+    if args.format == "jsonl":
+        print(format_result(preview.url, preview, "jsonl"))
+        return
+
     print(
         (
             f"title: {preview.title}\n"
@@ -44,3 +44,19 @@ class URLUnreachable(WebpreviewException):
     """
 
     pass
+
+
+class UnsupportedContentType(WebpreviewException):
+    """
+    WebpreviewException for URLs that point to something else than a web page.
+    """
+
+    pass
+
+
+class HostUnavailable(URLUnreachable):
+    """
+    WebpreviewException for URLs whose host keeps failing, raised without requesting them.
+    """
+
+    pass
@@ -0,0 +1,331 @@
+"""Fetching of web pages."""
+
+import codecs
+import time
+from typing import Dict, Iterator, Mapping, Optional, Tuple, Union
+
+import requests
+from requests.exceptions import *
+from urllib3.exceptions import HTTPError as TransportError
+
+from .excepts import *
+from .regex import HEAD_END, META_CHARSET
+
+
+# Timeout in seconds, or a (connect, read) tuple of them, as accepted by requests
+TimeoutValue = Union[float, Tuple[Optional[float], Optional[float]]]
+
+# Media types that are parsed as web pages. Pages without Content-Type are parsed too,
+# while other text types, such as text/csv or the endless text/event-stream, are not.
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+# Seconds of downloading after which the transfer rate is checked against ``min_rate``
+MIN_RATE_GRACE_PERIOD = 1.0
+
+# Bytes at the start of the page searched for a <meta> charset declaration
+SNIFF_BYTES = 4096
+
+# Byte order marks, which take precedence over any declared charset
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+# Browsers decode pages labelled with these charsets as windows-1252
+WINDOWS_1252_ALIASES = ("ascii", "iso8859-1", "latin-1")
+
+
+def ensure_html(headers: Mapping[str, str]) -> None:
+    """Reject responses that are definitely not web pages, such as PDFs, videos or archives,
+    given their headers."""
+    content_type = headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+    if content_type and content_type not in HTML_CONTENT_TYPES:
+        raise UnsupportedContentType(f"The URL points to {content_type}, not a web page.")
+
+
+def check_content_type(res: requests.Response) -> None:
+    """Reject responses that are definitely not web pages, closing them. See ``ensure_html``."""
+    try:
+        ensure_html(res.headers)
+    except UnsupportedContentType:
+        res.close()
+        raise
+
+
+def header_charset(res: requests.Response) -> Optional[str]:
+    """Return the charset of the Content-Type header.
+
+    Unlike ``res.encoding``, no charset is assumed when the header has none.
+    """
+    for parameter in res.headers.get("Content-Type", "").split(";")[1:]:
+        name, _, value = parameter.partition("=")
+        if name.strip().lower() == "charset":
+            return value.strip().strip("\"'") or None
+    return None
+
+
+def lookup_encoding(label: Optional[str]) -> Optional[str]:
+    """Return the name of the Python codec for the charset label, if there is one."""
+    if not label:
+        return None
+    try:
+        name = codecs.lookup(label).name
+    except LookupError:
+        return None
+    return "cp1252" if name in WINDOWS_1252_ALIASES else name
+
+
+def sniff_encoding(body: bytes, declared: Optional[str] = None) -> str:
+    """Determine the encoding of the page by looking at its start only.
+
+    A byte order mark wins, followed by the ``declared`` charset, usually that of the
+    Content-Type header, and then a ``<meta>`` declaration within the first
+    ``SNIFF_BYTES`` of the page. Pages that declare nothing are taken as UTF-8.
+    The body is never decoded or run through a charset detector.
+    """
+    for bom, encoding in BOMS:
+        if body.startswith(bom):
+            return encoding
+
+    encoding = lookup_encoding(declared)
+    if encoding is None:
+        match = META_CHARSET.search(body, 0, SNIFF_BYTES)
+        if match:
+            encoding = lookup_encoding(match.group(1).decode("ascii"))
+            # A page can't be parsed as ASCII to find a UTF-16 declaration in the first place
+            if encoding is not None and encoding.startswith("utf-16"):
+                encoding = "utf-8"
+    return encoding or "utf-8"
+
+
+def decode_body(body: bytes, encoding: str) -> str:
+    """Decode the page, dropping the byte order mark and replacing invalid bytes."""
+    text = body.decode(encoding, errors="replace")
+    return text[1:] if text.startswith("\ufeff") else text
+
+
+def request_page(
+    url: str,
+    timeout: Optional[float] = None,
+    headers: Optional[Dict[str, str]] = None,
+    stream: bool = False,
+    session: Optional[requests.Session] = None,
+) -> requests.Response:
+    """Request the page and check that it exists and is a web page.
+
+    With ``stream``, the body is not downloaded until it is read from the response.
+    """
+    try:
+        res = (session or requests).get(url, timeout=timeout, headers=headers, stream=stream)
+    except (ConnectionError, HTTPError, Timeout, TooManyRedirects):
+        raise URLUnreachable("The URL is unreachable.")
+
+    if res.status_code == 404:
+        res.close()
+        raise URLNotFound("The web page does not exist.")
+
+    if res.status_code != 304:
+        check_content_type(res)
+
+    return res
+
+
+def limits_reached(
+    received: int, started: float, deadline: Optional[float], min_rate: Optional[float]
+) -> bool:
+    """Check whether a download that began at ``started`` and has ``received`` bytes so far
+    has passed the ``deadline`` or become slower than ``min_rate`` bytes per second."""
+    now = time.monotonic()
+    if deadline is not None and now >= deadline:
+        return True
+    elapsed = now - started
+    return bool(min_rate) and elapsed >= MIN_RATE_GRACE_PERIOD and received < min_rate * elapsed
+
+
+def iter_body(
+    res: requests.Response,
+    chunk_size: int = 16384,
+    max_bytes: Optional[int] = None,
+    deadline: Optional[float] = None,
+    min_rate: Optional[float] = None,
+) -> Iterator[bytes]:
+    """Yield pieces of the streamed response body as they arrive.
+
+    Reading stops early, without an error, once ``max_bytes`` are received, the
+    ``deadline`` (a ``time.monotonic`` timestamp) has passed, or the transfer rate
+    drops below ``min_rate`` bytes per second. The connection is released as soon
+    as the generator is closed, so the caller can stop reading at any point too.
+    """
+    # Unlike read, read1 returns whatever has arrived instead of waiting for the whole chunk.
+    # It is missing in urllib3 before 2.0.
+    read = getattr(res.raw, "read1", res.raw.read)
+    started = time.monotonic()
+    received = 0
+    try:
+        while max_bytes is None or received < max_bytes:
+            size = chunk_size if max_bytes is None else min(chunk_size, max_bytes - received)
+            chunk = read(size, decode_content=True)
+            if not chunk:
+                break
+            received += len(chunk)
+            yield chunk
+            if limits_reached(received, started, deadline, min_rate):
+                break
+    except (TransportError, OSError):
+        raise URLUnreachable("The URL is unreachable.")
+    finally:
+        res.close()
+
+
+def iter_text(
+    res: requests.Response,
+    chunk_size: int = 16384,
+    max_bytes: Optional[int] = None,
+    deadline: Optional[float] = None,
+    min_rate: Optional[float] = None,
+) -> Iterator[str]:
+    """Yield decoded pieces of the streamed response body as they arrive. See ``iter_body``.
+
+    The encoding is sniffed once the first ``SNIFF_BYTES`` of the page, its charset
+    declaration or the end of its head have arrived.
+    """
+    chunks = iter_body(res, chunk_size, max_bytes, deadline, min_rate)
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= SNIFF_BYTES or HEAD_END.search(head):
+            break
+        # Don't wait for more of a page that declares its charset, unless the name is cut
+        declaration = META_CHARSET.search(head)
+        if declaration and declaration.end() < len(head):
+            break
+
+    encoding = sniff_encoding(head, header_charset(res))
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    text = decoder.decode(head)
+    if text.startswith("\ufeff"):
+        text = text[1:]
+    if text:
+        yield text
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+def read_body(
+    res: requests.Response,
+    max_bytes: Optional[int] = None,
+    deadline: Optional[float] = None,
+    min_rate: Optional[float] = None,
+) -> bytes:
+    """Read the raw streamed response body within the limits. See ``iter_body``."""
+    return b"".join(iter_body(res, max_bytes=max_bytes, deadline=deadline, min_rate=min_rate))
+
+
+def read_content(
+    res: requests.Response,
+    max_bytes: Optional[int] = None,
+    deadline: Optional[float] = None,
+    min_rate: Optional[float] = None,
+) -> str:
+    """Read and decode the streamed response body within the limits. See ``iter_body``."""
+    body = read_body(res, max_bytes, deadline, min_rate)
+    return decode_body(body, sniff_encoding(body, header_charset(res)))
+
+
+def bytes_received(res: requests.Response, body: Optional[bytes] = None) -> int:
+    """Bytes of the response body received over the wire, before decompression.
+
+    Falls back to the length of the ``body`` if the transport doesn't count them.
+    """
+    tell = getattr(res.raw, "tell", None)
+    if tell is not None:
+        return tell()
+    return len(body) if body else 0
+
+
+def deadline_after(seconds: Optional[float]) -> Optional[float]:
+    """Turn the number of seconds into a ``time.monotonic`` deadline."""
+    return None if seconds is None else time.monotonic() + seconds
+
+
+def timeout_within(
+    timeout: Optional[TimeoutValue], deadline: Optional[float]
+) -> Optional[TimeoutValue]:
+    """Shorten the timeout so that neither the connection nor any piece of the page may
+    take longer than the ``deadline`` in seconds.
+
+    A ``(connect, read)`` tuple, as accepted by requests, has each part shortened.
+    """
+    if deadline is None:
+        return timeout
+    if isinstance(timeout, tuple):
+        return tuple(deadline if t is None else min(t, deadline) for t in timeout)
+    return deadline if timeout is None else min(timeout, deadline)
+
+
+def total_timeout(timeout: Optional[TimeoutValue]) -> Optional[float]:
+    """Reduce a ``(connect, read)`` timeout tuple to the sum of its parts.
+
+    ``None`` is returned when any part is ``None``, as that part doesn't time out.
+    """
+    if not isinstance(timeout, tuple):
+        return timeout
+    if any(t is None for t in timeout):
+        return None
+    return sum(timeout)
+
+
+def retrieve_content(
+    url: str,
+    timeout: Optional[float] = None,
+    headers: Optional[Dict[str, str]] = None,
+    session: Optional[requests.Session] = None,
+    max_bytes: Optional[int] = None,
+    deadline: Optional[float] = None,
+    min_rate: Optional[float] = None,
+) -> str:
+    """Retrieve content of the page.
+
+    Args:
+        url (str): URL of the page.
+        timeout (float): Timeout in seconds for requests library to wait for the
+            connection and for each piece of the page.
+        headers (dict): Request headers to pass to the requests library.
+        session (requests.Session): Session to request the page with.
+        max_bytes (int): Stop downloading after this many bytes of the page.
+        deadline (float): Stop downloading after this many seconds since the request.
+            Waiting for the connection and for each piece never exceeds it either.
+        min_rate (float): Stop downloading if the page arrives slower than this many
+            bytes per second.
+
+    Returns:
+        Content of the page, which is cut short if any of the limits is reached. It is
+        decoded with the encoding found by ``sniff_encoding``.
+    """
+    timeout = timeout_within(timeout, deadline)
+    deadline = deadline_after(deadline)
+    res = request_page(url, timeout, headers, stream=True, session=session)
+    return read_content(res, max_bytes, deadline, min_rate)
+
+
+def stream_content(
+    url: str,
+    timeout: Optional[float] = None,
+    headers: Optional[Dict[str, str]] = None,
+    chunk_size: int = 16384,
+    session: Optional[requests.Session] = None,
+    max_bytes: Optional[int] = None,
+    deadline: Optional[float] = None,
+    min_rate: Optional[float] = None,
+) -> Iterator[str]:
+    """Yield decoded pieces of the page as they arrive. See ``retrieve_content``."""
+    timeout = timeout_within(timeout, deadline)
+    deadline = deadline_after(deadline)
+    res = request_page(url, timeout, headers, stream=True, session=session)
+    return iter_text(res, chunk_size, max_bytes, deadline, min_rate)
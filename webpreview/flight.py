@@ -0,0 +1,105 @@
+"""Coalescing of concurrent previews of the same page.
+
+When many callers ask for the same page at once, only the first one requests and
+parses it, while the rest wait for its outcome:
+
+    >>> flight = SingleFlight()
+    >>> flight.do("key", lambda: webpreview("https://example.com", coalesce=False))
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs one call per key at a time, sharing its result or exception with the callers
+    that ask for the same key while it is in flight.
+
+    Threads and coroutines are coalesced separately, with ``do`` and ``do_async``.
+    Coroutines are only coalesced with ones running in the same event loop. Callers
+    waiting for the call in flight give up after their own ``timeout``, while the call
+    itself carries on for the others. The result is returned as is, without copying,
+    so it is shared between all callers.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, Future] = {}
+        self._async_calls: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], T], timeout: Optional[float] = None) -> T:
+        """Call ``func``, or wait for the call already in flight for the key.
+
+        Raises ``concurrent.futures.TimeoutError`` when the call in flight is not over
+        within ``timeout`` seconds.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result(timeout)
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def do_async(
+        self, key: Hashable, func: Callable[[], Awaitable[T]], timeout: Optional[float] = None
+    ) -> T:
+        """Await ``func()``, or wait for the call already in flight for the key.
+
+        Raises ``asyncio.TimeoutError`` when the call in flight is not over within
+        ``timeout`` seconds.
+        """
+        loop = asyncio.get_running_loop()
+        calls_key = (loop, key)
+        while True:
+            future = self._async_calls.get(calls_key)
+            if future is None:
+                break
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout)
+            except asyncio.CancelledError:
+                # The caller in flight was cancelled rather than this one, so take over
+                if not future.cancelled():
+                    raise
+
+        future = self._async_calls[calls_key] = loop.create_future()
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Don't log the exception as never retrieved when nobody waited for it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._async_calls[calls_key]
+
+
+_default_single_flight = SingleFlight()
+
+
+def get_default_single_flight() -> SingleFlight:
+    """Return the single flight shared by all calls with ``coalesce`` enabled."""
+    return _default_single_flight
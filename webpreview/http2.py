@@ -0,0 +1,175 @@
+"""HTTP/2 transport for requests sessions.
+
+Requires the optional ``httpx`` and ``h2`` dependencies, installed with
+``pip install webpreview[http2]``.
+"""
+
+from typing import Iterator, Optional, Tuple, Union
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, ReadTimeout
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    import httpx
+    import h2  # noqa: F401
+except ImportError:  # pragma: no cover
+    httpx = None
+
+# Headers that only make sense for a single HTTP/1.1 connection and are forbidden in HTTP/2
+HOP_BY_HOP_HEADERS = (
+    "connection",
+    "keep-alive",
+    "proxy-connection",
+    "transfer-encoding",
+    "upgrade",
+)
+
+
+class HTTP2Body:
+    """Decoded body of an httpx response, read like the raw body of a requests response.
+
+    The body is decompressed while it streams in, whatever its Content-Encoding, so
+    ``decode_content`` is accepted for compatibility only.
+    """
+
+    def __init__(self, response: "httpx.Response") -> None:
+        self._response = response
+        self._chunks = response.iter_bytes()
+        self._buffer = b""
+
+    def _next_chunk(self) -> bytes:
+        try:
+            return next(self._chunks, b"")
+        except httpx.TimeoutException:
+            raise ReadTimeout("The page timed out while it was read.")
+        except httpx.TransportError as e:
+            raise ConnectionError(e)
+
+    def read(self, amt: Optional[int] = None, decode_content: bool = True) -> bytes:
+        """Read ``amt`` bytes, or the rest of the body, waiting for them to arrive."""
+        while amt is None or len(self._buffer) < amt:
+            chunk = self._next_chunk()
+            if not chunk:
+                break
+            self._buffer += chunk
+        if amt is None:
+            amt = len(self._buffer)
+        data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def read1(self, amt: Optional[int] = None, decode_content: bool = True) -> bytes:
+        """Read up to ``amt`` bytes, returning whatever has arrived."""
+        if not self._buffer:
+            self._buffer = self._next_chunk()
+        if amt is None:
+            amt = len(self._buffer)
+        data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def stream(self, amt: int = 65536, decode_content: bool = True) -> Iterator[bytes]:
+        while True:
+            data = self.read(amt)
+            if not data:
+                break
+            yield data
+
+    def tell(self) -> int:
+        """Bytes received over the wire so far, before decompression."""
+        return self._response.num_bytes_downloaded
+
+    def close(self) -> None:
+        self._response.close()
+
+    def release_conn(self) -> None:
+        self.close()
+
+
+class HTTP2Adapter(BaseAdapter):
+    """Transport adapter sending the requests of a session over HTTP/2.
+
+    Requests to the same host are multiplexed over a single connection, so many
+    threads previewing pages of a large site don't open a connection each. Servers
+    without HTTP/2 are spoken to over HTTP/1.1, as negotiated during the TLS handshake.
+
+    Args:
+        max_connections (int): Maximum number of simultaneously open connections.
+        keepalive_expiry (float): Seconds an idle connection is kept open for reuse.
+        http1 (bool): Allow HTTP/1.1. When disabled, HTTP/2 is used with prior
+            knowledge, including over plain http://.
+        verify (bool): Verify TLS certificates. Unlike with the default adapter, it
+            applies to every request sent through the adapter.
+
+    Example:
+        >>> session = requests.Session()
+        >>> session.mount("https://", HTTP2Adapter())
+        >>> p = webpreview("https://example.com", session=session)
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        keepalive_expiry: float = 5.0,
+        http1: bool = True,
+        verify: bool = True,
+    ) -> None:
+        if httpx is None:
+            raise ImportError("Install webpreview[http2] to use HTTP/2.")
+
+        super().__init__()
+        self._client = httpx.Client(
+            http1=http1,
+            http2=True,
+            verify=verify,
+            trust_env=False,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Union[None, float, Tuple[float, float]] = None,
+        verify: Union[bool, str] = True,
+        cert: Optional[str] = None,
+        proxies: Optional[dict] = None,
+    ) -> requests.Response:
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout = httpx.Timeout(read, connect=connect)
+        headers = [
+            (k, v) for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS
+        ]
+        outgoing = self._client.build_request(
+            request.method, request.url, headers=headers, content=request.body, timeout=timeout
+        )
+        try:
+            res = self._client.send(outgoing, stream=True)
+        except httpx.ConnectTimeout as e:
+            raise ConnectTimeout(e, request=request)
+        except httpx.TimeoutException as e:
+            raise ReadTimeout(e, request=request)
+        except httpx.TransportError as e:
+            raise ConnectionError(e, request=request)
+
+        response = requests.Response()
+        response.status_code = res.status_code
+        response.reason = res.reason_phrase
+        response.headers = CaseInsensitiveDict(res.headers.items())
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = HTTP2Body(res)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        if not stream:
+            response.content
+        return response
+
+    def close(self) -> None:
+        self._client.close()
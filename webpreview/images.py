@@ -0,0 +1,304 @@
+"""Preview image candidates and probing of their real size.
+
+``webpreview_images`` lists every image a page offers for its preview. An
+``ImageProber`` fetches only the first bytes of each of them to tell their type and
+dimensions:
+
+    >>> with ImageProber() as prober:
+    ...     candidates = webpreview_images("https://example.com", prober=prober)
+    >>> best_image(candidates)
+"""
+
+import struct
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+
+from .excepts import *
+from .fetch import iter_body
+
+# Bytes at the start of an image read to find its dimensions
+PROBE_BYTES = 16384
+
+# Markers of the JPEG segments holding the dimensions of the frame
+JPEG_FRAME_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Markers of the JPEG segments that have no length
+JPEG_STANDALONE_MARKERS = frozenset(range(0xD0, 0xDA)) | {0x01}
+
+
+class ImageSize:
+    """
+    Type and dimensions of an image, read from its header.
+    """
+
+    __slots__ = ("type", "width", "height")
+
+    def __init__(self, type: str, width: int, height: int) -> None:
+        self.type = type
+        self.width = width
+        self.height = height
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ImageSize):
+            return NotImplemented
+        return (self.type, self.width, self.height) == (other.type, other.width, other.height)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"type": self.type, "width": self.width, "height": self.height}
+
+    def __repr__(self) -> str:
+        return f"ImageSize(type={self.type!r}, width={self.width}, height={self.height})"
+
+
+class ImageCandidate:
+    """Image a page offers for its preview.
+
+    Attributes:
+        url (str): URL of the image.
+        source (str): Where the page names it: "og:image", "twitter:image", "schema",
+            "json_ld", "image_src" for ``<link rel="image_src">``, or "img" for the
+            image next to the first heading.
+        width (int): Width declared by the page, e.g. with ``og:image:width``.
+        height (int): Height declared by the page.
+        type (str): Media type declared by the page, e.g. with ``og:image:type``.
+        size (ImageSize): Type and dimensions of the image itself, once it is probed,
+            ``None`` if it was not probed or could not be recognized.
+    """
+
+    __slots__ = ("url", "source", "width", "height", "type", "size")
+
+    def __init__(
+        self,
+        url: str,
+        source: str,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        type: Optional[str] = None,
+    ) -> None:
+        self.url = url
+        self.source = source
+        self.width = width
+        self.height = height
+        self.type = type
+        self.size: Optional[ImageSize] = None
+
+    def dimensions(self) -> Optional[Tuple[int, int]]:
+        """Width and height of the image, the probed ones over the declared ones."""
+        if self.size is not None:
+            return self.size.width, self.size.height
+        if self.width and self.height:
+            return self.width, self.height
+        return None
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "url": self.url,
+            "source": self.source,
+            "width": self.width,
+            "height": self.height,
+            "type": self.type,
+            "size": None if self.size is None else self.size.to_dict(),
+        }
+
+    def __repr__(self) -> str:
+        return f"ImageCandidate(url={self.url!r}, source={self.source!r}, size={self.size!r})"
+
+
+def parse_dimension(value: object) -> Optional[int]:
+    """Turn a declared width or height, such as "1200" or "1200px", into pixels."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value) if value > 0 else None
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value.endswith("px"):
+            value = value[:-2].rstrip()
+        if value.isdigit() and int(value) > 0:
+            return int(value)
+    return None
+
+
+def jpeg_size(data: bytes) -> Optional[ImageSize]:
+    """Find the dimensions in the frame header, skipping the segments before it."""
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            # Fill byte before the marker
+            i += 1
+            continue
+        if marker in JPEG_STANDALONE_MARKERS:
+            i += 2
+            continue
+        if marker in JPEG_FRAME_MARKERS:
+            if i + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[i + 5 : i + 9])
+            return ImageSize("jpeg", width, height)
+        (length,) = struct.unpack(">H", data[i + 2 : i + 4])
+        i += 2 + length
+    return None
+
+
+def webp_size(data: bytes) -> Optional[ImageSize]:
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30 and data[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", data[26:30])
+        return ImageSize("webp", width & 0x3FFF, height & 0x3FFF)
+    if chunk == b"VP8L" and len(data) >= 25 and data[20] == 0x2F:
+        (bits,) = struct.unpack("<I", data[21:25])
+        return ImageSize("webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+    if chunk == b"VP8X" and len(data) >= 30:
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return ImageSize("webp", width, height)
+    return None
+
+
+def image_size(data: bytes) -> Optional[ImageSize]:
+    """Tell the type and dimensions of an image from the first bytes of its file.
+
+    PNG, GIF, JPEG, WebP and BMP images are recognized. Returns ``None`` for other
+    formats, or when the dimensions are not within ``data``.
+    """
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        if len(data) >= 24 and data[12:16] == b"IHDR":
+            width, height = struct.unpack(">II", data[16:24])
+            return ImageSize("png", width, height)
+    elif data[:6] in (b"GIF87a", b"GIF89a"):
+        if len(data) >= 10:
+            width, height = struct.unpack("<HH", data[6:10])
+            return ImageSize("gif", width, height)
+    elif data.startswith(b"\xff\xd8"):
+        return jpeg_size(data)
+    elif data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return webp_size(data)
+    elif data.startswith(b"BM"):
+        if len(data) >= 26:
+            width, height = struct.unpack("<ii", data[18:26])
+            return ImageSize("bmp", abs(width), abs(height))
+    return None
+
+
+def best_image(candidates: Iterable[ImageCandidate]) -> Optional[ImageCandidate]:
+    """Pick the largest of the candidates with known dimensions, or else the first one."""
+    candidates = list(candidates)
+    sized = [c for c in candidates if c.dimensions()]
+    if sized:
+        return max(sized, key=lambda c: c.dimensions()[0] * c.dimensions()[1])
+    return candidates[0] if candidates else None
+
+
+class ImageProber:
+    """Pool of threads probing the type and dimensions of images.
+
+    Only the first ``max_bytes`` of an image are requested, with a Range header, and
+    reading stops as soon as its dimensions are found. Connections to the same host
+    are reused. Results, including the images that could not be probed, are cached
+    by URL.
+
+    Args:
+        concurrency (int): Number of images probed at the same time.
+        per_host (int): Maximum number of simultaneous connections to a single host.
+        timeout (float): Timeout in seconds for the connection and each piece of an image.
+        max_bytes (int): Bytes of an image read at most.
+        maxsize (int): Number of probed images remembered, the oldest are forgotten first.
+        session (requests.Session): Session to request the images with. By default, a
+            new session pooling up to ``per_host`` connections per host is used.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        per_host: int = 2,
+        timeout: Optional[float] = 5.0,
+        max_bytes: int = PROBE_BYTES,
+        maxsize: int = 10000,
+        session: Optional[requests.Session] = None,
+    ) -> None:
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.maxsize = maxsize
+        self._own_session = session is None
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=concurrency, pool_maxsize=per_host, pool_block=True
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._cache: "OrderedDict[str, Optional[ImageSize]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fetch_size(self, url: str) -> Optional[ImageSize]:
+        """Request the start of the image and read its size, bypassing the cache."""
+        headers = {"Range": f"bytes=0-{self.max_bytes - 1}"}
+        try:
+            res = self.session.get(url, timeout=self.timeout, headers=headers, stream=True)
+        except RequestException:
+            return None
+        if res.status_code not in (200, 206):
+            res.close()
+            return None
+
+        data = b""
+        try:
+            # The connection is released as soon as the generator is closed
+            chunks = iter_body(res, max_bytes=self.max_bytes)
+            for chunk in chunks:
+                data += chunk
+                size = image_size(data)
+                if size is not None:
+                    chunks.close()
+                    return size
+        except URLUnreachable:
+            pass
+        return None
+
+    def probe(self, url: str) -> Optional[ImageSize]:
+        """Return the type and dimensions of the image, or ``None`` if they are unknown."""
+        with self._lock:
+            if url in self._cache:
+                self._cache.move_to_end(url)
+                return self._cache[url]
+
+        size = self.fetch_size(url)
+        with self._lock:
+            self._cache[url] = size
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return size
+
+    def probe_candidates(self, candidates: List[ImageCandidate]) -> List[ImageCandidate]:
+        """Probe the candidates concurrently, setting their ``size``, and return them."""
+        urls = list(dict.fromkeys(c.url for c in candidates))
+        sizes = dict(zip(urls, self._executor.map(self.probe, urls)))
+        for candidate in candidates:
+            candidate.size = sizes[candidate.url]
+        return candidates
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def close(self) -> None:
+        """Wait for the images being probed and release the connections."""
+        self._executor.shutdown(wait=True)
+        if self._own_session:
+            self.session.close()
+
+    def __enter__(self) -> "ImageProber":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
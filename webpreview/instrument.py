@@ -0,0 +1,181 @@
+"""Timings and counters of previews.
+
+Pass a callback as ``instrument`` to ``webpreview`` to receive the ``PreviewStats`` of
+every call, or collect them in a ``StatsAggregator``:
+
+    >>> stats = StatsAggregator()
+    >>> p = webpreview("https://example.com", instrument=stats)
+    >>> print(stats.report())
+"""
+
+import bisect
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Callable, ContextManager, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Upper bounds of the histogram buckets in seconds, roughly logarithmic from 0.1ms to 30s
+BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    float("inf"),
+)
+
+
+class PreviewStats:
+    """Timings and counters of a single preview.
+
+    Attributes:
+        url (str): URL of the page.
+        timings (dict): Seconds spent in each stage the preview went through:
+            "request" until the response headers arrived, which includes DNS lookup,
+            connecting and waiting for the server; "download" of the body; "head" for
+            the streamed head read and parsed at once; "meta_index" and "soup" for
+            building the index of meta tags and the BeautifulSoup tree; "meta",
+            "open_graph", "twitter_card" and "schema" for the meta tag stages; "json_ld"
+            for JSON-LD; "generic" for the generic parser; "parse" for parsing in a
+            ``ParsePool``; and "total" for the whole call.
+        completed_by (str): Stage that completed the preview, "generic" if the generic
+            parser was needed, "cache" or "not_modified" if it came from the cache,
+            "coalesced" if it was shared by a concurrent call, or ``None`` if the
+            preview is incomplete.
+        bytes_downloaded (int): Bytes of the page received over the wire.
+        parser (str): Parser the page was parsed with, "lxml-direct" when the meta tags
+            were read with lxml directly.
+    """
+
+    __slots__ = ("url", "timings", "completed_by", "bytes_downloaded", "parser")
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.timings: Dict[str, float] = {}
+        self.completed_by: Optional[str] = None
+        self.bytes_downloaded = 0
+        self.parser: Optional[str] = None
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Add the time spent in the block to the stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.timings[stage] = self.timings.get(stage, 0.0) + elapsed
+
+    def __repr__(self) -> str:
+        timings = ", ".join(f"{k}={v * 1e3:.2f}ms" for k, v in self.timings.items())
+        return (
+            f"PreviewStats(url={self.url!r}, completed_by={self.completed_by!r}, "
+            f"bytes_downloaded={self.bytes_downloaded}, parser={self.parser!r}, {timings})"
+        )
+
+
+def measure(stats: Optional[PreviewStats], stage: str) -> ContextManager:
+    """Time the stage if the preview is instrumented."""
+    return nullcontext() if stats is None else stats.measure(stage)
+
+
+class Histogram:
+    """
+    Counts of durations in the logarithmic ``BUCKETS``.
+    """
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q``-th percentile, from 0 to 100."""
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if count and seen >= rank:
+                return bound
+        return 0.0
+
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+
+class StatsAggregator:
+    """
+    Callback collecting ``PreviewStats`` into histograms of every stage.
+
+    It can be shared between threads, e.g. by passing it to ``webpreview_many``.
+    """
+
+    def __init__(self) -> None:
+        self.histograms: Dict[str, Histogram] = {}
+        self.completed_by: Counter = Counter()
+        self.parsers: Counter = Counter()
+        self.bytes_downloaded = 0
+        self.previews = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, stats: PreviewStats) -> None:
+        with self._lock:
+            self.previews += 1
+            self.bytes_downloaded += stats.bytes_downloaded
+            self.completed_by[stats.completed_by] += 1
+            if stats.parser:
+                self.parsers[stats.parser] += 1
+            for stage, seconds in stats.timings.items():
+                histogram = self.histograms.get(stage)
+                if histogram is None:
+                    histogram = self.histograms[stage] = Histogram()
+                histogram.add(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, mean and percentiles of every stage, in seconds."""
+        with self._lock:
+            return {
+                stage: {
+                    "count": h.count,
+                    "mean": h.mean(),
+                    "p50": h.percentile(50),
+                    "p90": h.percentile(90),
+                    "p99": h.percentile(99),
+                }
+                for stage, h in self.histograms.items()
+            }
+
+    def report(self) -> str:
+        """Table of the stages with their timings in milliseconds, and the counters."""
+        lines = [f"{'stage':<14}{'count':>8}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}"]
+        for stage, row in self.summary().items():
+            timings = "".join(f"{row[k] * 1e3:>10.2f}" for k in ("mean", "p50", "p90", "p99"))
+            lines.append(f"{stage:<14}{row['count']:>8}{timings}")
+        completed_by: List[Tuple[Optional[str], int]] = self.completed_by.most_common()
+        lines.append("completed by: " + ", ".join(f"{k}={v}" for k, v in completed_by))
+        lines.append("parsers: " + ", ".join(f"{k}={v}" for k, v in self.parsers.most_common()))
+        lines.append(f"previews: {self.previews}, bytes downloaded: {self.bytes_downloaded}")
+        return "\n".join(lines)
+
+
+# Callback receiving the stats of an instrumented preview
+Instrument = Callable[[PreviewStats], None]
@@ -1,8 +1,18 @@
-from typing import Dict, Optional
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Fields every preview has, stored in slots rather than in the extra properties
+FIELDS = ("url", "title", "description", "image")
 
 
 class WebPreview:
-    """Preview fields extracted from webpage."""
+    """Preview fields extracted from webpage.
+
+    The url, title, description and image fields are stored in slots. Any other
+    property is kept in a side mapping, created only once the first one is added, and
+    is accessible both as an attribute and as an item.
+    """
+
+    __slots__ = FIELDS + ("_extra",)
 
     def __init__(
         self,
@@ -12,20 +22,51 @@ class WebPreview:
         image: Optional[str] = None,
         **properties: str,
     ) -> None:
-        self.url = url
-        self.title = title
-        self.description = description
-        self.image = image
-        self.extend(**properties)
+        object.__setattr__(self, "url", url)
+        object.__setattr__(self, "title", title)
+        object.__setattr__(self, "description", description)
+        object.__setattr__(self, "image", image)
+        object.__setattr__(self, "_extra", properties or None)
+
+    def __getattr__(self, __name: str) -> Any:
+        # Only called for names that are not slots, so look up the extra properties
+        if not __name.startswith("_"):
+            extra = self._extra
+            if extra is not None and __name in extra:
+                return extra[__name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{__name}'")
+
+    def __setattr__(self, __name: str, __value: Any) -> None:
+        if __name in FIELDS or __name.startswith("_"):
+            object.__setattr__(self, __name, __value)
+        else:
+            self.__setitem__(__name, __value)
 
     def __getitem__(self, __name: str) -> Optional[str]:
-        return self.__dict__.get(__name)
+        if __name in FIELDS:
+            return object.__getattribute__(self, __name)
+        extra = self._extra
+        return extra.get(__name) if extra is not None else None
 
     def __setitem__(self, __name: str, __value: str) -> None:
-        self.__dict__[__name] = __value
+        if __name in FIELDS:
+            object.__setattr__(self, __name, __value)
+        elif self._extra is None:
+            self._extra = {__name: __value}
+        else:
+            self._extra[__name] = __value
 
     def __contains__(self, __name: str) -> bool:
-        return __name in self.__dict__
+        return __name in FIELDS or (self._extra is not None and __name in self._extra)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """Iterate over all fields and extra properties, including empty ones."""
+        yield "url", self.url
+        yield "title", self.title
+        yield "description", self.description
+        yield "image", self.image
+        if self._extra is not None:
+            yield from self._extra.items()
 
     def is_complete(self) -> bool:
         """Check that preview contains title, description, and image."""
@@ -34,8 +75,8 @@ class WebPreview:
     def extend(self, **properties: str) -> None:
         """Extend preview with new values. No overriding."""
         for k, v in properties.items():
-            if k not in self.__dict__:
-                self.__dict__[k] = v
+            if k not in self:
+                self[k] = v
 
     def merge(self, other: "WebPreview") -> None:
         """Merge values from other preview. No overriding."""
@@ -43,9 +84,7 @@ class WebPreview:
 
     def to_dict(self, exclude_empty: bool = False, exclude_none: bool = True) -> Dict[str, str]:
         result = {}
-        for k, v in self.__dict__.items():
-            if k == "_soup":
-                continue
+        for k, v in self.items():
             if v is None and exclude_none:
                 continue
             if not v and exclude_empty:
@@ -53,16 +92,43 @@ class WebPreview:
             result[k] = v
         return result
 
+    def copy(self) -> "WebPreview":
+        extra = self._extra
+        if extra is None:
+            return WebPreview(self.url, self.title, self.description, self.image)
+        return WebPreview(self.url, self.title, self.description, self.image, **extra)
+
     def __or__(self, other: "WebPreview") -> "WebPreview":
-        props = {**other.to_dict(), **self.to_dict()}
-        merged = WebPreview(**props)
+        merged = self.copy()
+        merged |= other
         return merged
 
     def __ior__(self, other: "WebPreview") -> "WebPreview":
-        d = {**other.to_dict(), **self.to_dict()}
-        self.__dict__.update(d)
+        # Fill the missing values in place, without building intermediate dicts
+        if self.url is None:
+            object.__setattr__(self, "url", other.url)
+        if self.title is None:
+            object.__setattr__(self, "title", other.title)
+        if self.description is None:
+            object.__setattr__(self, "description", other.description)
+        if self.image is None:
+            object.__setattr__(self, "image", other.image)
+
+        extra = other._extra
+        if extra is not None:
+            for k, v in extra.items():
+                if v is not None and self[k] is None:
+                    self[k] = v
         return self
 
+    def __getstate__(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        object.__setattr__(self, "_extra", None)
+        for k, v in state.items():
+            self[k] = v
+
     def __repr__(self) -> str:
         arguments = ", ".join([f'{k}="{v}"' for k, v in self.to_dict().items()])
         return f"WebPreview({arguments})"
@@ -71,4 +137,4 @@ class WebPreview:
         return self.__repr__()
 
     def __bool__(self) -> bool:
-        return any(self.__dict__.values())
+        return any(v for _, v in self.items())
@@ -1,16 +1,64 @@
-import re
+import json
+import time
 import unicodedata
-from urllib.parse import urlparse, urlunparse
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache, partial
+from itertools import islice
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from html.parser import HTMLParser
+from urllib.parse import ParseResult, urlparse, urlsplit, urlunparse, urlunsplit
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import *
-from bs4 import BeautifulSoup
-
+from bs4 import BeautifulSoup, PageElement, Tag
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover
+    etree = None
+
+from .breaker import CircuitBreaker, get_default_breaker
+from .cache import PreviewCache, get_default_cache
+from .fetch import (
+    bytes_received,
+    deadline_after,
+    decode_body,
+    header_charset,
+    iter_text,
+    read_body,
+    request_page,
+    retrieve_content,
+    sniff_encoding,
+    stream_content,
+    timeout_within,
+    total_timeout,
+)
+from .flight import get_default_single_flight
+from .http2 import HTTP2Adapter
+from .images import ImageCandidate, ImageProber, parse_dimension
+from .instrument import Instrument, PreviewStats, measure
 from .models import WebPreview
 from .excepts import *
 from .parsers import *
-from .regex import VALID_URL, WHITESPACE
+from .regex import CAMEL_CASE_WORD, PLAIN_URL, UPPERCASE, VALID_URL
+
+# Added in Python 3.8
+is_normalized = getattr(unicodedata, "is_normalized", None)
+
+if TYPE_CHECKING:
+    from .pool import ParsePool
 
 
 def extract_title(soup: BeautifulSoup) -> Optional[str]:
@@ -26,8 +74,27 @@ def extract_title(soup: BeautifulSoup) -> Optional[str]:
     return None
 
 
-def extract_description(soup: BeautifulSoup) -> Optional[str]:
-    """Extract description from the given web page."""
+# Nodes of the document looked at by each scan of the description heuristics
+DESCRIPTION_NODE_BUDGET = 10000
+
+
+def iter_tags(elements: Iterable[PageElement], name: str, node_budget: int) -> Iterator[Tag]:
+    """Lazily yield the tags with the name among the first ``node_budget`` elements."""
+    for element in islice(elements, node_budget):
+        if isinstance(element, Tag) and element.name == name:
+            yield element
+
+
+def extract_description(
+    soup: BeautifulSoup,
+    meta_index: Optional["MetaIndex"] = None,
+    node_budget: int = DESCRIPTION_NODE_BUDGET,
+) -> Optional[str]:
+    """Extract description from the given web page.
+
+    The document is scanned lazily and every scan stops after the first match or
+    ``node_budget`` nodes, so the cost does not grow with the length of the page.
+    """
 
     def treat_candidate(candidate_text: str) -> str:
         text = candidate_text.strip()
@@ -35,31 +102,36 @@ def extract_description(soup: BeautifulSoup) -> Optional[str]:
         desc = ". ".join(parts[:2]) + "."
         return desc
 
+    def first_paragraph(elements: Iterable[PageElement]) -> Optional[str]:
+        for p_candidate in iter_tags(elements, "p", node_budget):
+            text = p_candidate.text
+            if text and text.strip():
+                return treat_candidate(text)
+        return None
+
     # extract description from meta[name='description']
-    meta_description = soup.find("meta", attrs={"name": "description"})
-    if meta_description and meta_description["content"]:
-        return meta_description["content"]
+    if meta_index is None:
+        meta_index = MetaIndex.from_soup(soup)
+    meta_description = meta_index.get(("name", "description"))
+    if meta_description:
+        return meta_description
 
     # Class shortdescription
-    short_description = soup.find("div", class_="shortdescription")
-    if short_description and short_description.string:
-        return short_description.string
+    for div in iter_tags(soup.descendants, "div", node_budget):
+        if "shortdescription" in div.get_attribute_list("class"):
+            if div.string:
+                return div.string
+            break
 
     # else extract description from the first <p> sibling to the first <h1>
-    first_h1 = soup.find("h1")
+    first_h1 = next(iter_tags(soup.descendants, "h1", node_budget), None)
     if first_h1:
-        first_ps = first_h1.find_all_next("p")
-        for p_candidate in first_ps:
-            if p_candidate and p_candidate.text and p_candidate.text.strip():
-                return treat_candidate(p_candidate.text)
+        description = first_paragraph(first_h1.next_elements)
+        if description:
+            return description
 
     # else extract description from the first <p>
-    first_ps = soup.find_all("p")
-    for p_candidate in first_ps:
-        if p_candidate and p_candidate.text and p_candidate.text.strip():
-            return treat_candidate(p_candidate.text)
-
-    return None
+    return first_paragraph(soup.descendants)
 
 
 def extract_image(soup: BeautifulSoup) -> Optional[str]:
@@ -74,51 +146,268 @@ def extract_image(soup: BeautifulSoup) -> Optional[str]:
     return None
 
 
-def sanitize(value: str) -> str:
+def sanitize(value: str, max_length: Optional[int] = None) -> str:
     """Sanitize given string.
 
+    Whitespace is collapsed into single spaces and unicode symbols are normalized to
+    NFKD. Normalization is skipped for ASCII and already normalized text. With
+    ``max_length``, the text is cut to that many characters before it is processed,
+    and the result is not longer than that either. It must not be negative.
+
     See:
     https://docs.python.org/3/library/unicodedata.html#unicodedata.normalize
     """
+    if max_length is not None and max_length < 0:
+        raise ValueError("max_length must not be negative.")
+
     # Do not process empty strings or None
     if not value:
         return value
 
-    # First, remove all whitespace characters.
-    v = re.sub(WHITESPACE, " ", value)
+    if max_length is not None and len(value) > max_length:
+        value = value[:max_length]
+        if not value:
+            return value
+
+    # First, collapse every run of whitespace characters into a single space.
+    # Splitting is faster than substituting, but drops whitespace at the edges
+    words = value.split()
+    v = " ".join(words)
+    if value[0].isspace():
+        v = " " + v
+    if words and value[-1].isspace():
+        v += " "
+
     # Now, normalize unicode symbols
+    if v.isascii() or (is_normalized is not None and is_normalized("NFKD", v)):
+        return v
     v = unicodedata.normalize("NFKD", v)
 
+    if max_length is not None and len(v) > max_length:
+        # Decomposed characters take more room, don't cut one off its combining marks
+        end = max_length
+        while end > 0 and unicodedata.combining(v[end]):
+            end -= 1
+        v = v[:end]
+
     return v
 
 
+# Longest JSON-LD block kept, in characters, and most blocks kept per page. Larger
+# blocks are skipped rather than cut, since a truncated block is not valid JSON.
+JSON_LD_MAX_LENGTH = 100000
+JSON_LD_MAX_BLOCKS = 16
+
+
+def is_json_ld(attrs: Dict[str, str]) -> bool:
+    """Check whether the attributes are those of a ``<script>`` holding JSON-LD."""
+    media_type = attrs.get("type") or ""
+    return media_type.split(";", 1)[0].strip().lower() == "application/ld+json"
+
+
+class MetaIndex(dict):
+    """Content of every meta tag keyed by ``(attribute, value)``.
+
+    Different subtypes have different target attributes:
+    - OpenGraph has <meta property="" content="">
+    - TwitterCard has <meta name="" content="">
+    - Google+ has <meta itemprop="" content="">
+
+    Every attribute of a meta tag other than ``content`` is indexed, so that any
+    ``target_attribute`` can be looked up. Only the first meta tag with a given
+    attribute value is indexed, the same way ``soup.find`` would pick it.
+
+    The raw text of ``<script type="application/ld+json">`` blocks found in the same
+    pass is kept in ``json_ld``, undecoded, up to ``JSON_LD_MAX_BLOCKS`` blocks of at
+    most ``JSON_LD_MAX_LENGTH`` characters.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.json_ld: List[str] = []
+
+    def add_meta(self, attrs: Dict[str, str]) -> None:
+        """Index a single meta tag given its attributes."""
+        content = attrs.get("content")
+        for attribute, value in attrs.items():
+            if attribute == "content" or value is None:
+                continue
+            # BeautifulSoup splits multi-valued attributes, such as class, into lists,
+            # and soup.find matches both their items and the whole value
+            values = [*value, " ".join(value)] if isinstance(value, list) else (value,)
+            for value in values:
+                if (attribute, value) not in self:
+                    self[(attribute, value)] = content
+
+    def add_json_ld(self, text: Optional[str]) -> None:
+        """Keep the text of a JSON-LD block unless it is empty, too long or one too many."""
+        if text and len(text) <= JSON_LD_MAX_LENGTH and len(self.json_ld) < JSON_LD_MAX_BLOCKS:
+            self.json_ld.append(text)
+
+    @classmethod
+    def from_soup(cls, soup: BeautifulSoup) -> "MetaIndex":
+        """Build the index in a single pass over the document."""
+        index = cls()
+        for tag in soup.find_all(["meta", "script"]):
+            if tag.name == "meta":
+                index.add_meta(tag.attrs)
+            elif is_json_ld(tag.attrs):
+                index.add_json_ld(tag.string)
+        return index
+
+    @classmethod
+    def from_lxml(cls, content: Union[str, bytes], encoding: Optional[str] = None) -> "MetaIndex":
+        """Build the index straight from the page's content with lxml, without BeautifulSoup.
+
+        Bytes are decoded by lxml itself, from ``encoding`` or UTF-8 when it is not given.
+        """
+        if etree is None:
+            raise ImportError("lxml must be installed to use the lxml-direct parser.")
+
+        index = cls()
+        if isinstance(content, str):
+            # lxml refuses strings with an XML encoding declaration, so feed it bytes
+            content, encoding = content.encode("utf-8"), "utf-8"
+        try:
+            root = etree.fromstring(content, etree.HTMLParser(encoding=encoding or "utf-8"))
+        except LookupError:
+            # Encodings unknown to libxml2 are decoded by Python
+            content = content.decode(encoding, errors="replace").encode("utf-8")
+            root = etree.fromstring(content, etree.HTMLParser(encoding="utf-8"))
+        if root is not None:
+            for tag in root.iter("meta", "script"):
+                if tag.tag == "meta":
+                    index.add_meta(tag.attrib)
+                elif is_json_ld(tag.attrib):
+                    index.add_json_ld(tag.text)
+        return index
+
+
+class HeadParser(HTMLParser):
+    """Incremental parser that indexes meta tags and JSON-LD until the end of ``<head>``.
+
+    The document is supplied piece by piece via ``feed``. Once ``</head>`` or
+    ``<body>`` is seen, ``head_closed`` is set and the rest of the input is ignored.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.meta_index = MetaIndex()
+        self.head_closed = False
+        # Pieces of the JSON-LD block being read, None outside of such blocks
+        self._json_ld: Optional[List[str]] = None
+        self._json_ld_length = 0
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if self.head_closed:
+            return
+        if tag == "meta":
+            self.meta_index.add_meta(dict(attrs))
+        elif tag == "script" and is_json_ld(dict(attrs)):
+            self._json_ld = []
+            self._json_ld_length = 0
+        elif tag == "body":
+            self.head_closed = True
+
+    def handle_data(self, data: str) -> None:
+        if self._json_ld is not None:
+            # Stop collecting a block once it is too long to be kept anyway
+            self._json_ld_length += len(data)
+            if self._json_ld_length <= JSON_LD_MAX_LENGTH:
+                self._json_ld.append(data)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "script" and self._json_ld is not None:
+            if self._json_ld_length <= JSON_LD_MAX_LENGTH:
+                self.meta_index.add_json_ld("".join(self._json_ld))
+            self._json_ld = None
+        elif tag == "head":
+            self.head_closed = True
+
+
+OPEN_GRAPH_PROPERTIES = ("og:title", "og:description", "og:image")
+TWITTER_CARD_PROPERTIES = ("twitter:title", "twitter:description", "twitter:image")
+SCHEMA_PROPERTIES = ("name", "description", "image")
+# Preview's fields and the JSON-LD properties to read each of them from, in order
+JSON_LD_PROPERTIES = (
+    ("title", ("headline", "name")),
+    ("description", ("description",)),
+    ("image", ("image", "thumbnailUrl")),
+)
+# Types of JSON-LD nodes that describe something else than the page itself
+JSON_LD_IGNORED_TYPES = frozenset(
+    ("BreadcrumbList", "ImageObject", "Organization", "Person", "SearchAction", "WebSite")
+)
+
+
+def meta_property_name(p: str) -> str:
+    """Turn the meta property into the name of the preview's property."""
+    # turn "og:title" to "title" and "og:price:amount" to price_amount
+    if ":" in p:
+        return p.split(":", 1)[1].replace(":", "_")
+
+    # turn "camelCase" to "camel_case"
+    if UPPERCASE.search(p):
+        return CAMEL_CASE_WORD.sub(r"_\1", p).lower()
+
+    return p
+
+
+@lru_cache(maxsize=256)
+def extraction_plan(
+    target_attribute: str, properties: Tuple[str, ...]
+) -> Tuple[Tuple[str, Tuple[str, str]], ...]:
+    """Pairs of the preview's property name and the meta index key to read it from.
+
+    Plans are cached, since the same few lists of properties are extracted from
+    every page.
+    """
+    return tuple((meta_property_name(p), (target_attribute, p)) for p in properties)
+
+
+def iter_meta_attributes(
+    meta_index: MetaIndex, target_attribute: str, properties: Sequence[str]
+) -> Iterator[Tuple[str, Optional[str]]]:
+    """Yield the name and the content, or ``None``, of every meta property."""
+    for prop, key in extraction_plan(target_attribute, tuple(properties)):
+        yield prop, meta_index.get(key) or None
+
+
 def extract_meta_attributes(
-    soup: BeautifulSoup, target_attribute: str, properties: List[str]
+    soup: Optional[BeautifulSoup],
+    target_attribute: str,
+    properties: List[str],
+    meta_index: Optional[MetaIndex] = None,
 ) -> Dict[str, str]:
-    """Extract social media meta properties."""
-    attributes = {}
-    # Different subtypes have different target_attribute:
-    # - OpengGraph has <meta property="" content="">
-    # - TwitterCard  has <meta name="" content="">
-    # - Google+  has <meta itemprop="" content="">
-    for p in properties:
-        meta = soup.find("meta", attrs={target_attribute: p})
-
-        # turn "og:title" to "title" and "og:price:amount" to price_amount
-        if re.search(r":", p):
-            prop = p.split(":", 1)[1].replace(":", "_")
-
-        # turn "camelCase" to "camel_case"
-        elif re.search(r"[A-Z]", p):
-            # regex taken from 2nd answer at
-            # http://stackoverflow.com/questions/1175208/elegant-python-function-to-convert-camelcase-to-camel-case
-            prop = re.sub("(?!^)([A-Z]+)", r"_\1", p).lower()
-        else:
-            prop = p
+    """Extract social media meta properties.
 
-        attributes[prop] = meta["content"] if meta and meta["content"] else None
+    When ``meta_index`` is given, it is used instead of searching the ``soup``.
+    """
+    if meta_index is None:
+        meta_index = MetaIndex.from_soup(soup)
 
-    return attributes
+    return dict(iter_meta_attributes(meta_index, target_attribute, properties))
+
+
+def fill_missing(
+    result: WebPreview,
+    prop: str,
+    content: Optional[str],
+    url: str,
+    absolute_url: bool = False,
+) -> None:
+    """Set the property of the result to the content unless it already has a value."""
+    if content is None or result[prop] is not None:
+        return
+    if absolute_url and prop == "image":
+        content = make_absolute_url(content, url)
+    result[prop] = content
+
+
+@lru_cache(maxsize=256)
+def parse_base_url(base_url: str) -> ParseResult:
+    """Parse the URL of a page once for all the relative URLs found on it."""
+    return urlparse(base_url)
 
 
 def make_absolute_url(url: str, base_url: str) -> Optional[str]:
@@ -128,7 +417,7 @@ def make_absolute_url(url: str, base_url: str) -> Optional[str]:
     if not url or not base_url:
         return url
 
-    base = urlparse(base_url)
+    base = parse_base_url(base_url)
     parsed = urlparse(url)
 
     # If the URL is not absolute, then we append its
@@ -146,18 +435,93 @@ def make_absolute_url(url: str, base_url: str) -> Optional[str]:
     return urlunparse(url_components)
 
 
-def retrieve_content(
-    url: str, timeout: Optional[int] = None, headers: Optional[Dict[str, str]] = None
+def resolve_parser(parser: str) -> str:
+    """Turn the parser name into a BeautifulSoup tree builder name.
+
+    "auto" picks the fastest tree builder available: "lxml" when it is installed and
+    "html.parser" otherwise. "lxml-direct" builds its trees with "lxml".
+    """
+    if parser == "auto":
+        return "lxml" if etree is not None else "html.parser"
+    if parser == "lxml-direct":
+        return "lxml"
+    return parser
+
+
+def validate_url(url: str) -> str:
+    """Validate given URL and prepend the missing scheme to it."""
+    if not url:
+        raise EmptyURL("Please pass a valid URL as the first argument.")
+
+    # Most URLs have a plain shape that is cheap to check, the rest go through the full pattern
+    m = PLAIN_URL.match(url)
+    if m is None:
+        m = VALID_URL.match(url)
+        if not m:
+            raise InvalidURL("The URL is invalid.")
+
+        if not m.group("domain"):
+            raise URLUnreachable("URL is unreacheable.")
+
+    if not m.group("scheme"):
+        url = f"http://{url}"
+
+    return url
+
+
+def normalize_url(url: str) -> str:
+    """Validate given URL and bring it to a canonical form.
+
+    The scheme is added if missing, scheme and host are lowercased and the fragment
+    is dropped, so that URLs pointing to the same page compare equal.
+    """
+    m = PLAIN_URL.match(url) if url else None
+    if m is not None:
+        # Without user info, the URL is split with plain string operations
+        scheme, netloc, rest = m.group("scheme", "netloc", "rest")
+        path, _, query = (rest or "").partition("#")[0].partition("?")
+        normalized = f"{(scheme or 'http://').lower()}{netloc.lower()}{path or '/'}"
+        return f"{normalized}?{query}" if query else normalized
+
+    scheme, netloc, path, query, _ = urlsplit(validate_url(url))
+    # Only the host is case-insensitive, not the user info in front of it
+    userinfo, at, host = netloc.rpartition("@")
+    return urlunsplit((scheme.lower(), userinfo + at + host.lower(), path or "/", query, ""))
+
+
+def normalize_urls(urls: Iterable[str], skip_invalid: bool = True) -> Iterator[str]:
+    """Normalize the URLs with ``normalize_url`` in a single lazy pass, yielding each page once.
+
+    Invalid URLs are skipped, or raise like in ``normalize_url`` unless ``skip_invalid``.
+    """
+    seen = set()
+    for url in urls:
+        try:
+            normalized = normalize_url(url)
+        except (WebpreviewException, InvalidURL):
+            if skip_invalid:
+                continue
+            raise
+        if normalized not in seen:
+            seen.add(normalized)
+            yield normalized
+
+
+def cache_key(
+    url: str,
+    target_attribute: Optional[str] = None,
+    properties: Optional[List[str]] = None,
+    absolute_url: bool = False,
 ) -> str:
-    try:
-        res = requests.get(url, timeout=timeout, headers=headers)
-    except (ConnectionError, HTTPError, Timeout, TooManyRedirects):
-        raise URLUnreachable("The URL is unreachable.")
+    """Key of the preview in the cache: normalized URL together with extraction options."""
+    return json.dumps([normalize_url(url), target_attribute, properties, absolute_url])
 
-    if res.status_code == 404:
-        raise URLNotFound("The web page does not exist.")
 
-    return res.text
+def validate_properties(
+    target_attribute: Optional[str] = None, properties: Optional[List[str]] = None
+) -> None:
+    if (target_attribute or properties) and not (target_attribute and properties):
+        raise EmptyProperties("Both target_attribute and meta_properties must be specified")
 
 
 def initialize(
@@ -167,41 +531,60 @@ def initialize(
     content: Optional[str] = None,
     target_attribute: Optional[str] = None,
     properties: Optional[List[str]] = None,
-    parser: str = "html.parser",
+    parser: str = "auto",
+    session: Optional[requests.Session] = None,
 ) -> Tuple[str, str, BeautifulSoup]:
-    if not url:
-        raise EmptyURL("Please pass a valid URL as the first argument.")
+    url = validate_url(url)
 
-    m = VALID_URL.match(url)
-    if not m:
-        raise InvalidURL("The URL is invalid.")
+    if not content:
+        content = retrieve_content(url=url, timeout=timeout, headers=headers, session=session)
 
-    if not m.group("domain"):
-        raise URLUnreachable("URL is unreacheable.")
+    validate_properties(target_attribute, properties)
 
-    if not m.group("scheme"):
-        url = f"http://{url}"
+    soup = BeautifulSoup(content, resolve_parser(parser))
 
-    if not content:
-        content = retrieve_content(url=url, timeout=timeout, headers=headers)
+    return url, content, soup
 
-    if (target_attribute or properties) and not (target_attribute and properties):
-        raise EmptyProperties("Both target_attribute and meta_properties must be specified")
 
-    soup = BeautifulSoup(content, parser)
+def resolve_generic(
+    result: WebPreview,
+    soup: BeautifulSoup,
+    url: str,
+    absolute_url: bool = False,
+    meta_index: Optional[MetaIndex] = None,
+) -> None:
+    """Fill in the fields of the result that are still missing from the generic webpage.
 
-    return url, content, soup
+    Each field is extracted on its own, so the heuristics of the fields already
+    present are never run.
+    """
+    if result.title is None:
+        result.title = sanitize(extract_title(soup))
 
+    if result.description is None:
+        result.description = sanitize(extract_description(soup, meta_index))
 
-def parse_generic(soup: BeautifulSoup, url: str, absolute_url: bool = False) -> WebPreview:
-    title = sanitize(extract_title(soup))
-    description = sanitize(extract_description(soup))
-    image = extract_image(soup)
+    if result.image is None:
+        image = extract_image(soup)
+        if absolute_url and image:
+            image = make_absolute_url(image, url)
+        result.image = image
 
-    if absolute_url and image:
-        image = make_absolute_url(image, url)
 
-    result = WebPreview(url=url, title=title, description=description, image=image)
+def parse_generic(
+    soup: BeautifulSoup,
+    url: str,
+    absolute_url: bool = False,
+    meta_index: Optional[MetaIndex] = None,
+    into: Optional[WebPreview] = None,
+) -> WebPreview:
+    """Extract preview from the generic webpage.
+
+    When ``into`` is given, its missing fields are filled in place and it is returned
+    instead of a new preview.
+    """
+    result = WebPreview(url=url) if into is None else into
+    resolve_generic(result, soup, url, absolute_url, meta_index)
     return result
 
 
@@ -211,8 +594,22 @@ def parse_meta(
     target_attribute: str,
     properties: List[str],
     absolute_url: bool = False,
+    meta_index: Optional[MetaIndex] = None,
+    into: Optional[WebPreview] = None,
 ) -> WebPreview:
-    props = extract_meta_attributes(soup, target_attribute, properties)
+    """Extract preview from the meta tags with the target attribute.
+
+    When ``into`` is given, its missing properties are filled in place and it is
+    returned instead of a new preview.
+    """
+    if into is not None:
+        if meta_index is None:
+            meta_index = MetaIndex.from_soup(soup)
+        for prop, content in iter_meta_attributes(meta_index, target_attribute, properties):
+            fill_missing(into, prop, content, url, absolute_url)
+        return into
+
+    props = extract_meta_attributes(soup, target_attribute, properties, meta_index)
 
     image = props.get("image")
     if absolute_url and image:
@@ -228,10 +625,12 @@ def parse_open_graph(
     url: str,
     properties: Optional[List[str]] = None,
     absolute_url: bool = False,
+    meta_index: Optional[MetaIndex] = None,
+    into: Optional[WebPreview] = None,
 ) -> WebPreview:
     if not properties:
-        properties = ["og:title", "og:description", "og:image"]
-    result = parse_meta(soup, url, "property", properties, absolute_url)
+        properties = OPEN_GRAPH_PROPERTIES
+    result = parse_meta(soup, url, "property", properties, absolute_url, meta_index, into)
     return result
 
 
@@ -240,10 +639,12 @@ def parse_twitter_card(
     url: str,
     properties: Optional[List[str]] = None,
     absolute_url: bool = False,
+    meta_index: Optional[MetaIndex] = None,
+    into: Optional[WebPreview] = None,
 ) -> WebPreview:
     if not properties:
-        properties = ["twitter:title", "twitter:description", "twitter:image"]
-    result = parse_meta(soup, url, "name", properties, absolute_url)
+        properties = TWITTER_CARD_PROPERTIES
+    result = parse_meta(soup, url, "name", properties, absolute_url, meta_index, into)
     return result
 
 
@@ -252,12 +653,446 @@ def parse_schema(
     url: str,
     properties: Optional[List[str]] = None,
     absolute_url: bool = False,
+    meta_index: Optional[MetaIndex] = None,
+    into: Optional[WebPreview] = None,
 ) -> WebPreview:
     if not properties:
-        properties = ["name", "description", "image"]
-    result = parse_meta(soup, url, "itemprop", properties, absolute_url)
-    if result.name:
-        result["title"] = result.name
+        properties = SCHEMA_PROPERTIES
+
+    if into is not None:
+        if meta_index is None:
+            meta_index = MetaIndex.from_soup(soup)
+        # Schema's name is the title, taking precedence over any title property
+        name = None
+        for prop, content in iter_meta_attributes(meta_index, "itemprop", properties):
+            if prop == "name":
+                name = content
+        fill_missing(into, "title", name, url)
+        return parse_meta(soup, url, "itemprop", properties, absolute_url, meta_index, into)
+
+    result = parse_meta(soup, url, "itemprop", properties, absolute_url, meta_index)
+    if result["name"]:
+        result["title"] = result["name"]
+    return result
+
+
+def iter_json_ld_nodes(blocks: Iterable[str]) -> Iterator[Dict]:
+    """Decode the JSON-LD blocks one at a time and yield the nodes describing the page.
+
+    Nodes are the objects at the top level of a block or in its ``@graph``, except the
+    ones of ``JSON_LD_IGNORED_TYPES``. Malformed blocks are skipped.
+    """
+    for block in blocks:
+        try:
+            data = json.loads(block)
+        except (ValueError, RecursionError):
+            continue
+
+        for item in data if isinstance(data, list) else [data]:
+            if not isinstance(item, dict):
+                continue
+            graph = item.get("@graph")
+            for node in graph if isinstance(graph, list) else [item]:
+                if not isinstance(node, dict):
+                    continue
+                types = node.get("@type")
+                types = types if isinstance(types, list) else [types]
+                if types and all(isinstance(t, str) and t in JSON_LD_IGNORED_TYPES for t in types):
+                    continue
+                yield node
+
+
+def json_ld_value(value: object) -> Optional[str]:
+    """Text of a JSON-LD property, taking the first of a list and the URL of an object."""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get("url") or value.get("contentUrl")
+    if isinstance(value, str):
+        return value.strip() or None
+    return None
+
+
+def parse_json_ld(
+    soup: BeautifulSoup,
+    url: str,
+    absolute_url: bool = False,
+    meta_index: Optional[MetaIndex] = None,
+    into: Optional[WebPreview] = None,
+) -> WebPreview:
+    """Extract preview from the JSON-LD blocks of the page.
+
+    Blocks are decoded lazily and decoding stops as soon as the preview is complete.
+    When ``into`` is given, its missing fields are filled in place and it is returned
+    instead of a new preview.
+    """
+    if meta_index is None:
+        meta_index = MetaIndex.from_soup(soup)
+
+    result = WebPreview(url=url) if into is None else into
+    for node in iter_json_ld_nodes(meta_index.json_ld):
+        for prop, keys in JSON_LD_PROPERTIES:
+            for key in keys:
+                fill_missing(result, prop, json_ld_value(node.get(key)), url, absolute_url)
+        if result.is_complete():
+            break
+    return result
+
+
+def iter_json_ld_images(value: object) -> Iterator[Tuple[str, Optional[int], Optional[int]]]:
+    """Yield the URL, width and height of every image of a JSON-LD property."""
+    for image in value if isinstance(value, list) else [value]:
+        width = height = None
+        if isinstance(image, dict):
+            width, height = parse_dimension(image.get("width")), parse_dimension(
+                image.get("height")
+            )
+            image = image.get("url") or image.get("contentUrl")
+        if isinstance(image, str) and image.strip():
+            yield image.strip(), width, height
+
+
+def extract_image_candidates(
+    soup: BeautifulSoup, url: Optional[str] = None, meta_index: Optional[MetaIndex] = None
+) -> List[ImageCandidate]:
+    """Extract every image the page offers for its preview, with their declared dimensions.
+
+    Candidates come in the order of the fallback chain: all ``og:image`` tags with their
+    ``og:image:width``, ``og:image:height`` and ``og:image:type``, ``twitter:image``,
+    Schema's ``image``, JSON-LD images, ``<link rel="image_src">`` and finally the image
+    next to the first heading. Relative URLs are made absolute when ``url`` is given.
+    An image named more than once appears once, at its first place.
+    """
+    if meta_index is None:
+        meta_index = MetaIndex.from_soup(soup)
+
+    open_graph: List[ImageCandidate] = []
+    twitter_card: List[ImageCandidate] = []
+    schema: List[ImageCandidate] = []
+    links: List[ImageCandidate] = []
+    for tag in soup.find_all(["meta", "link"]):
+        if tag.name == "link":
+            href = tag.get("href")
+            if href and "image_src" in tag.get_attribute_list("rel"):
+                links.append(ImageCandidate(href, "image_src"))
+            continue
+
+        content = tag.get("content")
+        if not content:
+            continue
+        if tag.get("itemprop") == "image":
+            schema.append(ImageCandidate(content, "schema"))
+            continue
+        # Pages use either attribute for both kinds of tags
+        key = (tag.get("property") or tag.get("name") or "").lower()
+        if key == "og:image" or (key == "og:image:url" and not open_graph):
+            open_graph.append(ImageCandidate(content, "og:image"))
+        elif key == "og:image:url" and open_graph[-1].url != content:
+            open_graph.append(ImageCandidate(content, "og:image"))
+        elif key in ("og:image:width", "og:image:height") and open_graph:
+            setattr(open_graph[-1], key[len("og:image:") :], parse_dimension(content))
+        elif key == "og:image:type" and open_graph:
+            open_graph[-1].type = content
+        elif key in ("twitter:image", "twitter:image:src"):
+            twitter_card.append(ImageCandidate(content, "twitter:image"))
+
+    json_ld = [
+        ImageCandidate(image, "json_ld", width, height)
+        for node in iter_json_ld_nodes(meta_index.json_ld)
+        for key in ("image", "thumbnailUrl")
+        for image, width, height in iter_json_ld_images(node.get(key))
+    ]
+    image = extract_image(soup)
+    generic = [ImageCandidate(image, "img")] if image else []
+
+    candidates: Dict[str, ImageCandidate] = {}
+    for candidate in open_graph + twitter_card + schema + json_ld + links + generic:
+        if url:
+            candidate.url = make_absolute_url(candidate.url, url)
+        first = candidates.setdefault(candidate.url, candidate)
+        if first is not candidate and not (first.width or first.height):
+            # Keep the dimensions declared elsewhere for the same image
+            first.width, first.height = candidate.width, candidate.height
+    return list(candidates.values())
+
+
+def parse_meta_chain(
+    result: WebPreview,
+    soup: Optional[BeautifulSoup],
+    url: str,
+    target_attribute: Optional[str] = None,
+    properties: Optional[List[str]] = None,
+    absolute_url: bool = False,
+    meta_index: Optional[MetaIndex] = None,
+    stats: Optional[PreviewStats] = None,
+) -> Optional[str]:
+    """Fill in the missing properties of the result from meta tags until it is complete.
+
+    Tries user supplied ``target_attribute`` and ``properties`` first, then OpenGraph,
+    TwitterCard and Schema tags, and finally JSON-LD. Returns the name of the stage that
+    completed the result: "meta", "open_graph", "twitter_card", "schema" or "json_ld",
+    or ``None`` if it is still incomplete. Every stage is timed in ``stats``, if given.
+    """
+    if meta_index is None:
+        meta_index = MetaIndex.from_soup(soup)
+
+    # If explicit list of meta properties is given, try to extract data using them
+    if target_attribute and properties:
+        with measure(stats, "meta"):
+            parse_meta(soup, url, target_attribute, properties, absolute_url, meta_index, result)
+        if result.is_complete():
+            return "meta"
+
+    # Try to extract standard OpenGraph meta properties
+    with measure(stats, "open_graph"):
+        parse_open_graph(soup, url, properties, absolute_url, meta_index, result)
+    if result.is_complete():
+        return "open_graph"
+
+    # Try to extract Twitter Card properties
+    with measure(stats, "twitter_card"):
+        parse_twitter_card(soup, url, properties, absolute_url, meta_index, result)
+    if result.is_complete():
+        return "twitter_card"
+
+    # Try to extract Schema properties
+    with measure(stats, "schema"):
+        parse_schema(soup, url, properties, absolute_url, meta_index, result)
+    if result.is_complete():
+        return "schema"
+
+    # Try to extract JSON-LD structured data, only decoded now that fields are missing
+    if meta_index.json_ld:
+        with measure(stats, "json_ld"):
+            parse_json_ld(soup, url, absolute_url, meta_index, result)
+        if result.is_complete():
+            return "json_ld"
+
+    return None
+
+
+def parse_head(
+    url: str,
+    chunks: Iterator[str],
+    target_attribute: Optional[str] = None,
+    properties: Optional[List[str]] = None,
+    absolute_url: bool = False,
+    stats: Optional[PreviewStats] = None,
+) -> Tuple[WebPreview, Optional[str]]:
+    """Extract preview from the meta tags of the page's ``<head>`` only.
+
+    The pieces of the page are fed into ``HeadParser`` and reading stops as soon
+    as the head is over and meta tags supplied title, description, and image.
+
+    Returns:
+        Tuple of the preview and the page's content. The content is ``None`` when
+        the preview is complete and the rest of the page was never read.
+    """
+    head = HeadParser()
+    received = []
+    try:
+        for chunk in chunks:
+            received.append(chunk)
+            head.feed(chunk)
+            if head.head_closed:
+                break
+
+        result = WebPreview(url=url)
+        stage = parse_meta_chain(
+            result, None, url, target_attribute, properties, absolute_url, head.meta_index, stats
+        )
+        if stage:
+            if stats is not None:
+                stats.completed_by = stage
+            return result, None
+
+        # Meta tags are not enough, read the rest of the page for the generic parser
+        received.extend(chunks)
+        return result, "".join(received)
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+def webpreview_head(
+    url: str,
+    timeout: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    target_attribute: Optional[str] = None,
+    properties: Optional[List[str]] = None,
+    absolute_url: bool = False,
+    session: Optional[requests.Session] = None,
+    max_bytes: Optional[int] = None,
+    deadline: Optional[float] = None,
+    min_rate: Optional[float] = None,
+) -> Tuple[WebPreview, Optional[str]]:
+    """Request the page and extract preview from the meta tags of its ``<head>`` only.
+
+    The page is streamed and the connection is closed as soon as the head is over and
+    meta tags supplied title, description, and image. See ``parse_head``.
+    """
+    url = validate_url(url)
+    validate_properties(target_attribute, properties)
+    chunks = stream_content(
+        url,
+        timeout,
+        headers,
+        session=session,
+        max_bytes=max_bytes,
+        deadline=deadline,
+        min_rate=min_rate,
+    )
+    return parse_head(url, chunks, target_attribute, properties, absolute_url)
+
+
+def webpreview_images(
+    url: str,
+    timeout: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    content: Optional[str] = None,
+    parser: str = "auto",
+    session: Optional[requests.Session] = None,
+    prober: Optional[ImageProber] = None,
+) -> List[ImageCandidate]:
+    """Extract every image the page offers for its preview. See ``extract_image_candidates``.
+
+    Args:
+        prober (ImageProber): Prober to read the type and dimensions of the images
+            with, concurrently. Each image is requested only once per prober.
+
+        The rest of the arguments are the same as in ``webpreview``.
+
+    Returns:
+        List of ``ImageCandidate`` with absolute URLs. ``best_image`` picks the largest.
+    """
+    url = validate_url(url)
+    if not content:
+        content = retrieve_content(url, timeout, headers, session=session)
+
+    document = Document(content, parser)
+    candidates = extract_image_candidates(document.soup, url, document.meta_index)
+    if prober is not None:
+        prober.probe_candidates(candidates)
+    return candidates
+
+
+class Document:
+    """Page content parsed on demand.
+
+    The meta index and the BeautifulSoup tree are built the first time they are
+    accessed. With the "lxml-direct" parser, meta tags are read without BeautifulSoup,
+    so pages fully described by their meta tags never get a tree at all.
+
+    Content may be given as raw bytes, in which case its encoding is sniffed from the
+    ``encoding`` declared by the server, a byte order mark or a ``<meta>`` declaration.
+    "lxml-direct" decodes the bytes itself, they are only decoded in Python for BeautifulSoup.
+
+    Building the index and the tree is timed in ``stats``, if given, which also records
+    the parser used.
+    """
+
+    def __init__(
+        self,
+        content: Union[str, bytes],
+        parser: str = "auto",
+        soup: Optional[BeautifulSoup] = None,
+        meta_index: Optional[MetaIndex] = None,
+        encoding: Optional[str] = None,
+        stats: Optional[PreviewStats] = None,
+    ) -> None:
+        self.content = content
+        self.parser = parser
+        self.encoding = sniff_encoding(content, encoding) if isinstance(content, bytes) else None
+        self.stats = stats
+        self._soup = soup
+        self._meta_index = meta_index
+
+    @property
+    def text(self) -> str:
+        if isinstance(self.content, bytes):
+            # Decode once with the sniffed encoding so that BeautifulSoup never guesses it
+            self.content = decode_body(self.content, self.encoding)
+        return self.content
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        if self._soup is None:
+            parser = resolve_parser(self.parser)
+            with measure(self.stats, "soup"):
+                self._soup = BeautifulSoup(self.text, parser)
+            if self.stats is not None and self.stats.parser is None:
+                self.stats.parser = parser
+        return self._soup
+
+    @property
+    def meta_index(self) -> MetaIndex:
+        if self._meta_index is None:
+            # Pages that need the generic parser would be parsed twice, so it is opt-in
+            if self.parser == "lxml-direct" and self._soup is None:
+                with measure(self.stats, "meta_index"):
+                    self._meta_index = MetaIndex.from_lxml(self.content, self.encoding)
+                if self.stats is not None:
+                    self.stats.parser = "lxml-direct"
+            else:
+                soup = self.soup
+                with measure(self.stats, "meta_index"):
+                    self._meta_index = MetaIndex.from_soup(soup)
+        return self._meta_index
+
+
+def parse_document(
+    result: WebPreview,
+    document: Document,
+    url: str,
+    target_attribute: Optional[str] = None,
+    properties: Optional[List[str]] = None,
+    absolute_url: bool = False,
+) -> Optional[str]:
+    """Fill in the missing fields of the result following the fallback mechanism.
+
+    Work stops at the first stage that completes the result, and the generic parser
+    only extracts the fields still missing after the meta tags were tried.
+
+    Returns:
+        Name of the stage that completed the result, "generic" for the generic parser,
+        or ``None`` if the result stayed incomplete.
+    """
+    # All meta tags are indexed at once and shared between the meta stages
+    meta_index = document.meta_index
+    stage = parse_meta_chain(
+        result, None, url, target_attribute, properties, absolute_url, meta_index, document.stats
+    )
+    if stage:
+        return stage
+
+    # Try to extract the missing fields from generic webpage
+    soup = document.soup
+    with measure(document.stats, "generic"):
+        resolve_generic(result, soup, url, absolute_url, meta_index)
+    return "generic" if result.is_complete() else None
+
+
+def parse_content(
+    url: str,
+    content: Union[str, bytes],
+    target_attribute: Optional[str] = None,
+    properties: Optional[List[str]] = None,
+    parser: str = "auto",
+    absolute_url: bool = False,
+    encoding: Optional[str] = None,
+    stats: Optional[PreviewStats] = None,
+) -> WebPreview:
+    """Extract preview from the page's content following the fallback mechanism.
+
+    Content given as bytes is decoded as described by ``Document``, with ``encoding``
+    being the charset declared by the server, if any. The stages are timed in
+    ``stats``, if given, together with the one that completed the preview.
+    """
+    result = WebPreview(url=url)
+    document = Document(content, parser, encoding=encoding, stats=stats)
+    stage = parse_document(result, document, url, target_attribute, properties, absolute_url)
+    if stats is not None:
+        stats.completed_by = stage
     return result
 
 
@@ -268,15 +1103,27 @@ def webpreview(
     content: Optional[str] = None,
     target_attribute: Optional[str] = None,
     properties: Optional[List[str]] = None,
-    parser: str = "html.parser",
+    parser: str = "auto",
     absolute_url: bool = False,
+    stream: bool = False,
+    session: Optional[requests.Session] = None,
+    cache: Optional[PreviewCache] = None,
+    max_bytes: Optional[int] = None,
+    deadline: Optional[float] = None,
+    min_rate: Optional[float] = None,
+    parse_pool: Optional["ParsePool"] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    instrument: Optional[Instrument] = None,
+    coalesce: bool = True,
 ) -> WebPreview:
     """Extract title, description and image from any page.
 
     This method follows a fallback mechanism, by trying one approach after another.
     It starts with user supplied ``target_attribute`` and ``properties``, then
-    attempts standard OpenGraph tags, followed by TwitterCard and Schema tags.
-    As a last resort, the page is treated as a generic webpage.
+    attempts standard OpenGraph tags, followed by TwitterCard and Schema tags and
+    JSON-LD structured data.
+    As a last resort, the fields still missing are extracted from the page treated as
+    a generic webpage.
 
     If at any moment all three of title, description, and preview image are extracted
     the result is returned without trying anything further.
@@ -289,49 +1136,328 @@ def webpreview(
             a timeout exception when requesting the page's source.
         headers (dict): Request headers to pass to the requests library.
         content (str): Page's content. When given, no request will be made to retrieve
-            the source and instead the supplied content will be used.
+            the source and instead the supplied content will be used. Raw bytes are
+            decoded with the encoding declared by their byte order mark or ``<meta>``
+            tag, or UTF-8.
         target_attribute (str): Manually specify which meta tag attribute to parse
             as a source of properties.
         properties (list): Manually specify which meta tag properties to parse. Must be
             specified together with ``target_attribute``.
         parser (str): Which parser type to give to BeautifulSoup library. Allowed values
             are "html.parser", "lxml", "html5lib". Note all of them except for "html.parser"
-            require additional dependencies. Defaults to "html.parser".
+            require additional dependencies. "lxml-direct" reads meta tags with lxml
+            without building a BeautifulSoup tree at all, which is only built if generic
+            parsing is needed.
+            "auto" picks "lxml" when it is installed and "html.parser" otherwise.
+            Defaults to "auto".
         absolute_url (bool): Convert preview image URL to absolute URL. Defaults to False.
+        stream (bool): Stream the page and stop downloading it right after ``</head>``
+            if its meta tags already contain title, description, and image. The rest
+            of the page is downloaded only when generic parsing is needed.
+            Defaults to False.
+        session (requests.Session): Session to request the page with, which allows
+            to reuse connections between calls.
+        cache (PreviewCache): Cache to look the preview up in before requesting the page
+            and to store it in afterwards. Defaults to the cache set by ``set_default_cache``.
+            Cached previews stay fresh for as long as the page's caching headers allow.
+            Expired ones are revalidated with the ETag and Last-Modified of the page, so
+            that an unchanged page is not downloaded and parsed again.
+            Previews of the supplied ``content`` are never cached.
+        max_bytes (int): Stop downloading the page after this many bytes.
+        deadline (float): Stop downloading the page after this many seconds since the
+            request was made.
+        min_rate (float): Stop downloading the page if it arrives slower than this many
+            bytes per second.
+
+        Whatever was downloaded before any of the limits was reached is still parsed.
+        Pages that are not HTML according to their Content-Type, such as PDFs or videos,
+        are rejected with ``UnsupportedContentType`` before their body is downloaded.
+
+        parse_pool (ParsePool): Pool of worker processes to parse the page in, instead
+            of the calling thread.
+        breaker (CircuitBreaker): Tracker of failing pages and hosts, which makes pages
+            that failed recently raise again, and pages of hosts that keep failing raise
+            ``HostUnavailable``, without requesting them. Defaults to the breaker set by
+            ``set_default_breaker``. Cached previews are returned regardless.
+        coalesce (bool): Let concurrent calls for the same page, with the same options
+            and headers, share a single request and parsing, including its result or
+            exception. A call waits for the one in flight no longer than its own
+            ``timeout`` and ``deadline``. Calls with the supplied ``content`` or
+            ``session`` are never coalesced. Defaults to True.
+        instrument (callable): Callback receiving the ``PreviewStats`` of the call once
+            it is over, even if it failed: timings of every stage, the stage that
+            completed the preview, bytes downloaded and the parser used.
+            A ``StatsAggregator`` collects them into histograms.
 
     Returns:
         WebPreview: object with extracted fields.
     """
 
-    url, _, soup = initialize(url, timeout, headers, content, target_attribute, properties, parser)
-    result = WebPreview(url=url)
+    url = validate_url(url)
+    validate_properties(target_attribute, properties)
 
-    # If explicit list of meta properties is given, try to extract data using them
-    if target_attribute and properties:
-        meta = parse_meta(soup, url, target_attribute, properties, absolute_url)
-        result.merge(meta)
-        if result.is_complete():
-            return result
+    stats = PreviewStats(url) if instrument is not None else None
 
-    # Try to extract standard OpenGraph meta properties
-    open_graph = parse_open_graph(soup, url, properties, absolute_url)
-    result.merge(open_graph)
-    if result.is_complete():
-        return result
+    def parse(content: Union[str, bytes], encoding: Optional[str] = None) -> WebPreview:
+        if parse_pool is not None:
+            with measure(stats, "parse"):
+                return parse_pool.parse(
+                    url, content, target_attribute, properties, parser, absolute_url, encoding
+                )
+        return parse_content(
+            url, content, target_attribute, properties, parser, absolute_url, encoding, stats
+        )
 
-    # Try to extract Twitter Card properties
-    twitter_card = parse_twitter_card(soup, url, properties, absolute_url)
-    result.merge(twitter_card)
-    if result.is_complete():
+    started = time.perf_counter()
+    try:
+        if content:
+            return parse(content)
+
+        # Pages requested with a session may depend on its cookies and authentication
+        if coalesce and session is None:
+            # Concurrent calls for the same page wait for the first one instead of repeating it
+            key = (
+                cache_key(url, target_attribute, properties, absolute_url),
+                frozenset(headers.items()) if headers else None,
+                (parser, stream, timeout, max_bytes, deadline, min_rate),
+                (id(cache), id(breaker)),
+            )
+            preview = partial(
+                webpreview,
+                url,
+                timeout,
+                headers,
+                None,
+                target_attribute,
+                properties,
+                parser,
+                absolute_url,
+                stream=stream,
+                session=session,
+                cache=cache,
+                max_bytes=max_bytes,
+                deadline=deadline,
+                min_rate=min_rate,
+                parse_pool=parse_pool,
+                breaker=breaker,
+                instrument=instrument,
+                coalesce=False,
+            )
+            led = False
+
+            def lead() -> WebPreview:
+                nonlocal led
+                led = True
+                return preview()
+
+            try:
+                wait = total_timeout(timeout_within(timeout, deadline))
+                return get_default_single_flight().do(key, lead, wait)
+            except FutureTimeoutError:
+                if led:
+                    raise
+                raise URLUnreachable("The URL is unreachable.")
+            finally:
+                if led:
+                    # The call in flight has reported its own stats
+                    stats = None
+                elif stats is not None:
+                    stats.completed_by = "coalesced"
+
+        if cache is None:
+            cache = get_default_cache()
+
+        entry = None
+        if cache is not None:
+            key = cache_key(url, target_attribute, properties, absolute_url)
+            entry = cache.get_entry(key)
+            if entry is not None:
+                if entry.is_fresh():
+                    if stats is not None:
+                        stats.completed_by = "cache"
+                    return entry.preview
+                headers = {**(headers or {}), **entry.conditional_headers()}
+
+        timeout = timeout_within(timeout, deadline)
+        deadline = deadline_after(deadline)
+
+        if breaker is None:
+            breaker = get_default_breaker()
+        if breaker is not None:
+            breaker.check(url)
+
+        try:
+            with measure(stats, "request"):
+                res = request_page(url, timeout, headers, stream=True, session=session)
+        except (URLNotFound, URLUnreachable) as e:
+            if breaker is not None:
+                breaker.record_failure(url, e)
+            raise
+        except UnsupportedContentType:
+            # The host has answered, even though not with a web page
+            if breaker is not None:
+                breaker.record_success(url)
+            raise
+        if breaker is not None:
+            breaker.record_success(url)
+
+        if res.status_code == 304 and entry is not None:
+            # The page has not changed since the cached preview was extracted
+            res.close()
+            cache.store_response(key, entry.preview, res.headers, entry)
+            if stats is not None:
+                stats.completed_by = "not_modified"
+            return entry.preview
+
+        if stream:
+            chunks = iter_text(res, max_bytes=max_bytes, deadline=deadline, min_rate=min_rate)
+            with measure(stats, "head"):
+                result, content = parse_head(
+                    url, chunks, target_attribute, properties, absolute_url, stats
+                )
+            if stats is not None:
+                stats.bytes_downloaded = bytes_received(res)
+            if content:
+                result = parse(content)
+        else:
+            # The raw page goes to the parser, which decodes it with the sniffed encoding
+            with measure(stats, "download"):
+                content = read_body(res, max_bytes, deadline, min_rate)
+            if stats is not None:
+                stats.bytes_downloaded = bytes_received(res, content)
+            result = parse(content, header_charset(res)) if content else WebPreview(url=url)
+
+        # Error pages, such as a transient 503, are not previews of the page
+        if cache is not None and 200 <= res.status_code < 300:
+            cache.store_response(key, result, res.headers)
         return result
+    finally:
+        if stats is not None:
+            stats.timings["total"] = time.perf_counter() - started
+            instrument(stats)
 
-    # Try to extract Schema properties
-    schema = parse_schema(soup, url, properties, absolute_url)
-    result.merge(schema)
-    if result.is_complete():
-        return result
 
-    # Try to extract from generic webpage
-    generic = parse_generic(soup, url, absolute_url)
-    result.merge(generic)
-    return result
+def webpreview_many(
+    urls: Iterable[str],
+    concurrency: int = 8,
+    per_host: int = 2,
+    timeout: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    target_attribute: Optional[str] = None,
+    properties: Optional[List[str]] = None,
+    parser: str = "auto",
+    absolute_url: bool = False,
+    session: Optional[requests.Session] = None,
+    cache: Optional[PreviewCache] = None,
+    max_bytes: Optional[int] = None,
+    deadline: Optional[float] = None,
+    min_rate: Optional[float] = None,
+    parse_pool: Optional["ParsePool"] = None,
+    http2: bool = False,
+    breaker: Optional[CircuitBreaker] = None,
+    instrument: Optional[Instrument] = None,
+) -> Iterator[Tuple[str, Union[WebPreview, Exception]]]:
+    """Extract previews of many pages concurrently.
+
+    Pages are requested from a pool of threads sharing one ``requests.Session``, so
+    connections to the same host are reused. Identical URLs are previewed only once.
+    Results are yielded in the order they complete.
+
+    Args:
+        urls (iterable): URLs of the pages. The iterable is consumed lazily.
+        concurrency (int): Number of pages requested and parsed at the same time.
+        per_host (int): Maximum number of simultaneous connections to a single host.
+        session (requests.Session): Session to request the pages with. By default, a new
+            session pooling up to ``per_host`` connections per host is used. The pool of
+            a supplied session is used as is, ignoring ``per_host``.
+        cache (PreviewCache): Cache to look the previews up in and to store them in.
+            Defaults to the cache set by ``set_default_cache``.
+        parse_pool (ParsePool): Pool of worker processes to parse the pages in, so that
+            parsing uses more than one CPU. Pages are still requested from threads.
+        http2 (bool): Request the pages over HTTP/2 from servers that support it, so that
+            all requests to a host share a single connection and ``per_host`` no longer
+            applies. Ignored when a session is supplied. Requires ``webpreview[http2]``.
+        breaker (CircuitBreaker): Tracker of failing pages and hosts, so that the pages
+            of a host that is down fail fast instead of each waiting for the ``timeout``.
+            Defaults to the breaker set by ``set_default_breaker``.
+        instrument (callable): Callback receiving the ``PreviewStats`` of every page,
+            called from the worker threads. See ``webpreview``.
+
+        The rest of the arguments are the same as in ``webpreview``.
+
+    Yields:
+        Tuple of the normalized URL and either ``WebPreview`` or the exception raised
+        while previewing it.
+    """
+    validate_properties(target_attribute, properties)
+
+    own_session = session is None
+    if own_session:
+        session = requests.Session()
+        if http2:
+            # Requests to a host are multiplexed over one connection
+            adapter = HTTP2Adapter(max_connections=concurrency)
+        else:
+            # Requests wait for a free connection once all of the host's ones are busy
+            adapter = HTTPAdapter(
+                pool_connections=concurrency, pool_maxsize=per_host, pool_block=True
+            )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+    def preview(url: str) -> WebPreview:
+        return webpreview(
+            url,
+            timeout,
+            headers,
+            None,
+            target_attribute,
+            properties,
+            parser,
+            absolute_url,
+            session=session,
+            cache=cache,
+            max_bytes=max_bytes,
+            deadline=deadline,
+            min_rate=min_rate,
+            parse_pool=parse_pool,
+            breaker=breaker,
+            instrument=instrument,
+        )
+
+    def outcome(future: Future) -> Union[WebPreview, Exception]:
+        exception = future.exception()
+        return exception if exception is not None else future.result()
+
+    seen = set()
+    pending: Dict[Future, str] = {}
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        for url in urls:
+            try:
+                url = normalize_url(url)
+            except (WebpreviewException, InvalidURL) as e:
+                yield url, e
+                continue
+
+            if url in seen:
+                continue
+            seen.add(url)
+            pending[executor.submit(preview, url)] = url
+
+            # Don't read further ahead than needed to keep all workers busy
+            if len(pending) >= 2 * concurrency:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), outcome(future)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), outcome(future)
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+        if own_session:
+            session.close()
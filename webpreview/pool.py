@@ -0,0 +1,112 @@
+"""Parsing pages in worker processes.
+
+Parsing holds the GIL, so previews parsed in threads use a single core no matter how
+many threads there are. A ``ParsePool`` moves parsing to separate processes, while
+pages are still requested concurrently from threads:
+
+    >>> with ParsePool(workers=4) as pool:
+    ...     for url, preview in webpreview_many(urls, concurrency=32, parse_pool=pool):
+    ...         print(url, preview)
+
+On platforms starting processes with "spawn", such as Windows and macOS, create the
+pool under ``if __name__ == "__main__":``.
+"""
+
+import multiprocessing
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Union
+
+from .models import WebPreview
+from .parsers import parse_content
+
+# Forking a process with running threads may deadlock the child, so workers are
+# started from a clean server process where possible
+DEFAULT_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def parse_to_dict(
+    url: str,
+    content: Union[str, bytes],
+    target_attribute: Optional[str] = None,
+    properties: Optional[List[str]] = None,
+    parser: str = "auto",
+    absolute_url: bool = False,
+    encoding: Optional[str] = None,
+) -> Dict[str, str]:
+    """Parse the content in a worker and return the preview's fields without empty ones."""
+    return parse_content(
+        url, content, target_attribute, properties, parser, absolute_url, encoding
+    ).to_dict()
+
+
+class ParsePool:
+    """Pool of worker processes parsing pages.
+
+    Args:
+        workers (int): Number of worker processes. Defaults to the number of CPUs.
+        max_tasks_per_worker (int): Pages parsed by a worker before it is replaced
+            with a fresh one, which returns the memory it has accumulated.
+            ``None`` keeps workers for the lifetime of the pool.
+        start_method (str): How worker processes are started, see ``multiprocessing``.
+            Defaults to "forkserver" where available and "spawn" otherwise.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_tasks_per_worker: Optional[int] = 1000,
+        start_method: Optional[str] = None,
+    ) -> None:
+        context = multiprocessing.get_context(start_method or DEFAULT_START_METHOD)
+        self.workers = workers or multiprocessing.cpu_count()
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._pool = context.Pool(self.workers, maxtasksperchild=max_tasks_per_worker)
+
+    def submit(
+        self,
+        url: str,
+        content: Union[str, bytes],
+        target_attribute: Optional[str] = None,
+        properties: Optional[List[str]] = None,
+        parser: str = "auto",
+        absolute_url: bool = False,
+        encoding: Optional[str] = None,
+    ) -> "Future[WebPreview]":
+        """Schedule parsing of the content and return a future of its preview."""
+        future: "Future[WebPreview]" = Future()
+        future.set_running_or_notify_cancel()
+        self._pool.apply_async(
+            parse_to_dict,
+            (url, content, target_attribute, properties, parser, absolute_url, encoding),
+            callback=lambda fields: future.set_result(WebPreview(**fields)),
+            error_callback=future.set_exception,
+        )
+        return future
+
+    def parse(
+        self,
+        url: str,
+        content: Union[str, bytes],
+        target_attribute: Optional[str] = None,
+        properties: Optional[List[str]] = None,
+        parser: str = "auto",
+        absolute_url: bool = False,
+        encoding: Optional[str] = None,
+    ) -> WebPreview:
+        """Parse the content in a worker, blocking until its preview is ready."""
+        return self.submit(
+            url, content, target_attribute, properties, parser, absolute_url, encoding
+        ).result()
+
+    def close(self) -> None:
+        """Let the workers finish scheduled pages and stop them."""
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self) -> "ParsePool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
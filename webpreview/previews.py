@@ -12,8 +12,12 @@ from .previews import webpreview
 class PreviewBase(WebPreview):
     """
     Base for all compatibility web previews.
+
+    The parsed page is only kept around in ``_soup`` when ``keep_soup`` is set.
     """
 
+    __slots__ = ("_soup",)
+
     def __init__(
         self,
         url: Optional[str] = None,
@@ -21,8 +25,9 @@ class PreviewBase(WebPreview):
         timeout: Optional[int] = None,
         headers: Optional[Dict[str, str]] = None,
         content: Optional[str] = None,
-        parser: str = "html.parser",
+        parser: str = "auto",
         target_attribute: str = "property",
+        keep_soup: bool = False,
     ):
         if not url:
             raise EmptyURL("Please pass a valid URL as the first argument.")
@@ -46,7 +51,12 @@ class PreviewBase(WebPreview):
         # These two properties below are for compatibility with these old classes from webpreview
         self.url = _url
         self.properties = properties
-        self._soup = soup
+        self._soup = soup if keep_soup else None
+
+        self.extract(soup, target_attribute)
+
+    def extract(self, soup: BeautifulSoup, target_attribute: str) -> None:
+        """Merge properties extracted from the parsed page into the preview."""
 
 
 class GenericPreview(PreviewBase):
@@ -54,6 +64,8 @@ class GenericPreview(PreviewBase):
     Extracts title, description, image from a webpage's body instead of the meta tags.
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         url: Optional[str] = None,
@@ -61,10 +73,13 @@ class GenericPreview(PreviewBase):
         timeout: Optional[int] = None,
         headers: Optional[Dict[str, str]] = None,
         content: Optional[str] = None,
-        parser: str = "html.parser",
+        parser: str = "auto",
+        keep_soup: bool = False,
     ):
-        super().__init__(url, properties, timeout, headers, content, parser)
-        preview = parse_generic(self._soup, self.url)
+        super().__init__(url, properties, timeout, headers, content, parser, keep_soup=keep_soup)
+
+    def extract(self, soup: BeautifulSoup, target_attribute: str) -> None:
+        preview = parse_generic(soup, self.url)
         self.merge(preview)
 
 
@@ -73,6 +88,8 @@ class SocialPreviewBase(PreviewBase):
     Abstract class for OpenGraph, TwitterCard and Google+.
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         url: Optional[str] = None,
@@ -80,11 +97,16 @@ class SocialPreviewBase(PreviewBase):
         timeout: Optional[int] = None,
         headers: Optional[Dict[str, str]] = None,
         content: Optional[str] = None,
-        parser: str = "html.parser",
+        parser: str = "auto",
         target_attribute: str = "property",
+        keep_soup: bool = False,
     ):
-        super().__init__(url, properties, timeout, headers, content, parser)
-        preview = parse_meta(self._soup, self.url, target_attribute, properties)
+        super().__init__(
+            url, properties, timeout, headers, content, parser, target_attribute, keep_soup
+        )
+
+    def extract(self, soup: BeautifulSoup, target_attribute: str) -> None:
+        preview = parse_meta(soup, self.url, target_attribute, self.properties)
         self.merge(preview)
 
 
@@ -106,6 +128,8 @@ class OpenGraph(SocialPreviewBase):
         "15.00"
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         url: Optional[str] = None,
@@ -113,10 +137,14 @@ class OpenGraph(SocialPreviewBase):
         timeout: Optional[int] = None,
         headers: Optional[Dict[str, str]] = None,
         content: Optional[str] = None,
-        parser: str = "html.parser",
+        parser: str = "auto",
+        keep_soup: bool = False,
     ):
-        super().__init__(url, properties, timeout, headers, content, parser)
-        preview = parse_open_graph(self._soup, self.url, properties)
+        super().__init__(url, properties, timeout, headers, content, parser, keep_soup=keep_soup)
+
+    def extract(self, soup: BeautifulSoup, target_attribute: str) -> None:
+        super().extract(soup, target_attribute)
+        preview = parse_open_graph(soup, self.url, self.properties)
         self.merge(preview)
 
 
@@ -131,6 +159,8 @@ class TwitterCard(SocialPreviewBase):
         >>> tc.image
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         url: Optional[str] = None,
@@ -138,10 +168,14 @@ class TwitterCard(SocialPreviewBase):
         timeout: Optional[int] = None,
         headers: Optional[Dict[str, str]] = None,
         content: Optional[str] = None,
-        parser: str = "html.parser",
+        parser: str = "auto",
+        keep_soup: bool = False,
     ):
-        super().__init__(url, properties, timeout, headers, content, parser)
-        preview = parse_twitter_card(self._soup, self.url, properties)
+        super().__init__(url, properties, timeout, headers, content, parser, keep_soup=keep_soup)
+
+    def extract(self, soup: BeautifulSoup, target_attribute: str) -> None:
+        super().extract(soup, target_attribute)
+        preview = parse_twitter_card(soup, self.url, self.properties)
         self.merge(preview)
 
 
@@ -157,6 +191,8 @@ class Schema(SocialPreviewBase):
         >>> aschema.camel_case_property
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         url: Optional[str] = None,
@@ -164,10 +200,14 @@ class Schema(SocialPreviewBase):
         timeout: Optional[int] = None,
         headers: Optional[Dict[str, str]] = None,
         content: Optional[str] = None,
-        parser: str = "html.parser",
+        parser: str = "auto",
+        keep_soup: bool = False,
     ):
-        super().__init__(url, properties, timeout, headers, content, parser)
-        preview = parse_schema(self._soup, self.url, properties)
+        super().__init__(url, properties, timeout, headers, content, parser, keep_soup=keep_soup)
+
+    def extract(self, soup: BeautifulSoup, target_attribute: str) -> None:
+        super().extract(soup, target_attribute)
+        preview = parse_schema(soup, self.url, self.properties)
         self.merge(preview)
 
 
@@ -176,7 +216,7 @@ def web_preview(
     timeout: Optional[int] = None,
     headers: Optional[Dict[str, str]] = None,
     content: Optional[str] = None,
-    parser: str = "html.parser",
+    parser: str = "auto",
     absolute_image_url: bool = False,
 ) -> Tuple[Optional[str], Optional[str], Optional[str]]:
     """Extract title, description and image from OpenGraph or TwitterCard or Schema or GenericPreview.
@@ -197,7 +237,11 @@ def web_preview(
             the source and instead the supplied content will be used.
         parser (str): Which parser type to give to BeautifulSoup library. Allowed values
             are "html.parser", "lxml", "html5lib". Note all of them except for "html.parser"
-            require additional dependencies. Defaults to "html.parser".
+            require additional dependencies. "lxml-direct" reads meta tags with lxml
+            without building a BeautifulSoup tree at all, which is only built if generic
+            parsing is needed.
+            "auto" picks "lxml" when it is installed and "html.parser" otherwise.
+            Defaults to "auto".
         absolute_image_url (bool): Convert preview image URL to absolute URL. Defaults to False.
 
     Returns:
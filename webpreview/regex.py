@@ -32,4 +32,25 @@ VALID_URL = re.compile(
     re.IGNORECASE,
 )
 
+# Common shape of URLs: optional scheme, plain ASCII host name, optional port and no user
+# info. Every URL it matches is matched by VALID_URL too, so most URLs skip the large pattern.
+PLAIN_URL = re.compile(
+    r"(?P<scheme>https?://)?"
+    r"(?P<netloc>(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}(?::[0-9]{1,5})?)"
+    r"(?P<rest>/\S*|\?\S+)?\Z",
+    re.IGNORECASE,
+)
+
 WHITESPACE = re.compile(r"\s+", re.IGNORECASE)
+
+# Property names in camelCase, turned into snake_case
+UPPERCASE = re.compile(r"[A-Z]")
+# regex taken from 2nd answer at
+# http://stackoverflow.com/questions/1175208/elegant-python-function-to-convert-camelcase-to-camel-case
+CAMEL_CASE_WORD = re.compile(r"(?!^)([A-Z]+)")
+
+# Charset declared by <meta charset="..."> or <meta http-equiv="Content-Type" content="...; charset=...">
+META_CHARSET = re.compile(rb"<meta[^>]*?charset\s*=\s*[\"']?\s*([-\w.:]+)", re.IGNORECASE)
+
+# End of the head, after which no charset declaration is expected
+HEAD_END = re.compile(rb"</head|<body", re.IGNORECASE)
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from webpreview import *
+from .test_fixtures import *
+
+
+httpx = pytest.importorskip("httpx")
+
+
+def test_async_webpreview_matches_webpreview(http_server):
+    """
+    async_webpreview extracts the same fields as webpreview.
+    """
+    urls = [
+        f"{http_server}/open-graph/available.html",
+        f"{http_server}/twitter-card/available.html",
+        f"{http_server}/generic-preview/h1-p-desc.html",
+    ]
+
+    async def preview_all():
+        async with AsyncFetcher(max_connections_per_host=1) as fetcher:
+            return await asyncio.gather(*[async_webpreview(u, fetcher=fetcher) for u in urls])
+
+    previews = asyncio.run(preview_all())
+    assert [p.to_dict() for p in previews] == [webpreview(u).to_dict() for u in urls]
+
+
+def test_fetcher_forgets_idle_hosts(http_server):
+    """
+    The limit of a host is kept only while it has requests in flight.
+    """
+    urls = [f"{http_server}/open-graph/available.html", "http://127.0.0.1:9/"]
+
+    async def fetch_all():
+        async with AsyncFetcher(max_connections_per_host=1) as fetcher:
+            results = await asyncio.gather(
+                *[fetcher.fetch(u, timeout=1) for u in urls * 3], return_exceptions=True
+            )
+            return fetcher._hosts, results
+
+    hosts, results = asyncio.run(fetch_all())
+    assert hosts == {}
+    assert [type(r) for r in results[1::2]] == [URLUnreachable] * 3
+
+
+def test_async_webpreview_uses_default_fetcher(http_server):
+    """
+    async_webpreview works without an explicitly created fetcher.
+    """
+    url = f"{http_server}/schema/available.html"
+    preview = asyncio.run(async_webpreview(url))
+    assert preview.title == "a title"
+
+
+def test_async_webpreview_not_found(http_server):
+    """
+    async_webpreview raises URLNotFound for missing pages.
+    """
+    with pytest.raises(URLNotFound):
+        asyncio.run(async_webpreview(f"{http_server}/thisdoesnotexist.html"))
+
+
+def test_async_webpreview_unreachable():
+    """
+    async_webpreview raises URLUnreachable when nothing listens on the port.
+    """
+    with pytest.raises(URLUnreachable):
+        asyncio.run(async_webpreview("http://127.0.0.1:9/", timeout=1))
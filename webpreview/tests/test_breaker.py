@@ -0,0 +1,143 @@
+import asyncio
+import socket
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from webpreview import *
+from .test_fixtures import *
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    """Serves a page, a 404 for "/missing" or a PDF for "/pdf", counting the requests made."""
+
+    requests = 0
+
+    def do_GET(self) -> None:
+        type(self).requests += 1
+        body = b"<html><head><title>a title</title></head></html>"
+        self.send_response(404 if self.path.startswith("/missing") else 200)
+        self.send_header("Content-Type", "application/pdf" if self.path == "/pdf" else "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture(scope="module")
+def counting_server():
+    yield from serve(CountingHandler)
+
+
+@pytest.fixture
+def closed_port_url():
+    """URL of a local port nothing listens on, so that connections are refused."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def test_negative_cache(counting_server):
+    """
+    A missing page raises URLNotFound again without being requested.
+    """
+    breaker = CircuitBreaker()
+    CountingHandler.requests = 0
+    for _ in range(3):
+        with pytest.raises(URLNotFound):
+            webpreview(f"{counting_server}/missing", breaker=breaker)
+    assert CountingHandler.requests == 1
+    assert not breaker.is_open(counting_server)
+    assert webpreview(counting_server, breaker=breaker).title == "a title"
+
+
+def test_circuit_opens_after_repeated_failures(closed_port_url):
+    """
+    Once a host fails failure_threshold times in a row, its pages fail fast.
+    """
+    breaker = CircuitBreaker(failure_threshold=2, negative_ttl=0)
+    for i in range(2):
+        with pytest.raises(URLUnreachable) as e:
+            webpreview(f"{closed_port_url}/{i}", breaker=breaker)
+        assert not isinstance(e.value, HostUnavailable)
+    assert breaker.is_open(closed_port_url)
+    with pytest.raises(HostUnavailable):
+        webpreview(f"{closed_port_url}/other", breaker=breaker)
+
+
+def test_half_open_probe_and_backoff():
+    """
+    After the backoff a single probe goes through, and a failed probe doubles the backoff.
+    """
+    url = "http://failing.com/page"
+    breaker = CircuitBreaker(failure_threshold=1, backoff=0.1, negative_ttl=0)
+    breaker.record_failure(url, URLUnreachable("The URL is unreachable."))
+    with pytest.raises(HostUnavailable):
+        breaker.check(url)
+
+    time.sleep(0.15)
+    breaker.check(url)
+    with pytest.raises(HostUnavailable):
+        breaker.check("http://failing.com/other")
+
+    breaker.record_failure(url, URLUnreachable("The URL is unreachable."))
+    time.sleep(0.15)
+    with pytest.raises(HostUnavailable):
+        breaker.check(url)
+    time.sleep(0.1)
+    breaker.check(url)
+
+    breaker.record_success(url)
+    assert not breaker.is_open(url)
+    breaker.check("http://failing.com/other")
+
+
+def test_failing_hosts_are_bounded():
+    """
+    Only the maxsize most recently failed hosts are remembered.
+    """
+    breaker = CircuitBreaker(failure_threshold=1, negative_ttl=0, maxsize=2)
+    for host in ["a.com", "b.com", "c.com"]:
+        breaker.record_failure(f"http://{host}/", URLUnreachable("The URL is unreachable."))
+    assert [breaker.is_open(f"http://{h}/") for h in ["a.com", "b.com", "c.com"]] == [
+        False,
+        True,
+        True,
+    ]
+
+
+@pytest.mark.parametrize("asynchronous", [False, True], ids=["sync", "async"])
+def test_non_html_probe_closes_circuit(counting_server, asynchronous):
+    """
+    A host answering the probe with something else than a web page is up again.
+    """
+    if asynchronous:
+        pytest.importorskip("httpx")
+    breaker = CircuitBreaker(failure_threshold=1, backoff=0.1, negative_ttl=0)
+    breaker.record_failure(counting_server, URLUnreachable("The URL is unreachable."))
+    time.sleep(0.15)
+
+    with pytest.raises(UnsupportedContentType):
+        if asynchronous:
+            asyncio.run(async_webpreview(f"{counting_server}/pdf", breaker=breaker))
+        else:
+            webpreview(f"{counting_server}/pdf", breaker=breaker)
+    assert not breaker.is_open(counting_server)
+
+
+def test_default_breaker(closed_port_url):
+    """
+    The default breaker is used by calls that don't supply their own.
+    """
+    set_default_breaker(CircuitBreaker(failure_threshold=1))
+    try:
+        with pytest.raises(URLUnreachable):
+            webpreview(closed_port_url)
+        with pytest.raises(HostUnavailable):
+            webpreview(f"{closed_port_url}/other")
+    finally:
+        set_default_breaker(None)
@@ -0,0 +1,121 @@
+import pytest
+
+from webpreview import *
+from webpreview.models import WebPreview
+from webpreview.parsers import cache_key
+from .test_fixtures import *
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryCache(maxsize=2)
+    else:
+        cache = SQLiteCache(str(tmp_path / "previews.db"), maxsize=2)
+        yield cache
+        cache.close()
+
+
+def test_stores_previews(cache):
+    """
+    Caches return stored previews with all their fields.
+    """
+    cache.set("a", WebPreview(url="http://a.com", title="a title", price_amount="1"))
+    preview = cache.get("a")
+    assert preview.to_dict() == {"url": "http://a.com", "title": "a title", "price_amount": "1"}
+    assert cache.get("b") is None
+
+
+def test_evicts_least_recently_used(cache):
+    """
+    Caches evict the least recently used preview once full.
+    """
+    cache.set("a", WebPreview(title="a"))
+    cache.set("b", WebPreview(title="b"))
+    cache.get("a")
+    cache.set("c", WebPreview(title="c"))
+    assert cache.get("b") is None
+    assert cache.get("a").title == "a"
+    assert cache.get("c").title == "c"
+    assert len(cache) == 2
+
+
+def test_sqlite_cache_evicts_in_batches(tmp_path):
+    """
+    The SQLite cache evicts a tenth of its size at once, keeping the recently read
+    previews, even after it is reopened.
+    """
+    path = str(tmp_path / "previews.db")
+    cache = SQLiteCache(path, maxsize=20)
+    for i in range(20):
+        cache.set(str(i), WebPreview(title=str(i)))
+    cache.get("0")
+    cache.close()
+
+    cache = SQLiteCache(path, maxsize=20)
+    cache.set("20", WebPreview(title="20"))
+    assert len(cache) == 18
+    assert [key for key in ["0", "1", "2", "3", "4"] if cache.get(key)] == ["0", "4"]
+    cache.set("21", WebPreview(title="21"))
+    assert len(cache) == 19
+    cache.close()
+
+
+def test_incomplete_cache_cannot_be_created():
+    """
+    A cache that doesn't implement every method of PreviewCache fails when created.
+    """
+
+    class IncompleteCache(PreviewCache):
+        def get_entry(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        IncompleteCache()
+
+
+def test_expires_previews(cache):
+    """
+    Caches don't return previews after their time to live.
+    """
+    cache.set("a", WebPreview(title="a"), ttl=0)
+    assert cache.get("a") is None
+
+
+def test_cache_key_uses_normalized_url_and_options():
+    """
+    Cache key is the same for equivalent URLs and differs for different options.
+    """
+    assert cache_key("Example.com/#top") == cache_key("http://example.com/")
+    assert cache_key("example.com") != cache_key("example.com", absolute_url=True)
+    assert cache_key("example.com") != cache_key("example.com", "name", ["description"])
+
+
+def test_webpreview_uses_cache(http_server):
+    """
+    webpreview stores requested previews in the cache and returns them from it afterwards.
+    """
+    cache = MemoryCache()
+    url = f"{http_server}/open-graph/available.html"
+    preview = webpreview(url, cache=cache)
+    assert cache.get(cache_key(url)) is preview
+
+    # Nothing listens on this port, so the preview can only come from the cache
+    cache.set(cache_key("http://127.0.0.1:9/"), preview)
+    assert webpreview("http://127.0.0.1:9/", timeout=1, cache=cache) is preview
+
+
+def test_webpreview_uses_default_cache():
+    """
+    webpreview falls back to the cache set with set_default_cache.
+    """
+    cache = MemoryCache()
+    preview = WebPreview(url="http://127.0.0.1:9/", title="cached")
+    cache.set(cache_key("http://127.0.0.1:9/"), preview)
+    set_default_cache(cache)
+    try:
+        assert webpreview("http://127.0.0.1:9/", timeout=1) is preview
+    finally:
+        set_default_cache(None)
+    with pytest.raises(URLUnreachable):
+        webpreview("http://127.0.0.1:9/", timeout=1)
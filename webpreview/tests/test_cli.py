@@ -0,0 +1,63 @@
+import io
+import json
+import sys
+
+from webpreview import *
+from webpreview.cli import completed_urls, main
+from .test_fixtures import *
+
+
+def run_cli(monkeypatch, *args: str) -> None:
+    monkeypatch.setattr(sys, "argv", ["webpreview", *args])
+    main()
+
+
+def test_batch_writes_json_lines(monkeypatch, tmp_path, capsys, http_server):
+    """
+    Every URL of the input gets one JSON object, errors included inline.
+    """
+    urls = tmp_path / "urls.txt"
+    urls.write_text(
+        f"{http_server}/open-graph/available.html\n"
+        "# comment\n"
+        "\n"
+        f"{http_server}/missing.html\n"
+        "http://\n"
+    )
+    run_cli(monkeypatch, "--input", str(urls), "--jobs", "4")
+
+    records = {r["url"]: r for r in map(json.loads, capsys.readouterr().out.splitlines())}
+    assert len(records) == 3
+    assert records[f"{http_server}/open-graph/available.html"]["title"] == "a title"
+    assert records[f"{http_server}/missing.html"]["error"] == "URLNotFound"
+    assert records["http://"]["error"] == "InvalidURL"
+
+
+def test_batch_reads_stdin(monkeypatch, capsys, http_server):
+    """
+    "-" reads URLs from stdin.
+    """
+    monkeypatch.setattr(sys, "stdin", io.StringIO(f"{http_server}/schema/available.html\n"))
+    run_cli(monkeypatch, "-i", "-")
+    record = json.loads(capsys.readouterr().out)
+    assert record["url"] == f"{http_server}/schema/available.html"
+
+
+def test_resume_skips_completed_urls(monkeypatch, tmp_path, http_server):
+    """
+    --resume appends results of the URLs missing from the output only, dropping
+    a partially written last line.
+    """
+    done = f"{http_server}/open-graph/available.html"
+    todo = f"{http_server}/twitter-card/available.html"
+    urls = tmp_path / "urls.txt"
+    urls.write_text(f"{done}\n{todo}\n")
+    output = tmp_path / "out.jsonl"
+    output.write_text(json.dumps({"url": done, "title": "previous run"}) + '\n{"url": "ht')
+
+    run_cli(monkeypatch, "-i", str(urls), "-o", str(output), "--resume")
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r["url"] for r in records] == [done, todo]
+    assert records[0]["title"] == "previous run"
+    assert completed_urls(str(output)) == {done, todo}
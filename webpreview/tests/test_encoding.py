@@ -0,0 +1,83 @@
+import codecs
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from webpreview import *
+from webpreview.fetch import SNIFF_BYTES, sniff_encoding
+from .test_fixtures import *
+
+
+TITLE = "Энрико Ферми"
+PAGE = f"""<html><head>
+<meta http-equiv="Content-Type" content="text/html; charset=windows-1251">
+<title>{TITLE}</title>
+</head><body><h1>{TITLE}</h1><p>Физик из Италии.</p></body></html>"""
+
+
+class EncodingHandler(BaseHTTPRequestHandler):
+    """Serves the page in windows-1251, declared either in the page or in the header only."""
+
+    def do_GET(self) -> None:
+        content_type = "text/html"
+        body = PAGE.encode("cp1251")
+        if self.path == "/header":
+            content_type = "text/html; charset=windows-1251"
+            body = body.replace(b"windows-1251", b"utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture(scope="module")
+def encoding_server():
+    yield from serve(EncodingHandler)
+
+
+def test_sniff_encoding_precedence():
+    """
+    A byte order mark wins over the declared charset, which wins over the <meta> tag.
+    """
+    page = b'<meta charset="koi8-r"><title>a title</title>'
+    assert sniff_encoding(page) == "koi8-r"
+    assert sniff_encoding(page, "shift_jis") == "shift_jis"
+    assert sniff_encoding(codecs.BOM_UTF8 + page, "shift_jis") == "utf-8"
+    assert sniff_encoding(codecs.BOM_UTF16_LE + page) == "utf-16-le"
+
+
+def test_sniff_encoding_fallbacks():
+    """
+    Unknown, missing or late declarations give UTF-8, and latin-1 is read as windows-1252.
+    """
+    assert sniff_encoding(b"<title>a title</title>") == "utf-8"
+    assert sniff_encoding(b'<meta charset="no-such-charset">') == "utf-8"
+    assert sniff_encoding(b'<meta charset="utf-16">') == "utf-8"
+    assert sniff_encoding(b"<p></p>" * SNIFF_BYTES + b'<meta charset="koi8-r">') == "utf-8"
+    assert sniff_encoding(b"", "ISO-8859-1") == "cp1252"
+
+
+@pytest.mark.parametrize("parser", ["html.parser", "lxml-direct"])
+def test_parses_bytes_content(parser):
+    """
+    Raw pages are decoded with the charset of their <meta> tag.
+    """
+    preview = webpreview("aa.com", content=PAGE.encode("cp1251"), parser=parser)
+    assert preview.title == TITLE
+    assert preview.description == "Физик из Италии."
+
+
+@pytest.mark.parametrize("path", ["/meta", "/header"])
+@pytest.mark.parametrize("stream", [False, True])
+def test_fetched_page_charset(encoding_server, path, stream):
+    """
+    Fetched pages are decoded with the charset of the header, or else of their <meta> tag.
+    """
+    url = f"{encoding_server}{path}"
+    assert webpreview(url, stream=stream).title == TITLE
+    assert retrieve_content(url).startswith("<html>")
+    assert TITLE in retrieve_content(url)
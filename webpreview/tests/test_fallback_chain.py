@@ -0,0 +1,112 @@
+import glob
+
+import pytest
+
+from webpreview import *
+from webpreview import parsers
+from webpreview.models import WebPreview
+from webpreview.parsers import Document, parse_content, parse_document
+from .test_fixtures import *
+
+
+COMPLETE_OPEN_GRAPH = """
+<html><head>
+    <meta property="og:title" content="a title" />
+    <meta property="og:description" content="a description" />
+    <meta property="og:image" content="image.png" />
+</head><body><h1>a heading</h1></body></html>
+"""
+
+
+@pytest.mark.parametrize("parser", ["lxml-direct", "html.parser"])
+def test_complete_meta_tags_stop_the_chain(parser):
+    """
+    A page fully described by OpenGraph tags stops at that stage, and the tree
+    is never built when the parser can read meta tags directly.
+    """
+    if parser == "lxml-direct" and parsers.etree is None:
+        pytest.skip("lxml is not installed")
+    document = Document(COMPLETE_OPEN_GRAPH, parser)
+    result = WebPreview(url="aa.com")
+    assert parse_document(result, document, "aa.com") == "open_graph"
+    assert result.title == "a title"
+    if parser == "lxml-direct":
+        assert document._soup is None
+
+
+def test_auto_parser_builds_a_single_tree(monkeypatch, generic_preview_h1_img):
+    """
+    The default parser reads meta tags from the BeautifulSoup tree, so pages that need
+    the generic parser are not parsed twice.
+    """
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Meta tags must be read from the tree.")
+
+    monkeypatch.setattr(MetaIndex, "from_lxml", fail)
+    document = Document(generic_preview_h1_img)
+    result = WebPreview(url="aa.com")
+    parse_document(result, document, "aa.com")
+    assert result.title == "This title is from the first h1 tag."
+    assert document._soup is not None
+
+
+def test_generic_parser_only_extracts_missing_fields(monkeypatch):
+    """
+    Generic heuristics run only for the fields the meta tags did not supply.
+    """
+    content = """
+    <html><head>
+        <meta property="og:title" content="a title" />
+        <meta property="og:description" content="a description" />
+    </head><body><h1>a heading</h1><img src="image.png" /><p>a paragraph</p></body></html>
+    """
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Description heuristics must not run.")
+
+    monkeypatch.setattr(parsers, "extract_title", fail)
+    monkeypatch.setattr(parsers, "extract_description", fail)
+
+    document = Document(content)
+    result = WebPreview(url="aa.com")
+    assert parse_document(result, document, "aa.com") == "generic"
+    assert result.image == "image.png"
+    assert result.description == "a description"
+
+
+def test_incomplete_result_has_no_stage(generic_preview_title):
+    """
+    parse_document returns None when the page does not supply every field.
+    """
+    result = WebPreview(url="aa.com")
+    assert parse_document(result, Document(generic_preview_title), "aa.com") is None
+    assert result.title == "This title is at the title tag."
+
+
+def test_parse_generic_extracts_all_fields(generic_preview_h1_img):
+    """
+    parse_generic still fills every field of a fresh preview.
+    """
+    document = Document(generic_preview_h1_img, "html.parser")
+    assert (
+        parse_generic(document.soup, "aa.com").to_dict()
+        == parse_content("aa.com", generic_preview_h1_img, parser="html.parser").to_dict()
+    )
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob("tests/*/*.html")))
+@pytest.mark.parametrize(
+    "parse", [parse_open_graph, parse_twitter_card, parse_schema], ids=lambda f: f.__name__
+)
+def test_filling_in_place_equals_merging(path, parse):
+    """
+    Filling a preview in place gives the same result as merging a new preview into it.
+    """
+    index = Document(get_contents(path), "html.parser").meta_index
+    url = "http://localhost/"
+    merged = WebPreview(url=url, description="a description")
+    merged.merge(parse(None, url, None, True, index))
+    filled = WebPreview(url=url, description="a description")
+    assert parse(None, url, None, True, index, filled) is filled
+    assert filled.to_dict() == merged.to_dict()
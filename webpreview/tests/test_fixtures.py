@@ -1,3 +1,8 @@
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
 import pytest
 
 
@@ -77,6 +82,11 @@ def schema_unavailable() -> str:
     return get_contents("tests/schema/unavailable.html")
 
 
+@pytest.fixture(scope="session")
+def json_ld_available() -> str:
+    return get_contents("tests/json-ld/available.html")
+
+
 @pytest.fixture(scope="session")
 def twitter_card_available_img_relative_path() -> str:
     return get_contents("tests/twitter-card/available-img-relative-path.html")
@@ -90,3 +100,27 @@ def twitter_card_available() -> str:
 @pytest.fixture(scope="session")
 def twitter_card_unavailable() -> str:
     return get_contents("tests/twitter-card/unavailable.html")
+
+
+class QuietHTTPRequestHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def serve(handler) -> Iterator[str]:
+    """Run a local HTTP server in a background thread and yield its base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(scope="session")
+def http_server() -> Iterator[str]:
+    """Local HTTP server serving the "tests" directory."""
+    yield from serve(partial(QuietHTTPRequestHandler, directory="tests"))
@@ -0,0 +1,210 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+import requests
+
+from webpreview import *
+from webpreview.fetch import total_timeout
+from webpreview.flight import SingleFlight
+from .test_fixtures import *
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Serves a page after a short delay, or a second for /slower, counting the requests made."""
+
+    requests = 0
+
+    def do_GET(self) -> None:
+        type(self).requests += 1
+        time.sleep(1.0 if self.path == "/slower" else 0.2)
+        body = b"<html><head><title>a title</title></head></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture(scope="module")
+def slow_server():
+    yield from serve(SlowHandler)
+
+
+def test_single_flight_shares_result_and_exception():
+    """
+    Concurrent calls with the same key run the function once and share its outcome.
+    """
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def work(result):
+        calls.append(result)
+        started.set()
+        time.sleep(0.1)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    with ThreadPoolExecutor(4) as executor:
+        leader = executor.submit(flight.do, "key", lambda: work(["shared"]))
+        started.wait()
+        waiters = [executor.submit(flight.do, "key", lambda: work(["other"])) for _ in range(3)]
+        results = [leader.result()] + [w.result() for w in waiters]
+    assert calls == [["shared"]]
+    assert all(r is results[0] for r in results)
+
+    calls.clear()
+    started.clear()
+    with ThreadPoolExecutor(2) as executor:
+        leader = executor.submit(flight.do, "key", lambda: work(ValueError("failed")))
+        started.wait()
+        waiter = executor.submit(flight.do, "key", lambda: work("other"))
+        for future in (leader, waiter):
+            with pytest.raises(ValueError):
+                future.result()
+    assert len(calls) == 1
+    assert flight.do("key", lambda: "again") == "again"
+
+
+def test_waiters_give_up_after_their_timeout():
+    """
+    A caller waiting for the call in flight gives up after its own timeout, while the
+    call carries on.
+    """
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def work():
+        started.set()
+        time.sleep(0.5)
+        return "result"
+
+    with ThreadPoolExecutor(2) as executor:
+        leader = executor.submit(flight.do, "key", work)
+        started.wait()
+        begin = time.perf_counter()
+        with pytest.raises(FutureTimeoutError):
+            flight.do("key", work, timeout=0.1)
+        assert time.perf_counter() - begin < 0.4
+        assert leader.result() == "result"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do_async("key", lambda: asyncio.sleep(0.5, "result")))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await flight.do_async("key", lambda: asyncio.sleep(0, "waiter"), timeout=0.1)
+        return await leader
+
+    assert asyncio.run(run()) == "result"
+
+
+def test_short_timeout_does_not_wait_for_long_one(slow_server):
+    """
+    A call with a short timeout fails on time instead of waiting for a concurrent call
+    of the same page with a longer one.
+    """
+    with ThreadPoolExecutor(1) as executor:
+        leader = executor.submit(webpreview, f"{slow_server}/slower", timeout=10)
+        time.sleep(0.1)
+        begin = time.perf_counter()
+        with pytest.raises(URLUnreachable):
+            webpreview(f"{slow_server}/slower", timeout=0.3)
+        assert time.perf_counter() - begin < 0.8
+        assert leader.result().title == "a title"
+
+
+@pytest.mark.parametrize("deadline", [None, 10])
+def test_callers_with_tuple_timeouts_are_coalesced(slow_server, deadline):
+    """
+    Concurrent calls with a (connect, read) timeout share a single request, waiting for
+    it as long as both parts together.
+    """
+    assert (total_timeout((3, 5)), total_timeout((3, None)), total_timeout(2)) == (8, None, 2)
+    SlowHandler.requests = 0
+    url = f"{slow_server}/tuple-{deadline}"
+    with ThreadPoolExecutor(8) as executor:
+        futures = [
+            executor.submit(webpreview, url, timeout=(3, 5), deadline=deadline) for _ in range(8)
+        ]
+        assert all(f.result().title == "a title" for f in futures)
+    assert SlowHandler.requests == 1
+
+
+def test_previews_with_a_session_are_not_coalesced(slow_server):
+    """
+    Calls with a session request the page themselves, since it may depend on its
+    cookies or authentication.
+    """
+    SlowHandler.requests = 0
+    with requests.Session() as session, ThreadPoolExecutor(4) as executor:
+        futures = [
+            executor.submit(webpreview, f"{slow_server}/session", session=session) for _ in range(4)
+        ]
+        assert all(f.result().title == "a title" for f in futures)
+    assert SlowHandler.requests == 4
+
+
+@pytest.mark.parametrize("coalesce, requests", [(True, 1), (False, 8)])
+def test_concurrent_previews_are_coalesced(slow_server, coalesce, requests):
+    """
+    Concurrent previews of the same page share a single request unless disabled.
+    """
+    SlowHandler.requests = 0
+    with ThreadPoolExecutor(8) as executor:
+        futures = [
+            executor.submit(webpreview, f"{slow_server}/page", coalesce=coalesce) for _ in range(8)
+        ]
+        previews = [f.result() for f in futures]
+    assert all(p.title == "a title" for p in previews)
+    assert SlowHandler.requests == requests
+
+
+def test_concurrent_async_previews_are_coalesced(slow_server):
+    """
+    Concurrent asynchronous previews of the same page share a single request.
+    """
+    pytest.importorskip("httpx")
+    SlowHandler.requests = 0
+
+    async def preview_all():
+        async with AsyncFetcher() as fetcher:
+            return await asyncio.gather(
+                *[async_webpreview(f"{slow_server}/async", fetcher=fetcher) for _ in range(8)]
+            )
+
+    previews = asyncio.run(preview_all())
+    assert all(p.title == "a title" for p in previews)
+    assert SlowHandler.requests == 1
+
+
+def test_cancelled_async_leader_hands_over():
+    """
+    A waiter takes over the call when the coroutine in flight is cancelled.
+    """
+    flight = SingleFlight()
+    calls = []
+
+    async def work(result):
+        calls.append(result)
+        await asyncio.sleep(0.1)
+        return result
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do_async("key", lambda: work("leader")))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flight.do_async("key", lambda: work("waiter")))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(run()) == "waiter"
+    assert calls == ["leader", "waiter"]
@@ -1,3 +1,5 @@
+from bs4 import BeautifulSoup
+
 from webpreview import *
 from .test_fixtures import *
 
@@ -80,3 +82,29 @@ def test_title_description_image_are_none_if_none_found(generic_preview_empty):
     assert apreview.title is None
     assert apreview.description is None
     assert apreview.image is None
+
+
+def test_description_scan_is_bounded_by_node_budget():
+    """
+    Description heuristics give up on paragraphs beyond the node budget.
+    """
+    empty = "<p></p>" * 100
+    soup = BeautifulSoup(
+        f"<html><body><h1>A heading</h1>{empty}<p>Far away. Really. Here.</p></body></html>",
+        "html.parser",
+    )
+    assert extract_description(soup) == "Far away. Really."
+    assert extract_description(soup, node_budget=50) is None
+
+
+def test_description_prefers_paragraph_after_h1():
+    """
+    The first non-empty paragraph after the first <h1> wins over earlier ones.
+    """
+    soup = BeautifulSoup(
+        "<html><body><p>Before.</p><h1>A heading</h1><p> </p><p>After.</p></body></html>",
+        "html.parser",
+    )
+    assert extract_description(soup) == "After."
+    soup = BeautifulSoup("<p>Before.</p><h1>A heading</h1><p> </p>", "html.parser")
+    assert extract_description(soup) == "Before."
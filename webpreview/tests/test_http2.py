@@ -0,0 +1,151 @@
+import gzip
+import socketserver
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+import requests
+
+from webpreview import *
+from webpreview.http2 import HTTP2Adapter
+from .test_fixtures import *
+
+h2 = pytest.importorskip("h2")
+from h2.config import H2Configuration  # noqa: E402
+from h2.connection import H2Connection  # noqa: E402
+from h2.events import RequestReceived  # noqa: E402
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+PAGE = b"""<html><head>
+<title>Compressed</title>
+<meta property="og:description" content="a description" />
+<meta property="og:image" content="/img/heck.jpg" />
+</head><body><p>Compressed page.</p></body></html>"""
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor().compress(body)
+    return gzip.compress(body)
+
+
+def encodings():
+    return [
+        "gzip",
+        pytest.param("br", marks=pytest.mark.skipif(brotli is None, reason="brotli missing")),
+        pytest.param("zstd", marks=pytest.mark.skipif(zstandard is None, reason="zstd missing")),
+    ]
+
+
+class CompressingHandler(BaseHTTPRequestHandler):
+    """Serves the page over HTTP/1.1, compressed as named by the path if the client accepts it."""
+
+    def do_GET(self) -> None:
+        encoding = self.path.strip("/")
+        accepted = [e.strip() for e in self.headers.get("Accept-Encoding", "").split(",")]
+        body = compress(PAGE, encoding) if encoding in accepted else PAGE
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        if encoding in accepted:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class H2Handler(socketserver.BaseRequestHandler):
+    """Serves the page over HTTP/2 with prior knowledge, counting the connections made."""
+
+    connections = 0
+
+    def handle(self) -> None:
+        type(self).connections += 1
+        connection = H2Connection(config=H2Configuration(client_side=False))
+        connection.initiate_connection()
+        self.request.sendall(connection.data_to_send())
+        while True:
+            data = self.request.recv(65535)
+            if not data:
+                break
+            for event in connection.receive_data(data):
+                if isinstance(event, RequestReceived):
+                    headers = dict(event.headers)
+                    encoding = headers[b":path"].decode().split("?")[0].strip("/")
+                    body = compress(PAGE, encoding)
+                    connection.send_headers(
+                        event.stream_id,
+                        [
+                            (":status", "200"),
+                            ("content-type", "text/html"),
+                            ("content-encoding", encoding),
+                            ("content-length", str(len(body))),
+                        ],
+                    )
+                    connection.send_data(event.stream_id, body, end_stream=True)
+            self.request.sendall(connection.data_to_send())
+
+
+@pytest.fixture(scope="module")
+def compressing_server():
+    yield from serve(CompressingHandler)
+
+
+@pytest.fixture(scope="module")
+def h2_server():
+    yield from serve(H2Handler)
+
+
+@pytest.mark.parametrize("encoding", encodings())
+def test_compressed_page(compressing_server, encoding):
+    """
+    Pages compressed with any of the advertised encodings are decompressed while streamed.
+    """
+    preview = webpreview(f"{compressing_server}/{encoding}")
+    assert preview.title == "Compressed"
+    assert preview.description == "a description"
+    assert webpreview(f"{compressing_server}/{encoding}", stream=True).title == "Compressed"
+
+
+@pytest.mark.parametrize("encoding", encodings())
+def test_http2_page(h2_server, encoding):
+    """
+    Pages are requested over HTTP/2 through a session with the HTTP/2 adapter.
+    """
+    session = requests.Session()
+    session.mount("http://", HTTP2Adapter(http1=False))
+    preview = webpreview(f"{h2_server}/{encoding}", session=session, absolute_url=True)
+    assert preview.title == "Compressed"
+    assert preview.image == f"{h2_server}/img/heck.jpg"
+    assert webpreview(f"{h2_server}/{encoding}", session=session, stream=True).title
+    session.close()
+
+
+def test_http2_multiplexes_requests_to_host(h2_server):
+    """
+    Concurrent requests to a host share a single HTTP/2 connection.
+    """
+    session = requests.Session()
+    session.mount("http://", HTTP2Adapter(http1=False))
+    H2Handler.connections = 0
+    urls = [f"{h2_server}/gzip?page={i}" for i in range(20)]
+    results = dict(webpreview_many(urls, concurrency=8, session=session))
+    assert all(result.title == "Compressed" for result in results.values())
+    assert H2Handler.connections == 1
+    session.close()
@@ -0,0 +1,172 @@
+import struct
+import zlib
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+from bs4 import BeautifulSoup
+
+from webpreview import *
+from .test_fixtures import *
+
+
+def png(width: int, height: int) -> bytes:
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    chunk = b"IHDR" + header
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + struct.pack(">I", len(header))
+        + chunk
+        + struct.pack(">I", zlib.crc32(chunk))
+    )
+
+
+IMAGES = [
+    (png(1200, 630), ImageSize("png", 1200, 630)),
+    (b"GIF89a" + struct.pack("<HH", 16, 9) + b"\x00" * 8, ImageSize("gif", 16, 9)),
+    (
+        b"RIFF\x00\x00\x00\x00WEBPVP8X" + b"\x00" * 8 + (799).to_bytes(3, "little") * 2,
+        ImageSize("webp", 800, 800),
+    ),
+    (
+        b"RIFF\x00\x00\x00\x00WEBPVP8L\x00\x00\x00\x00\x2f" + struct.pack("<I", 99 | (49 << 14)),
+        ImageSize("webp", 100, 50),
+    ),
+    (
+        b"RIFF\x00\x00\x00\x00WEBPVP8 \x00\x00\x00\x00\x00\x00\x00\x9d\x01\x2a"
+        + struct.pack("<HH", 640, 480),
+        ImageSize("webp", 640, 480),
+    ),
+    (b"BM" + b"\x00" * 16 + struct.pack("<ii", 32, -24), ImageSize("bmp", 32, 24)),
+]
+
+
+@pytest.mark.parametrize("data, expected", IMAGES, ids=lambda v: getattr(v, "type", None))
+def test_image_size(data, expected):
+    """
+    Dimensions are read from the headers of every supported format, and only once
+    enough of the image is there.
+    """
+    assert image_size(data) == expected
+    assert image_size(data[:9]) is None
+
+
+def test_jpeg_size_skips_segments():
+    """
+    Dimensions of a JPEG are found after the segments in front of its frame header.
+    """
+    with open("tests/img/heck.jpg", "rb") as f:
+        data = f.read()
+    assert image_size(data) == ImageSize("jpeg", 577, 1024)
+    assert image_size(data[:100]) is None
+    assert image_size(b"<svg></svg>") is None
+
+
+CANDIDATES_PAGE = """
+<html><head>
+    <meta property="og:image" content="/og.png" />
+    <meta property="og:image:width" content="1200" />
+    <meta property="og:image:height" content="630px" />
+    <meta property="og:image:type" content="image/png" />
+    <meta property="og:image" content="http://cdn.aa.com/second.jpg" />
+    <meta property="og:image:url" content="http://cdn.aa.com/second.jpg" />
+    <meta name="twitter:image" content="/twitter.png" />
+    <meta itemprop="image" content="/og.png" />
+    <link rel="image_src" href="/link.png" />
+    <script type="application/ld+json">
+        {"@type": "Article", "image": [{"url": "/ld.png", "width": 800, "height": 600}]}
+    </script>
+</head><body><h1>a heading</h1><img src="/heading.png" /></body></html>
+"""
+
+
+def test_extract_image_candidates():
+    """
+    Every image is listed once, in the order of the fallback chain, with its declared
+    dimensions and an absolute URL.
+    """
+    soup = BeautifulSoup(CANDIDATES_PAGE, "html.parser")
+    candidates = extract_image_candidates(soup, "http://aa.com/page")
+    assert [(c.url, c.source) for c in candidates] == [
+        ("http://aa.com/og.png", "og:image"),
+        ("http://cdn.aa.com/second.jpg", "og:image"),
+        ("http://aa.com/twitter.png", "twitter:image"),
+        ("http://aa.com/ld.png", "json_ld"),
+        ("http://aa.com/link.png", "image_src"),
+        ("http://aa.com/heading.png", "img"),
+    ]
+    og = candidates[0]
+    assert (og.width, og.height, og.type) == (1200, 630, "image/png")
+    assert candidates[3].dimensions() == (800, 600)
+    assert best_image(candidates) is og
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    """Serves a large PNG ignoring the Range header, or a 404, counting the requests."""
+
+    requests = 0
+    ranges = []
+
+    def do_GET(self) -> None:
+        type(self).requests += 1
+        type(self).ranges.append(self.headers.get("Range"))
+        if self.path == "/page":
+            body = b'<html><head><meta property="og:image" content="/big.png" /></head></html>'
+            content_type = "text/html"
+        else:
+            body = png(2000, 1000) + b"\x00" * (1 << 20)
+            content_type = "image/png"
+        self.send_response(404 if self.path == "/missing.png" else 200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture(scope="module")
+def image_server():
+    yield from serve(ImageHandler)
+
+
+def test_prober_reads_the_start_and_caches(image_server):
+    """
+    Images are requested once per prober, for their first bytes only, and those that
+    can't be probed have no size.
+    """
+    ImageHandler.requests, ImageHandler.ranges = 0, []
+    with ImageProber(max_bytes=1024) as prober:
+        for _ in range(2):
+            assert prober.probe(f"{image_server}/big.png") == ImageSize("png", 2000, 1000)
+            assert prober.probe(f"{image_server}/missing.png") is None
+    assert ImageHandler.requests == 2
+    assert ImageHandler.ranges == ["bytes=0-1023", "bytes=0-1023"]
+
+
+def test_webpreview_images_probes_candidates(image_server, http_server):
+    """
+    Candidates of a page are probed concurrently, and the best one is the largest.
+    """
+    content = CANDIDATES_PAGE.replace("/og.png", "/img/heck.jpg")
+    with ImageProber() as prober:
+        candidates = webpreview_images(f"{http_server}/page", content=content, prober=prober)
+        remote = webpreview_images(f"{image_server}/page", prober=prober)
+
+    assert candidates[0].size == ImageSize("jpeg", 577, 1024)
+    assert candidates[0].dimensions() == (577, 1024)
+    assert all(c.size is None for c in candidates[1:])
+    assert best_image(candidates) is candidates[0]
+    assert [c.to_dict() for c in remote] == [
+        {
+            "url": f"{image_server}/big.png",
+            "source": "og:image",
+            "width": None,
+            "height": None,
+            "type": None,
+            "size": {"type": "png", "width": 2000, "height": 1000},
+        }
+    ]
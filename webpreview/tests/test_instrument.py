@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from webpreview import *
+from webpreview.instrument import Histogram
+from .test_fixtures import *
+from .test_fallback_chain import COMPLETE_OPEN_GRAPH
+
+
+def test_stats_of_supplied_content():
+    """
+    Parsing supplied content reports the stages it went through and the one that completed it.
+    """
+    reported = []
+    webpreview(
+        "aa.com", content=COMPLETE_OPEN_GRAPH, parser="html.parser", instrument=reported.append
+    )
+    stats = reported[0]
+    assert stats.completed_by == "open_graph"
+    assert stats.parser == "html.parser"
+    assert {"soup", "meta_index", "open_graph", "total"} <= set(stats.timings)
+    assert "twitter_card" not in stats.timings and "request" not in stats.timings
+    assert stats.bytes_downloaded == 0
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_stats_of_fetched_page(http_server, stream):
+    """
+    Fetching a page reports the time to request and download it and the bytes received.
+    """
+    reported = []
+    path = "generic-preview/h1-p-desc.html"
+    webpreview(f"{http_server}/{path}", stream=stream, instrument=reported.append)
+    stats = reported[0]
+    assert stats.bytes_downloaded == os.path.getsize(f"tests/{path}")
+    assert {"request", "download" if not stream else "head", "generic"} <= set(stats.timings)
+    assert stats.timings["total"] >= stats.timings["request"]
+
+
+def test_stats_of_cached_and_failed_previews(http_server):
+    """
+    Previews from the cache and failed ones are reported too.
+    """
+    reported = []
+    cache = MemoryCache()
+    url = f"{http_server}/schema/available.html"
+    webpreview(url, cache=cache, instrument=reported.append)
+    webpreview(url, cache=cache, instrument=reported.append)
+    assert reported[1].completed_by == "cache"
+    assert "request" not in reported[1].timings
+
+    with pytest.raises(URLNotFound):
+        webpreview(f"{http_server}/missing.html", instrument=reported.append)
+    assert reported[2].completed_by is None
+    assert "request" in reported[2].timings
+
+
+def test_aggregator_histograms(http_server):
+    """
+    The aggregator collects the stats of many previews into histograms per stage.
+    """
+    aggregator = StatsAggregator()
+    urls = [f"{http_server}/open-graph/available.html", f"{http_server}/schema/available.html"]
+    results = list(webpreview_many(urls, instrument=aggregator))
+    assert len(results) == 2
+    assert aggregator.previews == 2
+    summary = aggregator.summary()
+    assert summary["request"]["count"] == summary["total"]["count"] == 2
+    assert summary["total"]["mean"] >= summary["request"]["mean"]
+    assert "request" in aggregator.report()
+
+
+def test_histogram_percentiles():
+    """
+    Percentiles are the upper bounds of the buckets holding them.
+    """
+    histogram = Histogram()
+    for seconds in [0.0002] * 90 + [0.2] * 10:
+        histogram.add(seconds)
+    assert histogram.percentile(50) == 0.00025
+    assert histogram.percentile(95) == 0.25
+    assert histogram.mean() == pytest.approx(0.02018)
@@ -0,0 +1,153 @@
+import json
+
+import pytest
+
+from webpreview import *
+from webpreview import parsers
+from webpreview.instrument import PreviewStats
+from webpreview.models import WebPreview
+from webpreview.parsers import JSON_LD_MAX_BLOCKS, JSON_LD_MAX_LENGTH, parse_content, parse_head
+from .test_fixtures import *
+
+
+def json_ld_page(*blocks: str, head: str = "") -> str:
+    scripts = "".join(f'<script type="application/ld+json">{b}</script>' for b in blocks)
+    return f"<html><head>{head}{scripts}</head><body><h1>a heading</h1></body></html>"
+
+
+@pytest.mark.parametrize("parser", ["html.parser", "auto"])
+def test_extracts_fields_from_json_ld(json_ld_available, parser):
+    """
+    Title, description and image come from the node describing the page, after the
+    malformed block and the nodes of the site and its publisher are skipped.
+    """
+    url = "http://localhost:8000/json-ld/available.html"
+    stats = PreviewStats(url)
+    p = parse_content(url, json_ld_available, parser=parser, absolute_url=True, stats=stats)
+    assert p.title == "a headline"
+    assert p.description == "a description of the article"
+    assert p.image == "http://localhost:8000/img/article.png"
+    assert stats.completed_by == "json_ld"
+    assert "json_ld" in stats.timings
+
+
+def test_meta_tags_take_precedence():
+    """
+    JSON-LD only fills the fields the meta tags did not supply.
+    """
+    content = json_ld_page(
+        '{"headline": "a headline", "description": "a description", "image": "a.png"}',
+        head='<meta property="og:title" content="og title" />',
+    )
+    p = webpreview("aa.com", content=content)
+    assert p.title == "og title"
+    assert p.description == "a description"
+    assert p.image == "a.png"
+
+
+def test_not_decoded_when_meta_tags_are_complete(monkeypatch):
+    """
+    JSON-LD blocks are never decoded when the meta tags complete the preview.
+    """
+    content = json_ld_page(
+        '{"headline": "a"}',
+        head=(
+            '<meta property="og:title" content="a title" />'
+            '<meta property="og:description" content="a description" />'
+            '<meta property="og:image" content="image.png" />'
+        ),
+    )
+    index = MetaIndex.from_soup(parsers.BeautifulSoup(content, "html.parser"))
+    assert index.json_ld == ['{"headline": "a"}']
+
+    def fail(*args, **kwargs):
+        raise AssertionError("JSON-LD must not be decoded.")
+
+    monkeypatch.setattr(parsers.json, "loads", fail)
+    assert webpreview("aa.com", content=content).title == "a title"
+
+
+def test_decoding_stops_once_complete(monkeypatch):
+    """
+    Blocks after the one that completed the preview are left undecoded.
+    """
+    decoded = []
+    loads = json.loads
+
+    def counting_loads(s):
+        decoded.append(s)
+        return loads(s)
+
+    monkeypatch.setattr(parsers.json, "loads", counting_loads)
+    complete = '{"headline": "a", "description": "b", "image": "c.png"}'
+    p = webpreview("aa.com", content=json_ld_page(complete, '{"headline": "other"}'))
+    assert p.title == "a"
+    assert decoded == [complete]
+
+
+@pytest.mark.parametrize(
+    "block",
+    [
+        "",
+        "not json",
+        '{"headline": ',
+        "[" * 5000 + "]" * 5000,
+        '"a string"',
+        "[1, null, []]",
+        '{"@graph": "not a list"}',
+        '{"headline": {"@value": "an object"}, "image": [], "description": 1}',
+        '{"@type": ["Organization", "Person"], "name": "a publisher"}',
+    ],
+)
+def test_malformed_blocks_are_ignored(block):
+    """
+    Blocks that can't be decoded or have unexpected values supply nothing.
+    """
+    p = webpreview("aa.com", content=json_ld_page(block))
+    assert p.title == "a heading"
+    assert p.description is None
+
+
+def test_values_of_odd_shapes():
+    """
+    Images given as lists, objects or thumbnails and nodes in a top level list are read.
+    """
+    block = json.dumps(
+        [
+            {"@type": "WebSite", "name": "a site"},
+            {"@type": ["Article", "Person"], "name": "  a name  ", "description": "a description"},
+            {"thumbnailUrl": ["/thumb.png"], "image": {"contentUrl": "/image.png"}},
+        ]
+    )
+    p = webpreview("http://aa.com/page", content=json_ld_page(block), absolute_url=True)
+    assert p.title == "a name"
+    assert p.image == "http://aa.com/image.png"
+
+
+def test_blocks_are_capped():
+    """
+    Oversized blocks are skipped and only the first blocks of a page are kept.
+    """
+    index = MetaIndex()
+    index.add_json_ld("[" + " " * JSON_LD_MAX_LENGTH + "]")
+    assert index.json_ld == []
+    for i in range(JSON_LD_MAX_BLOCKS + 1):
+        index.add_json_ld(f'{{"name": "{i}"}}')
+    assert len(index.json_ld) == JSON_LD_MAX_BLOCKS
+
+
+def test_head_parser_collects_json_ld():
+    """
+    The streamed head supplies JSON-LD blocks, however the page is split, and
+    skips oversized ones.
+    """
+    oversized = '{"headline": "' + "a" * JSON_LD_MAX_LENGTH + '"}'
+    complete = '{"headline": "a", "description": "b", "image": "c.png"}'
+    content = json_ld_page(oversized, complete)
+    chunks = iter([content[i : i + 7] for i in range(0, len(content), 7)])
+    result, rest = parse_head("http://aa.com", chunks)
+    assert rest is None
+    assert (
+        result.to_dict()
+        == WebPreview(url="http://aa.com", title="a", description="b", image="c.png").to_dict()
+    )
@@ -0,0 +1,164 @@
+import asyncio
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from webpreview import *
+from webpreview.fetch import stream_content, timeout_within
+from .test_fixtures import *
+
+
+HEAD = b"""<html><head>
+<title>Limited</title>
+<meta property="og:title" content="a title" />
+</head><body>"""
+
+
+class LimitsHandler(BaseHTTPRequestHandler):
+    """Serves a huge page, a page that trickles forever, a PDF document, a CSV file, and
+    a page whose headers never come."""
+
+    protocol_version = "HTTP/1.0"
+
+    def do_GET(self) -> None:
+        if self.path == "/silent":
+            time.sleep(3)
+            return
+        content_type = {"/pdf": "application/pdf", "/csv": "text/csv"}.get(self.path, "text/html")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.end_headers()
+        try:
+            self.wfile.write(HEAD)
+            if self.path == "/huge":
+                paragraph = b"<p>Huge page.</p>" * 1000
+                for _ in range(1000):
+                    self.wfile.write(paragraph)
+            elif self.path == "/slow":
+                for _ in range(100):
+                    self.wfile.write(b"<p>Slow page.</p>")
+                    self.wfile.flush()
+                    time.sleep(0.1)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture(scope="module")
+def limits_server():
+    yield from serve(LimitsHandler)
+
+
+def test_max_bytes(limits_server):
+    """
+    Download stops after max_bytes and the received part is still parsed.
+    """
+    assert len(retrieve_content(f"{limits_server}/huge", max_bytes=100)) == 100
+    preview = webpreview(f"{limits_server}/huge", max_bytes=1000)
+    assert preview.title == "a title"
+    assert preview.description == "Huge page."
+
+
+def test_deadline(limits_server):
+    """
+    Download stops after the deadline and the received part is still parsed.
+    """
+    started = time.monotonic()
+    preview = webpreview(f"{limits_server}/slow", deadline=0.5)
+    assert time.monotonic() - started < 2
+    assert preview.title == "a title"
+    assert preview.description == "Slow page."
+
+
+def test_min_rate(limits_server):
+    """
+    Download stops once the page arrives slower than min_rate.
+    """
+    started = time.monotonic()
+    content = retrieve_content(f"{limits_server}/slow", min_rate=10000)
+    assert time.monotonic() - started < 3
+    assert content.startswith(HEAD.decode())
+
+
+def test_rejects_non_html(limits_server):
+    """
+    Pages with non-HTML Content-Type are rejected, including other text types.
+    """
+    with pytest.raises(UnsupportedContentType):
+        webpreview(f"{limits_server}/pdf")
+    with pytest.raises(UnsupportedContentType):
+        retrieve_content(f"{limits_server}/csv")
+
+
+@pytest.mark.parametrize(
+    "fetch",
+    [
+        lambda url: webpreview(url, deadline=0.5),
+        lambda url: retrieve_content(url, deadline=0.5),
+        lambda url: "".join(stream_content(url, deadline=0.5)),
+        lambda url: webpreview_head(url, deadline=0.5),
+    ],
+    ids=["webpreview", "retrieve_content", "stream_content", "webpreview_head"],
+)
+def test_deadline_caps_waiting_for_headers(limits_server, fetch):
+    """
+    The deadline also applies to a server that never sends the response headers.
+    """
+    started = time.monotonic()
+    with pytest.raises(URLUnreachable):
+        fetch(f"{limits_server}/silent")
+    assert time.monotonic() - started < 2
+
+
+def test_async_limits(limits_server):
+    """
+    The asynchronous API streams the page within the same limits and rejects non-HTML
+    pages before downloading them.
+    """
+    pytest.importorskip("httpx")
+
+    async def run():
+        async with AsyncFetcher() as fetcher:
+            content = await fetcher.fetch(f"{limits_server}/huge", max_bytes=100)
+            assert len(content) == 100
+
+            started = time.monotonic()
+            preview = await async_webpreview(f"{limits_server}/slow", deadline=0.5)
+            assert time.monotonic() - started < 2
+            assert preview.description == "Slow page."
+
+            started = time.monotonic()
+            content = await fetcher.fetch(f"{limits_server}/slow", min_rate=10000)
+            assert time.monotonic() - started < 3
+            assert content.startswith(HEAD.decode())
+
+            with pytest.raises(UnsupportedContentType):
+                await async_webpreview(f"{limits_server}/pdf", fetcher=fetcher)
+
+            started = time.monotonic()
+            with pytest.raises(URLUnreachable):
+                await fetcher.fetch(f"{limits_server}/silent", deadline=0.5)
+            assert time.monotonic() - started < 2
+
+    asyncio.run(run())
+
+
+def test_deadline_caps_tuple_timeouts(limits_server):
+    """
+    Each part of a (connect, read) timeout is capped by the deadline.
+    """
+    assert timeout_within((3, 5), 4) == (3, 4)
+    assert timeout_within((None, 5), 1) == (1, 1)
+    assert timeout_within((3, 5), None) == (3, 5)
+
+    url = f"{limits_server}/huge"
+    assert len(retrieve_content(url, timeout=(3, 5), deadline=10, max_bytes=100)) == 100
+    preview = webpreview(url, timeout=(3, 5), deadline=10, max_bytes=1000, coalesce=False)
+    assert preview.title == "a title"
+    started = time.monotonic()
+    with pytest.raises(URLUnreachable):
+        retrieve_content(f"{limits_server}/silent", timeout=(3, 5), deadline=0.5)
+    assert time.monotonic() - started < 2
@@ -0,0 +1,119 @@
+import pytest
+from requests.exceptions import InvalidURL
+
+from urllib.parse import urlsplit, urlunsplit
+
+from webpreview import *
+from webpreview.parsers import validate_url
+from webpreview.regex import PLAIN_URL, VALID_URL
+from .test_fixtures import *
+
+
+URLS = [
+    "example.com",
+    "Example.COM:8080",
+    "https://en.wikipedia.org/wiki/Enrico_Fermi#Early_life",
+    "HTTP://WWW.Example.com/Path/To?Q=A&b=2#top",
+    "a.com?",
+    "a.com?x",
+    "a.com/?",
+    "a.com?#f",
+    "a.com/#frag",
+    "sub-domain.example.co.uk/path;params?q",
+    "xn--80ak6aa92e.com/",
+    "пример.рф/путь",
+    "localhost:8000/",
+    "http://127.0.0.1:8000/page",
+    "http://[::1]/",
+    "user:pass@example.com/private",
+    "under_score.example.com/",
+    "-dash.com",
+    "dash-.com",
+    "a.c",
+    "example.com/with space",
+    "ftp://example.com/",
+    "example",
+]
+
+
+def test_normalize_url():
+    """
+    normalize_url adds the scheme, lowercases the host and drops the fragment.
+    """
+    assert normalize_url("Example.COM") == "http://example.com/"
+    assert (
+        normalize_url("HTTP://User@Example.com/Path?q=A#top") == "http://User@example.com/Path?q=A"
+    )
+
+
+def test_plain_urls_are_valid_urls():
+    """
+    The cheap pattern only accepts URLs that the full pattern accepts.
+    """
+    for url in URLS:
+        if PLAIN_URL.match(url):
+            assert VALID_URL.match(url), url
+
+
+def test_fast_normalization_matches_urlsplit():
+    """
+    URLs normalized without urlsplit are the same as the ones normalized with it.
+    """
+    for url in URLS:
+        try:
+            scheme, netloc, path, query, _ = urlsplit(validate_url(url))
+        except (WebpreviewException, InvalidURL):
+            with pytest.raises((WebpreviewException, InvalidURL)):
+                normalize_url(url)
+            continue
+        userinfo, at, host = netloc.rpartition("@")
+        expected = urlunsplit(
+            (scheme.lower(), userinfo + at + host.lower(), path or "/", query, "")
+        )
+        assert normalize_url(url) == expected, url
+
+
+def test_normalize_urls():
+    """
+    normalize_urls yields every page once and skips invalid URLs unless asked not to.
+    """
+    urls = ["Example.com/a#x", "http://example.com/a", "not a url", "example.com/b"]
+    assert list(normalize_urls(urls)) == ["http://example.com/a", "http://example.com/b"]
+    with pytest.raises(InvalidURL):
+        list(normalize_urls(urls, skip_invalid=False))
+
+
+def test_previews_many_pages(http_server):
+    """
+    webpreview_many previews every page once and reports errors per URL.
+    """
+    og = f"{http_server}/open-graph/available.html"
+    tc = f"{http_server}/twitter-card/available.html"
+    missing = f"{http_server}/thisdoesnotexist.html"
+    urls = [og, tc, og + "#fragment", missing, "not a url"]
+
+    results = list(webpreview_many(urls, concurrency=2, per_host=1))
+
+    assert len(results) == 4
+    results = dict(results)
+    assert results[og].to_dict() == webpreview(og).to_dict()
+    assert results[tc].title == "a title"
+    assert isinstance(results[missing], URLNotFound)
+    assert isinstance(results["not a url"], InvalidURL)
+
+
+def test_consumes_urls_lazily(http_server):
+    """
+    webpreview_many doesn't read far ahead of the results being consumed.
+    """
+    consumed = []
+
+    def urls():
+        for i in range(100):
+            consumed.append(i)
+            yield f"{http_server}/schema/available.html?page={i}"
+
+    previews = webpreview_many(urls(), concurrency=2)
+    next(previews)
+    previews.close()
+    assert len(consumed) < 10
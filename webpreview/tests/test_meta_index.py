@@ -0,0 +1,115 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from webpreview import *
+from webpreview.parsers import extraction_plan, parse_head
+from .test_fixtures import *
+
+
+def test_indexes_all_meta_attributes():
+    """
+    MetaIndex maps every attribute value of meta tags to their content.
+    """
+    soup = BeautifulSoup(
+        """
+        <meta property="og:title" content="og title" />
+        <meta name="twitter:title" content="twitter title" />
+        <meta itemprop="name" content="schema name" />
+        <meta charset="utf-8" />
+        """,
+        "html.parser",
+    )
+    index = MetaIndex.from_soup(soup)
+    assert index == {
+        ("property", "og:title"): "og title",
+        ("name", "twitter:title"): "twitter title",
+        ("itemprop", "name"): "schema name",
+        ("charset", "utf-8"): None,
+    }
+
+
+NON_STANDARD_PAGE = """
+<html><head>
+    <meta data-p="x:title" content="a title" />
+    <meta http-equiv="x:description" content="a description" />
+    <meta class="x image" content="image.png" />
+</head><body></body></html>
+"""
+
+
+@pytest.mark.parametrize("parser", ["html.parser", "lxml-direct"])
+def test_non_standard_attributes(parser):
+    """
+    Meta tags are found by any target attribute, not only property, name and itemprop.
+    """
+    if parser == "lxml-direct":
+        pytest.importorskip("lxml")
+    soup = BeautifulSoup(NON_STANDARD_PAGE, "html.parser")
+    assert extract_meta_attributes(soup, "data-p", ["x:title"]) == {"title": "a title"}
+    assert extract_meta_attributes(soup, "class", ["image", "x image"]) == {
+        "image": "image.png",
+        "x image": "image.png",
+    }
+
+    p = webpreview(
+        "aa.com", content=NON_STANDARD_PAGE, target_attribute="data-p", properties=["x:title"]
+    )
+    assert p.title == "a title"
+    p = webpreview(
+        "aa.com",
+        content=NON_STANDARD_PAGE,
+        target_attribute="http-equiv",
+        properties=["x:description"],
+        parser=parser,
+    )
+    assert p.description == "a description"
+
+    chunks = iter([NON_STANDARD_PAGE[i : i + 7] for i in range(0, len(NON_STANDARD_PAGE), 7)])
+    p, _ = parse_head("http://aa.com", chunks, "data-p", ["x:title"])
+    assert p.title == "a title"
+
+
+def test_first_meta_tag_wins():
+    """
+    MetaIndex keeps the first meta tag for a repeated attribute value, like soup.find does.
+    """
+    soup = BeautifulSoup(
+        """
+        <meta property="og:image" content="first.jpg" />
+        <meta property="og:image" content="second.jpg" />
+        """,
+        "html.parser",
+    )
+    assert MetaIndex.from_soup(soup)[("property", "og:image")] == "first.jpg"
+
+
+def test_extract_meta_attributes_uses_index(open_graph_available):
+    """
+    extract_meta_attributes gives the same result with and without a prebuilt index.
+    """
+    soup = BeautifulSoup(open_graph_available, "html.parser")
+    properties = ["og:title", "og:price:amount", "og:image"]
+    index = MetaIndex.from_soup(soup)
+    assert extract_meta_attributes(None, "property", properties, index) == {
+        "title": "a title",
+        "price_amount": "1",
+        "image": None,
+    }
+    assert extract_meta_attributes(soup, "property", properties) == extract_meta_attributes(
+        None, "property", properties, index
+    )
+
+
+def test_extraction_plan_is_cached():
+    """
+    Property names are normalized once per target attribute and list of properties.
+    """
+    properties = ("og:title", "og:price:amount", "camelCaseProperty", "name")
+    plan = extraction_plan("property", properties)
+    assert plan == (
+        ("title", ("property", "og:title")),
+        ("price_amount", ("property", "og:price:amount")),
+        ("camel_case_property", ("property", "camelCaseProperty")),
+        ("name", ("property", "name")),
+    )
+    assert extraction_plan("property", properties) is plan
@@ -0,0 +1,84 @@
+import pickle
+
+import pytest
+
+from webpreview import *
+from webpreview.models import WebPreview
+from .test_fixtures import *
+
+
+def test_core_fields_are_slots():
+    """
+    Previews have no per-instance __dict__ and no extra properties until one is added.
+    """
+    preview = WebPreview(url="http://a.com", title="a title")
+    assert not hasattr(preview, "__dict__")
+    assert preview._extra is None
+    assert preview.to_dict() == {"url": "http://a.com", "title": "a title"}
+
+
+def test_extra_properties():
+    """
+    Extra properties are accessible both as attributes and as items.
+    """
+    preview = WebPreview(url="http://a.com", price_amount="1")
+    preview.site_name = "a site"
+    preview["locale"] = "en"
+
+    assert preview.price_amount == preview["price_amount"] == "1"
+    assert preview["site_name"] == "a site"
+    assert preview.locale == "en"
+    assert "locale" in preview and "title" in preview and "missing" not in preview
+    assert preview["missing"] is None
+    with pytest.raises(AttributeError):
+        preview.missing
+
+
+def test_merge_does_not_override():
+    """
+    Merging only fills the fields and properties that are empty.
+    """
+    preview = WebPreview(url="http://a.com", title="a title", name=None)
+    preview.merge(WebPreview(title="other", image="a.png", name="a name", locale="en"))
+    assert preview.to_dict() == {
+        "url": "http://a.com",
+        "title": "a title",
+        "image": "a.png",
+        "name": "a name",
+        "locale": "en",
+    }
+
+
+def test_pickle_round_trip():
+    """
+    Previews survive pickling, e.g. when sent between processes.
+    """
+    preview = WebPreview(url="http://a.com", title="a title", price_amount="1")
+    assert pickle.loads(pickle.dumps(preview)).to_dict() == preview.to_dict()
+
+
+def test_compatibility_previews_drop_the_soup(open_graph_available):
+    """
+    Compatibility previews keep the parsed page only when asked to.
+    """
+    properties = ["og:title"]
+    assert OpenGraph("aa.com", properties, content=open_graph_available)._soup is None
+    kept = OpenGraph("aa.com", properties, content=open_graph_available, keep_soup=True)
+    assert kept._soup.find("meta") is not None
+    assert "_soup" not in kept.to_dict()
+
+
+def test_or_returns_new_preview():
+    """
+    The | operator leaves both operands untouched.
+    """
+    a = WebPreview(url="http://a.com", title="a title")
+    b = WebPreview(title="other", image="a.png", locale="en")
+    merged = a | b
+    assert merged.to_dict() == {
+        "url": "http://a.com",
+        "title": "a title",
+        "image": "a.png",
+        "locale": "en",
+    }
+    assert a.to_dict() == {"url": "http://a.com", "title": "a title"}
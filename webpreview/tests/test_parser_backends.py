@@ -0,0 +1,60 @@
+import glob
+import importlib.util
+
+import pytest
+
+from webpreview import *
+from .test_fixtures import *
+
+
+FIXTURES = sorted(glob.glob("tests/*/*.html"))
+
+PARSERS = ["html.parser", "auto"]
+if importlib.util.find_spec("lxml"):
+    PARSERS += ["lxml", "lxml-direct"]
+if importlib.util.find_spec("html5lib"):
+    PARSERS += ["html5lib"]
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+@pytest.mark.parametrize("path", FIXTURES)
+def test_backends_extract_same_fields(path, parser):
+    """
+    Every parser backend extracts the same fields from the fixtures as "html.parser".
+    """
+    url = "http://localhost:8000/" + path.split("/", 1)[1]
+    content = get_contents(path)
+    expected = webpreview(url, content=content, parser="html.parser", absolute_url=True)
+    preview = webpreview(url, content=content, parser=parser, absolute_url=True)
+    assert preview.to_dict() == expected.to_dict()
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+def test_backends_extract_same_meta_attributes(open_graph_available, parser):
+    """
+    Every parser backend extracts the same custom meta properties.
+    """
+    properties = ["og:title", "og:price:amount"]
+    expected = webpreview(
+        "aa.com", content=open_graph_available, target_attribute="property", properties=properties
+    )
+    preview = webpreview(
+        "aa.com",
+        content=open_graph_available,
+        target_attribute="property",
+        properties=properties,
+        parser=parser,
+    )
+    assert preview.to_dict() == expected.to_dict()
+    assert preview.price_amount == "1"
+
+
+def test_auto_parser_falls_back_to_html_parser(monkeypatch):
+    """
+    "auto" parser uses "html.parser" when lxml is not installed.
+    """
+    from webpreview import parsers
+
+    monkeypatch.setattr(parsers, "etree", None)
+    assert parsers.resolve_parser("auto") == "html.parser"
+    assert webpreview("aa.com", content="<title>a title</title>").title == "a title"
@@ -0,0 +1,47 @@
+import pytest
+
+from webpreview import *
+from webpreview.parsers import parse_content
+from .test_fixtures import *
+
+
+@pytest.fixture(scope="module")
+def parse_pool():
+    with ParsePool(workers=2, max_tasks_per_worker=2) as pool:
+        yield pool
+
+
+def test_pool_parses_like_the_calling_process(parse_pool, open_graph_available, schema_available):
+    """
+    Previews parsed in worker processes equal the ones parsed in place.
+    """
+    for content in (open_graph_available, schema_available):
+        expected = parse_content("http://aa.com/", content, absolute_url=True)
+        preview = parse_pool.parse("http://aa.com/", content, absolute_url=True)
+        assert preview.to_dict() == expected.to_dict()
+
+
+def test_workers_are_recycled(parse_pool, generic_preview_h1_img):
+    """
+    Workers replaced after a few tasks keep parsing submitted pages.
+    """
+    futures = [parse_pool.submit(f"http://aa.com/{i}", generic_preview_h1_img) for i in range(10)]
+    assert [f.result().url for f in futures] == [f"http://aa.com/{i}" for i in range(10)]
+
+
+def test_worker_errors_are_raised(parse_pool):
+    """
+    Exceptions raised in a worker are raised by the future.
+    """
+    with pytest.raises(ValueError):
+        parse_pool.parse("http://aa.com/", "<html></html>", parser="no-such-parser")
+
+
+def test_webpreview_many_parses_in_pool(parse_pool, http_server):
+    """
+    webpreview_many fetches pages in threads and parses them in the pool.
+    """
+    urls = [f"{http_server}/open-graph/available.html", f"{http_server}/schema/available.html"]
+    results = dict(webpreview_many(urls, concurrency=2, parse_pool=parse_pool))
+    assert results[urls[0]].title == "a title"
+    assert results[urls[1]].title == webpreview(urls[1]).title
@@ -0,0 +1,141 @@
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from webpreview import *
+from webpreview.cache import freshness_lifetime
+from .test_fixtures import *
+
+
+PAGE = b"""<html><head>
+<meta property="og:title" content="a title" />
+</head></html>"""
+ETAG = '"v1"'
+LAST_MODIFIED = "Tue, 01 Mar 2022 10:00:00 GMT"
+
+
+class ValidatingHandler(BaseHTTPRequestHandler):
+    """Serves a page with validators and counts full and conditional responses."""
+
+    protocol_version = "HTTP/1.1"
+    counts = {"200": 0, "304": 0}
+
+    def do_GET(self) -> None:
+        cache_control = "max-age=60" if self.path == "/fresh" else "no-cache"
+        etag = ETAG if self.path != "/last-modified" else None
+        if (etag and self.headers.get("If-None-Match") == etag) or (
+            not etag and self.headers.get("If-Modified-Since") == LAST_MODIFIED
+        ):
+            self.counts["304"] += 1
+            self.send_response(304)
+            self.send_header("Cache-Control", cache_control)
+            self.end_headers()
+            return
+
+        self.counts["200"] += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.send_header("Cache-Control", cache_control)
+        if etag:
+            self.send_header("ETag", etag)
+        else:
+            self.send_header("Last-Modified", LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture()
+def validating_server():
+    ValidatingHandler.counts = {"200": 0, "304": 0}
+    yield from serve(ValidatingHandler)
+
+
+@pytest.mark.parametrize("path", ["/etag", "/last-modified"])
+def test_revalidates_expired_preview(validating_server, path):
+    """
+    Expired preview is revalidated and reused when the server replies with 304.
+    """
+    cache = MemoryCache()
+    url = f"{validating_server}{path}"
+    preview = webpreview(url, cache=cache)
+    assert webpreview(url, cache=cache) is preview
+    assert webpreview(url, cache=cache, stream=True) is preview
+    assert ValidatingHandler.counts == {"200": 1, "304": 2}
+
+
+def test_honours_freshness_lifetime(validating_server):
+    """
+    Fresh preview is returned without any request.
+    """
+    cache = MemoryCache(ttl=0)
+    url = f"{validating_server}/fresh"
+    preview = webpreview(url, cache=cache)
+    assert webpreview(url, cache=cache) is preview
+    assert ValidatingHandler.counts == {"200": 1, "304": 0}
+
+
+def test_sqlite_cache_keeps_validators(validating_server, tmp_path):
+    """
+    SQLiteCache stores validators, so previews are revalidated across instances.
+    """
+    path = str(tmp_path / "previews.db")
+    url = f"{validating_server}/etag"
+    preview = webpreview(url, cache=SQLiteCache(path))
+    assert webpreview(url, cache=SQLiteCache(path)).to_dict() == preview.to_dict()
+    assert ValidatingHandler.counts == {"200": 1, "304": 1}
+
+
+class ErrorHandler(BaseHTTPRequestHandler):
+    """Serves a cacheable error page with the status code given by the path."""
+
+    requests = 0
+
+    def do_GET(self) -> None:
+        type(self).requests += 1
+        body = b"<html><head><title>Service Unavailable</title></head></html>"
+        self.send_response(int(self.path.strip("/")))
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "max-age=60")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture(scope="module")
+def error_server():
+    yield from serve(ErrorHandler)
+
+
+@pytest.mark.parametrize("status", [403, 500, 503])
+def test_error_pages_are_not_cached(error_server, status):
+    """
+    Previews of error responses are not stored, so the page is requested again.
+    """
+    cache = MemoryCache()
+    ErrorHandler.requests = 0
+    url = f"{error_server}/{status}"
+    assert webpreview(url, cache=cache).title == "Service Unavailable"
+    webpreview(url, cache=cache)
+    assert ErrorHandler.requests == 2
+    assert len(cache) == 0
+
+
+def test_freshness_lifetime():
+    """
+    Freshness lifetime is read from Cache-Control, falling back to Expires.
+    """
+    assert freshness_lifetime({"Cache-Control": "public, max-age=600", "Age": "100"}) == 500
+    assert freshness_lifetime({"Cache-Control": "no-cache, max-age=600"}) == 0
+    assert freshness_lifetime({"Expires": "0"}) == 0
+    assert freshness_lifetime({"Expires": formatdate(0, usegmt=True)}) == 0
+    date = formatdate(1000, usegmt=True)
+    assert freshness_lifetime({"Date": date, "Expires": formatdate(1300, usegmt=True)}) == 300
+    assert freshness_lifetime({}) is None
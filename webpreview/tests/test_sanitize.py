@@ -0,0 +1,54 @@
+import re
+import unicodedata
+
+import pytest
+
+from webpreview import *
+from webpreview.parsers import sanitize
+from .test_fixtures import *
+
+
+def sanitize_reference(value: str) -> str:
+    return unicodedata.normalize("NFKD", re.sub(r"\s+", " ", value))
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "a plain title",
+        "  leading and trailing  ",
+        "\ttabs\n\nand\r\nnewlines\x0b",
+        "　全角　スペース\xa0and nbsp ",
+        " ",
+        "\n\t ",
+        "Crème brûlée — ｶﾀｶﾅ ①",
+        "Путеводитель по Санкт‑Петербургу",
+    ],
+)
+def test_sanitize_matches_reference(value):
+    """
+    Fast paths give the same result as collapsing whitespace and normalizing to NFKD.
+    """
+    assert sanitize(value) == sanitize_reference(value)
+
+
+def test_sanitize_keeps_empty_values():
+    """
+    Empty strings and None are returned as is.
+    """
+    assert sanitize("") == ""
+    assert sanitize(None) is None
+
+
+def test_sanitize_max_length():
+    """
+    The result is cut to max_length without separating characters from their accents.
+    """
+    assert sanitize("a  b\n\nc" * 1000, max_length=5) == "a b "
+    assert sanitize("\u00e9\u00e9\u00e9\u00e9", max_length=3) == "e\u0301"
+    assert sanitize("e\u00e9e", max_length=2) == "e"
+    assert sanitize("short", max_length=10) == "short"
+    assert sanitize("abc", max_length=0) == ""
+    assert sanitize("", max_length=0) == ""
+    with pytest.raises(ValueError):
+        sanitize("abc", max_length=-1)
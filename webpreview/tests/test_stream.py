@@ -0,0 +1,98 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from webpreview import *
+from .test_fixtures import *
+
+
+HEAD = b"""<html><head>
+<title>Streamed</title>
+<meta property="og:title" content="a title" />
+<meta property="og:description" content="a description" />
+<meta property="og:image" content="/img/heck.jpg" />
+</head>"""
+BODY = b"<body><h1>Heading</h1><p>First paragraph.</p></body></html>"
+
+# Released by the tests once they are done with the slow server
+body_released = threading.Event()
+
+
+class SlowBodyHandler(BaseHTTPRequestHandler):
+    """Sends the head right away and holds the body back until released."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        head = HEAD if self.path == "/complete" else b"<html><head><title>Streamed</title></head>"
+        try:
+            self.write_chunk(head)
+            body_released.wait(10)
+            self.write_chunk(BODY)
+            self.write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def write_chunk(self, data: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture(scope="module")
+def slow_server():
+    yield from serve(SlowBodyHandler)
+    body_released.set()
+
+
+def test_head_parser_stops_at_head_end():
+    """
+    HeadParser indexes meta tags of the head and ignores the ones in the body.
+    """
+    parser = HeadParser()
+    for piece in (HEAD[:50], HEAD[50:], b'<meta name="description" content="body" />'):
+        parser.feed(piece.decode())
+    assert parser.head_closed
+    assert parser.meta_index[("property", "og:title")] == "a title"
+    assert ("name", "description") not in parser.meta_index
+
+
+def test_stream_returns_without_reading_body(slow_server):
+    """
+    Streaming mode returns as soon as the head provides title, description and image.
+    """
+    started = time.monotonic()
+    preview = webpreview(f"{slow_server}/complete", timeout=5, stream=True, absolute_url=True)
+    assert time.monotonic() - started < 5
+    assert preview.title == "a title"
+    assert preview.description == "a description"
+    assert preview.image == f"{slow_server}/img/heck.jpg"
+
+
+def test_stream_falls_back_to_full_body(slow_server):
+    """
+    Streaming mode reads the rest of the page when generic parsing is needed.
+    """
+    body_released.set()
+    preview, content = webpreview_head(f"{slow_server}/incomplete", timeout=5)
+    assert not preview.is_complete()
+    assert content.endswith("</html>")
+    preview = webpreview(f"{slow_server}/incomplete", timeout=5, stream=True)
+    assert preview.title == "Streamed"
+    assert preview.description == "First paragraph."
+
+
+def test_stream_matches_full_download(http_server):
+    """
+    Streaming and regular modes extract the same fields from a served page.
+    """
+    url = f"{http_server}/open-graph/available.html"
+    assert webpreview(url, stream=True).to_dict() == webpreview(url).to_dict()